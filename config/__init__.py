@@ -12,7 +12,9 @@ __all__ = [
     'PAGE_LAYOUT',
     'BANK_NAME',
     'CAMPAIGN_COSTS',
+    'CAMPAIGN_COST_COMPONENTS',
     'FINAL_STATUS_MAP',
+    'STATUS_CATEGORIES',
     'STATUS_COLORS',
     'DB_CONFIG',
     'TABLES',
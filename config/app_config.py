@@ -24,6 +24,14 @@ CAMPAIGN_COSTS = {
     }
 }
 
+# Identifier sheet columns billed by each CAMPAIGN_COSTS component.
+# Flat prices are billed per "units"; dict prices name their components.
+CAMPAIGN_COST_COMPONENTS = {
+    "units": ["delivered"],
+    "connected": ["connected"],
+    "sms": ["sms triggered", "sms_triggered"]
+}
+
 # Final Status Mapping
 FINAL_STATUS_MAP = {
     "IPA APPROVED DROPOFF CASE": "Inprogress",
@@ -35,6 +43,9 @@ FINAL_STATUS_MAP = {
     "Inprocess": "Inprogress",
 }
 
+# Status categories in int8 code order; unmapped decisions fall into "Other" (0)
+STATUS_CATEGORIES = ["Other", "Declined", "Inprogress", "Card Out"]
+
 # Status Colors
 STATUS_COLORS = {
     'Card Out': '#10B981',      # Green
@@ -46,3 +57,4 @@ STATUS_COLORS = {
 
 # Google Sheets Configuration
 GOOGLE_SHEETS_URL = "https://docs.google.com/spreadsheets/d/184yquIAWt0XyQEYhI3yv0djg9f6pUtZS7TZ4Un7NLXI/export?format=csv&gid=2141873222"
+SHEETS_CACHE_TTL_SECONDS = 300  # Serve cached sheet without revalidation for 5 minutes
@@ -16,7 +16,9 @@ DB_CONFIG = {
 TABLES = {
     "MIS_DATA": "HDFC_MIS_Data",
     "CAMPAIGN_DATA": "Campaign_Data",
-    "MIS_UPDATE_LOG": "MIS_Update_Log"
+    "MIS_UPDATE_LOG": "MIS_Update_Log",
+    "MIS_DAILY_ROLLUP": "HDFC_MIS_Daily_Rollup",
+    "LC2_PHONE_MAP": "LC2_Phone_Map"
 }
 
 # Database Connection String
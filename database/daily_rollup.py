@@ -0,0 +1,226 @@
+"""
+MIS Daily Rollup
+Application counts by creation date, decision date, IPA status and mapped
+final status, maintained in the database after each MIS upload
+"""
+
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.app_config import FINAL_STATUS_MAP, STATUS_CATEGORIES
+from config.database_config import TABLES
+from utils.mis_store import cached, get_column_codes, get_parsed_dates, get_status_codes
+
+ROLLUP_TABLE = TABLES["MIS_DAILY_ROLLUP"]
+
+# MIS columns the rollup is built from
+ROLLUP_SOURCE_COLUMNS = {
+    "creation": "CREATION_DATE_TIME",
+    "decision": "FINAL_DECISION_DATE",
+    "ipa": "IPA_STATUS",
+    "status": "FINAL_DECISION"
+}
+
+ROLLUP_COLUMNS = ["creation_date", "decision_date", "ipa_status", "mapped_status", "application_count"]
+
+# source_version is the MIS_Update_Log id of the MIS table the rollup was built from
+CREATE_ROLLUP_SQL = f"""
+CREATE TABLE IF NOT EXISTS "{ROLLUP_TABLE}" (
+    creation_date DATE,
+    decision_date DATE,
+    ipa_status TEXT,
+    mapped_status VARCHAR(32) NOT NULL,
+    application_count INTEGER NOT NULL,
+    source_version INTEGER
+);
+
+ALTER TABLE "{ROLLUP_TABLE}" ADD COLUMN IF NOT EXISTS source_version INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_mis_daily_rollup_creation
+ON "{ROLLUP_TABLE}" (creation_date);
+
+CREATE INDEX IF NOT EXISTS idx_mis_daily_rollup_decision
+ON "{ROLLUP_TABLE}" (decision_date);
+"""
+
+
+def _mapped_status_sql(column):
+    """SQL CASE mapping a decision column to its status category (case insensitive)"""
+    normalized = {}
+    for raw, category in FINAL_STATUS_MAP.items():
+        normalized[raw.strip().upper()] = category
+    whens = " ".join(
+        f"WHEN '{raw.replace(chr(39), chr(39) * 2)}' THEN '{category}'"
+        for raw, category in normalized.items()
+    )
+    return f'CASE UPPER(TRIM(CAST("{column}" AS TEXT))) {whens} ELSE \'Other\' END'
+
+
+def _mis_version_sql():
+    """SQL for the latest MIS_Update_Log id of the :source_table table"""
+    return f'SELECT MAX(id) FROM "{TABLES["MIS_UPDATE_LOG"]}" WHERE table_name = :source_table'
+
+
+def load_mis_version(engine, source_table=TABLES["MIS_DATA"]):
+    """
+    Data version of the MIS table: its latest MIS_Update_Log id
+
+    Read it before loading the MIS frame, so an upload landing during the
+    load makes the version older than the data rather than newer.
+
+    Returns:
+        tuple: (version, or None if the table was never logged, error message)
+    """
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(text(_mis_version_sql()), {"source_table": source_table}).scalar()
+        return (None if version is None else int(version)), None
+    except Exception as e:
+        return None, str(e)
+
+
+def refresh_daily_rollup(engine, source_table=TABLES["MIS_DATA"]):
+    """
+    Rebuild the daily rollup from the MIS table in one transaction
+
+    The rollup records the MIS data version it was built from (log the
+    upload in MIS_Update_Log first), see load_daily_rollup.
+
+    Args:
+        engine: SQLAlchemy engine
+        source_table: MIS table to aggregate
+
+    Returns:
+        tuple: (rollup row count, error message)
+    """
+    cols = ROLLUP_SOURCE_COLUMNS
+    insert_sql = f"""
+        INSERT INTO "{ROLLUP_TABLE}" ({", ".join(ROLLUP_COLUMNS)}, source_version)
+        SELECT
+            CAST("{cols['creation']}" AS DATE),
+            CAST("{cols['decision']}" AS DATE),
+            UPPER(TRIM(CAST("{cols['ipa']}" AS TEXT))),
+            {_mapped_status_sql(cols['status'])},
+            COUNT(*),
+            ({_mis_version_sql()})
+        FROM "{source_table}"
+        GROUP BY 1, 2, 3, 4
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(CREATE_ROLLUP_SQL))
+            conn.execute(text(f'DELETE FROM "{ROLLUP_TABLE}"'))
+            result = conn.execute(text(insert_sql), {"source_table": source_table})
+        return result.rowcount, None
+    except Exception as e:
+        return None, str(e)
+
+
+def load_daily_rollup(engine, source_version=None):
+    """
+    Load the daily rollup table
+
+    Args:
+        engine: SQLAlchemy engine
+        source_version: Only return the rollup if it was built from this MIS
+            data version (see load_mis_version); otherwise no rows
+
+    Returns:
+        tuple: (DataFrame, error message)
+    """
+    query = f'SELECT {", ".join(ROLLUP_COLUMNS)} FROM "{ROLLUP_TABLE}"'
+    params = None
+    if source_version is not None:
+        query += " WHERE source_version = :source_version"
+        params = {"source_version": int(source_version)}
+    try:
+        df = pd.read_sql(text(query), engine, params=params)
+        df["creation_date"] = pd.to_datetime(df["creation_date"], errors="coerce")
+        df["decision_date"] = pd.to_datetime(df["decision_date"], errors="coerce")
+        df["application_count"] = df["application_count"].astype("int64")
+        return df, None
+    except Exception as e:
+        return None, str(e)
+
+
+def build_daily_rollup(df, creation_col=None, decision_col=None, ipa_col=None, status_col=None):
+    """
+    Build the daily rollup from an in-memory MIS frame (e.g. an uploaded file)
+
+    Produces the same columns and status mapping as refresh_daily_rollup();
+    computed once per data version.
+
+    Returns:
+        DataFrame: ROLLUP_COLUMNS
+    """
+    def compute():
+        n = len(df)
+        no_dates = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+
+        creation = get_parsed_dates(df, creation_col).dt.normalize() if creation_col else no_dates
+        decision = get_parsed_dates(df, decision_col).dt.normalize() if decision_col else no_dates
+
+        if ipa_col:
+            codes, uniques, _ = get_column_codes(df, ipa_col)
+            normalized = np.array([str(value).strip().upper() for value in uniques] + [None], dtype=object)
+            ipa_status = normalized[codes]  # code -1 (missing) picks the trailing None
+        else:
+            ipa_status = np.full(n, None, dtype=object)
+
+        if status_col:
+            status_codes = get_status_codes(df, status_col, FINAL_STATUS_MAP, normalize=True)
+        else:
+            status_codes = np.zeros(n, dtype=np.int8)
+
+        rows = pd.DataFrame({
+            "creation_date": creation.to_numpy(),
+            "decision_date": decision.to_numpy(),
+            "ipa_status": ipa_status,
+            "mapped_status": np.array(STATUS_CATEGORIES, dtype=object)[status_codes]
+        })
+        return (
+            rows.groupby(ROLLUP_COLUMNS[:-1], dropna=False, sort=False)
+            .size()
+            .reset_index(name="application_count")
+        )
+
+    return cached(df, ("daily_rollup", creation_col, decision_col, ipa_col, status_col), compute)
+
+
+def filter_rollup(rollup, ranges):
+    """
+    Rollup rows whose dates fall in every (column, start, end) range
+
+    Bounds are compared by calendar day and are inclusive; None is open.
+    """
+    mask = np.ones(len(rollup), dtype=bool)
+    for col, start, end in ranges:
+        dates = rollup[col]
+        mask &= dates.notna().to_numpy()
+        if start is not None:
+            mask &= (dates >= pd.Timestamp(start).normalize()).to_numpy()
+        if end is not None:
+            mask &= (dates <= pd.Timestamp(end).normalize()).to_numpy()
+    return rollup[mask]
+
+
+def rollup_status_counts(rollup):
+    """
+    KPI counts from (filtered) rollup rows
+
+    Returns:
+        dict: count per STATUS_CATEGORIES entry plus "IPA Approved" and
+        "Total Applications"
+    """
+    by_status = rollup.groupby("mapped_status")["application_count"].sum()
+    counts = {category: int(by_status.get(category, 0)) for category in STATUS_CATEGORIES}
+    counts["IPA Approved"] = int(rollup.loc[rollup["ipa_status"] == "APPROVE", "application_count"].sum())
+    counts["Total Applications"] = int(rollup["application_count"].sum())
+    return counts
@@ -0,0 +1,309 @@
+"""
+LC2 Phone Map
+Decoded phone number or campaign seqId per distinct MIS LC2 code, filled
+incrementally at upload so phone extraction becomes a lookup
+"""
+
+import sys
+import os
+
+import pandas as pd
+from sqlalchemy import text
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database_config import TABLES
+from utils.lc2_utils import decode_lc2_phones, lc2_seq_ids, normalize_lc2
+from utils.mis_store import cached
+
+LC2_MAP_TABLE = TABLES["LC2_PHONE_MAP"]
+
+# MIS column the map is built from, and its position when the header differs
+LC2_SOURCE_COLUMN = "LC2_CODE"
+LC2_FALLBACK_INDEX = 10
+
+LC2_MAP_COLUMNS = ["lc2_code", "derived_phone", "seq_id"]
+
+CREATE_LC2_MAP_SQL = f"""
+CREATE TABLE IF NOT EXISTS "{LC2_MAP_TABLE}" (
+    lc2_code TEXT PRIMARY KEY,
+    derived_phone TEXT,
+    seq_id TEXT
+);
+"""
+
+
+def _strip_sql(expr):
+    """SQL stripping leading and trailing whitespace like str.strip() (TRIM only removes spaces)"""
+    return f"REGEXP_REPLACE({expr}, '^\\s+|\\s+$', '', 'g')"
+
+
+def _lc2_sql(column):
+    """SQL normalizing an LC2 column like normalize_lc2() (NULL becomes '')"""
+    return _strip_sql(f"COALESCE(CAST({column} AS TEXT), '')")
+
+
+def _seq_id_sql(column):
+    """SQL normalizing a campaign seqId like process_phone_numbers() (strip + upper case)"""
+    return f"UPPER({_strip_sql(f'CAST({column} AS TEXT)')})"
+
+
+# Expression index backing the seqId lookups of the SQL pushdown join; the
+# index on the earlier TRIM() expression is dropped since no query uses it
+DROP_OLD_SEQ_ID_INDEX_SQL = "DROP INDEX IF EXISTS idx_campaign_data_seq_id_normalized;"
+CREATE_SEQ_ID_INDEX_SQL = f"""
+CREATE INDEX IF NOT EXISTS idx_campaign_data_seq_id_stripped
+ON "{TABLES['CAMPAIGN_DATA']}" (({_seq_id_sql('"seqId"')}));
+"""
+
+# Databases (engine URLs) where the seqId index was created by this process;
+# creating it again is harmless, so a race only costs a no-op statement
+_seq_id_indexed = set()
+
+
+def ensure_seq_id_index(engine):
+    """
+    Create the campaign seqId expression index once per database and process
+
+    Returns:
+        tuple: (True if the index exists, error message)
+    """
+    key = str(engine.url)
+    if key in _seq_id_indexed:
+        return True, None
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(DROP_OLD_SEQ_ID_INDEX_SQL))
+            conn.execute(text(CREATE_SEQ_ID_INDEX_SQL))
+        _seq_id_indexed.add(key)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def resolve_lc2_column(columns):
+    """
+    MIS column holding LC2 codes, matched like find_col(df, ["LC2_CODE"], 10)
+
+    Args:
+        columns: Column names in table order
+
+    Returns:
+        str: Exact match (stripped, case-insensitive), else the column at
+        LC2_FALLBACK_INDEX
+    """
+    columns = list(columns)
+    key = LC2_SOURCE_COLUMN.lower()
+    for c in columns:
+        if str(c).strip().lower() == key:
+            return c
+    if LC2_FALLBACK_INDEX < len(columns):
+        return columns[LC2_FALLBACK_INDEX]
+    raise KeyError(f"None of {[LC2_SOURCE_COLUMN]} found in columns")
+
+
+def table_lc2_column(conn, source_table):
+    """LC2 column of a database table, resolved from its header (no rows are read)"""
+    header = pd.read_sql(text(f'SELECT * FROM "{source_table}" LIMIT 0'), conn)
+    return resolve_lc2_column(header.columns)
+
+
+def build_lc2_phone_map(lc2_codes):
+    """
+    Decode the distinct codes of an LC2 column
+
+    Args:
+        lc2_codes: Series of raw LC2 codes
+
+    Returns:
+        DataFrame: LC2_MAP_COLUMNS, one row per distinct normalized code
+    """
+    codes = pd.Series(normalize_lc2(pd.Series(lc2_codes)).unique(), dtype=object)
+    derived = decode_lc2_phones(codes)
+    return pd.DataFrame({
+        "lc2_code": codes,
+        "derived_phone": derived.astype(object),
+        "seq_id": lc2_seq_ids(codes, derived).astype(object)
+    })[LC2_MAP_COLUMNS]
+
+
+def update_lc2_phone_map(engine, lc2_codes):
+    """
+    Add decodes for LC2 codes not yet in the map, in one transaction
+
+    Args:
+        engine: SQLAlchemy engine
+        lc2_codes: Series of raw LC2 codes (e.g. from an MIS upload)
+
+    Returns:
+        tuple: (number of codes added, error message)
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(CREATE_LC2_MAP_SQL))
+            known = set(pd.read_sql(text(f'SELECT lc2_code FROM "{LC2_MAP_TABLE}"'), conn)["lc2_code"])
+            codes = normalize_lc2(pd.Series(lc2_codes))
+            added = _append_decodes(conn, codes[~codes.isin(known)])
+        return added, None
+    except Exception as e:
+        return None, str(e)
+
+
+def _append_decodes(conn, codes):
+    """Decode codes (all absent from the map) and append them; returns the number added"""
+    if len(codes) == 0:
+        return 0
+    new_rows = build_lc2_phone_map(codes)
+    new_rows.to_sql(LC2_MAP_TABLE, conn, if_exists="append", index=False, chunksize=10000)
+    return len(new_rows)
+
+
+def sync_lc2_phone_map(engine, source_table=TABLES["MIS_DATA"], lc2_col=None):
+    """
+    Add decodes for MIS codes missing from the map
+
+    The missing codes are found with an anti-join in the database, so only
+    those codes (usually none) are transferred.
+
+    Args:
+        lc2_col: LC2 column of source_table (default: resolved from its header)
+
+    Returns:
+        tuple: (number of codes added, error message)
+    """
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(CREATE_LC2_MAP_SQL))
+            lc2_expr = _lc2_sql(f'm."{lc2_col or table_lc2_column(conn, source_table)}"')
+            missing_sql = f"""
+                SELECT DISTINCT {lc2_expr} AS lc2_code
+                FROM "{source_table}" m
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM "{LC2_MAP_TABLE}" p WHERE p.lc2_code = {lc2_expr}
+                )
+            """
+            missing = pd.read_sql(text(missing_sql), conn)["lc2_code"]
+            added = _append_decodes(conn, missing)
+        return added, None
+    except Exception as e:
+        return None, str(e)
+
+
+def extract_phone_numbers_sql(engine, source_table=TABLES["MIS_DATA"],
+                              campaign_table=TABLES["CAMPAIGN_DATA"], lc2_col=None):
+    """
+    Phone extraction with the LC2 normalization and campaign join run in Postgres
+
+    Phones derived from LC2 codes come from the map (brought up to date
+    first); other codes have their CG prefix stripped and are looked up in
+    the campaign table through the seqId expression index (created on the
+    first extraction); a seqId listed more than once resolves to its first
+    row in table order, as in the pandas path. Only the final rows are
+    transferred.
+
+    Args:
+        lc2_col: LC2 column of source_table (default: resolved from its header
+            like the pandas path, see resolve_lc2_column)
+
+    Returns:
+        tuple: (DataFrame of MIS columns plus "seqId" and "FinalPhone", error message)
+    """
+    if lc2_col is None:
+        try:
+            with engine.connect() as conn:
+                lc2_col = table_lc2_column(conn, source_table)
+        except Exception as e:
+            return None, str(e)
+
+    added, error = sync_lc2_phone_map(engine, source_table, lc2_col)
+    if error:
+        return None, error
+
+    if campaign_table == TABLES["CAMPAIGN_DATA"]:
+        _, error = ensure_seq_id_index(engine)
+        if error:
+            return None, error
+
+    lc2_expr = _lc2_sql(f'm."{lc2_col}"')
+    seq_id_expr = _strip_sql(f"REGEXP_REPLACE(UPPER({lc2_expr}), '^CG', '')")
+    phone_expr = (
+        "REGEXP_REPLACE(REGEXP_REPLACE("
+        + _strip_sql("COALESCE(CAST(cd.\"phoneNo\" AS TEXT), '')")
+        + ", '\\.0$', ''), '\\D+', '', 'g')"
+    )
+    query = f"""
+        SELECT
+            m.*,
+            CASE WHEN p.derived_phone IS NULL THEN {seq_id_expr} END AS "seqId",
+            COALESCE(p.derived_phone, c.phone) AS "FinalPhone"
+        FROM "{source_table}" m
+        LEFT JOIN "{LC2_MAP_TABLE}" p ON p.lc2_code = {lc2_expr}
+        LEFT JOIN LATERAL (
+            SELECT {phone_expr} AS phone
+            FROM "{campaign_table}" cd
+            WHERE p.derived_phone IS NULL
+              AND {_seq_id_sql('cd."seqId"')} = {seq_id_expr}
+              AND cd."storeSlug" ILIKE :store_slug
+            ORDER BY cd.ctid
+            LIMIT 1
+        ) c ON TRUE
+    """
+    try:
+        with engine.connect() as conn:
+            df = pd.read_sql(text(query), conn, params={"store_slug": "%hdfc%"})
+        return df, None
+    except Exception as e:
+        return None, str(e)
+
+
+def load_lc2_phone_map(engine):
+    """
+    Load the LC2 phone map table
+
+    Returns:
+        tuple: (DataFrame, error message)
+    """
+    try:
+        df = pd.read_sql(f'SELECT {", ".join(LC2_MAP_COLUMNS)} FROM "{LC2_MAP_TABLE}"', engine)
+        return df, None
+    except Exception as e:
+        return None, str(e)
+
+
+def get_lc2_phone_map(df_mis, lc2_col, engine=None, use_database=True):
+    """
+    LC2 phone map for the loaded MIS data, fetched or built once per data version
+
+    Uses the LC2_Phone_Map table when available, otherwise decodes the
+    distinct codes of the loaded frame.
+    """
+    if engine is not None and use_database:
+        db_map, error = cached(df_mis, "lc2_phone_map_table", lambda: load_lc2_phone_map(engine))
+        if not error:
+            return db_map
+    return cached(df_mis, ("lc2_phone_map", lc2_col), lambda: build_lc2_phone_map(df_mis[lc2_col]))
+
+
+def lookup_lc2_phones(lc2, lc2_map):
+    """
+    Derived phone and seqId for each LC2 code through the map
+
+    Codes missing from the map (e.g. rows not uploaded yet) are decoded on
+    the fly.
+
+    Args:
+        lc2: Series of normalized LC2 codes (see normalize_lc2)
+        lc2_map: DataFrame with LC2_MAP_COLUMNS
+
+    Returns:
+        tuple: (derived phone Series, seqId Series), aligned with lc2
+    """
+    missing = lc2[~lc2.isin(lc2_map["lc2_code"])]
+    if not missing.empty:
+        lc2_map = pd.concat([lc2_map, build_lc2_phone_map(missing)], ignore_index=True)
+    lookup = lc2_map.drop_duplicates(subset=["lc2_code"]).set_index("lc2_code")
+    return (
+        lc2.map(lookup["derived_phone"]).astype(lc2.dtype),
+        lc2.map(lookup["seq_id"]).astype(lc2.dtype)
+    )
@@ -0,0 +1,134 @@
+"""
+Local Query Engine
+Runs SQL console queries on the MIS and campaign frames already loaded in
+the session, in an embedded DuckDB connection that scans them in place
+"""
+
+import sys
+import os
+import threading
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # Local execution target unavailable
+    duckdb = None
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.mis_store import cached
+
+# The embedded database may only read the registered frames (no files,
+# extensions or network)
+LOCAL_DUCKDB_CONFIG = {"enable_external_access": False}
+
+# DuckDB infers the type of object columns from a sample of rows, which
+# holds for the whole column only if it has one kind of value
+UNIFORM_OBJECT_KINDS = {
+    "empty", "string", "bytes", "integer", "floating", "decimal", "boolean", "datetime", "date", "time"
+}
+
+
+def local_query_available():
+    """True when DuckDB is installed"""
+    return duckdb is not None
+
+
+def _normalize_object_columns(df):
+    """
+    Copy of a frame with its mixed object columns made uniform, or None if none are mixed
+
+    Integers mixed with floats become floats; any other mix (e.g. numbers
+    and text) becomes text, so no row can contradict the type DuckDB
+    infers from its sample.
+    """
+    converted = {}
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        kind = pd.api.types.infer_dtype(df[col], skipna=True)
+        if kind == "mixed-integer-float":
+            converted[col] = pd.to_numeric(df[col])
+        elif kind not in UNIFORM_OBJECT_KINDS:
+            converted[col] = df[col].astype("string")
+    if not converted:
+        return None
+    normalized = df.copy(deep=False)
+    for col, values in converted.items():
+        normalized[col] = values
+    return normalized
+
+
+def local_frame(df):
+    """Frame to register with DuckDB, normalized once per data version"""
+    normalized = cached(df, "duckdb_frame", lambda: _normalize_object_columns(df))
+    return df if normalized is None else normalized
+
+
+def run_local_query(frames, query, timeout_seconds=None, on_connect=None):
+    """
+    Run a query in a fresh in-memory DuckDB connection over the given frames
+
+    Each frame is registered as a view under its name in frames. DuckDB
+    scans the DataFrames' own column buffers, so no copy of the data is
+    made (apart from mixed object columns, see local_frame). Queries
+    running longer than timeout_seconds are interrupted.
+
+    Args:
+        frames: Dict of table name -> DataFrame
+        query: Read-only SELECT query
+        timeout_seconds: Interrupt the query after this many seconds (0 or None for no limit)
+        on_connect: Called with the connection before the query runs (e.g. to keep it for cancelling)
+
+    Returns:
+        tuple: (pa.Table of the result, error message)
+    """
+    if duckdb is None:
+        return None, "DuckDB is not installed (pip install duckdb)"
+    con = duckdb.connect(config=LOCAL_DUCKDB_CONFIG)
+    timer = None
+    timed_out = threading.Event()
+    try:
+        for name, df in frames.items():
+            con.register(name, local_frame(df))
+        if on_connect is not None:
+            on_connect(con)
+        if timeout_seconds:
+            def interrupt():
+                timed_out.set()
+                con.interrupt()
+
+            timer = threading.Timer(timeout_seconds, interrupt)
+            timer.daemon = True
+            timer.start()
+        result = con.execute(query)
+        table = result.to_arrow_table() if hasattr(result, "to_arrow_table") else result.fetch_arrow_table()
+        return table, None
+    except Exception as e:
+        if timed_out.is_set():
+            return None, f"Local query exceeded the {timeout_seconds}s timeout"
+        return None, str(e)
+    finally:
+        if timer is not None:
+            timer.cancel()
+        con.close()
+
+
+def iter_table_rows(table, batch_rows):
+    """
+    Rows of an Arrow table in batches, shaped like a cursor's fetchmany
+
+    At least one (possibly empty) batch is yielded, so the columns are
+    always known.
+
+    Yields:
+        tuple: (column names, list of row tuples)
+    """
+    columns = table.column_names
+    batches = table.to_batches(max_chunksize=batch_rows)
+    if not batches:
+        yield columns, []
+    for batch in batches:
+        yield columns, list(zip(*(column.to_pylist() for column in batch.columns)))
@@ -0,0 +1,245 @@
+"""
+Query Result Cache
+LRU cache of SQL console result pages, keyed by the normalized query text
+and the latest MIS_Update_Log entry of every table the query reads. Queries
+whose result depends on the clock or randomness are never cached.
+"""
+
+import re
+import sys
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from sqlalchemy import text
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database_config import TABLES
+
+QUERY_CACHE_MAX_ENTRIES = 32
+QUERY_CACHE_MAX_MB = 256
+
+# Results reading tables that MIS_Update_Log does not track expire after this
+UNTRACKED_TTL_SECONDS = 300
+
+# Table versions are looked up at most this often
+VERSION_CHECK_SECONDS = 10
+
+# Tables rebuilt from another table on upload share its version
+VERSION_SOURCE_TABLES = {
+    TABLES["MIS_DAILY_ROLLUP"]: TABLES["MIS_DATA"],
+    TABLES["LC2_PHONE_MAP"]: TABLES["MIS_DATA"]
+}
+
+_cache = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+_versions = {"checked_at": 0.0, "tables": None}
+_lock = threading.RLock()
+
+_SQL_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|((?:\s|--[^\n]*|/\*.*?\*/)+)", re.S)
+_FROM_LISTS = re.compile(
+    r"\b(?:FROM|JOIN)\s+([^()]*?)(?=\b(?:WHERE|GROUP|ORDER|LIMIT|OFFSET|HAVING|UNION|EXCEPT|INTERSECT|"
+    r"JOIN|ON|USING|LEFT|RIGHT|INNER|FULL|CROSS|NATURAL|WINDOW|FETCH|FOR)\b|[()]|$)",
+    re.I | re.S
+)
+# Functions and keywords whose value changes between executions (Postgres volatile/stable)
+_VOLATILE_SQL = re.compile(
+    r"\b(?:now|random|setseed|clock_timestamp|statement_timestamp|transaction_timestamp|timeofday|"
+    r"gen_random_uuid|uuid_generate_v[14]|nextval|currval|lastval|pg_sleep)\s*\(|"
+    r"\b(?:current_date|current_time|current_timestamp|localtime|localtimestamp)\b",
+    re.I
+)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_QUOTED = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_TABLE_NAME = re.compile(r'\s*((?:(?:"(?:[^"]|"")+"|[A-Za-z_][\w$]*)\s*\.\s*)*)("(?:[^"]|"")+"|[A-Za-z_][\w$]*)')
+
+
+def normalize_sql(query):
+    """Query text with comments removed and whitespace collapsed outside quotes"""
+    def replace(match):
+        return match.group(1) if match.group(1) else " "
+
+    return _SQL_TOKENS.sub(replace, query).strip().rstrip(";").strip()
+
+
+def referenced_tables(query):
+    """
+    Table names in the FROM and JOIN lists of a query
+
+    Unquoted names are folded to lower case as Postgres does. CTE and
+    function names are returned too; being untracked they only shorten
+    the cache lifetime.
+
+    Returns:
+        set: Table names
+    """
+    tables = set()
+    # String literals may contain FROM/JOIN text
+    for match in _FROM_LISTS.finditer(_STRING_LITERAL.sub("''", normalize_sql(query))):
+        for item in match.group(1).split(","):
+            name = _TABLE_NAME.match(item)
+            if name is None:
+                continue
+            table = name.group(2)
+            tables.add(table[1:-1].replace('""', '"') if table.startswith('"') else table.lower())
+    return tables
+
+
+def is_volatile_query(query):
+    """
+    True if the query calls a function whose result changes between runs
+
+    Covers the current date and time (now(), CURRENT_DATE, ...), random
+    values and sequences; quoted strings and identifiers are ignored.
+    """
+    return _VOLATILE_SQL.search(_QUOTED.sub(" ", normalize_sql(query))) is not None
+
+
+def invalidate_table_versions():
+    """Force the next lookup to re-read MIS_Update_Log (call after logging an update)"""
+    with _lock:
+        _versions["checked_at"] = 0.0
+
+
+def _latest_versions(engine):
+    """Latest MIS_Update_Log id per table, re-read at most every VERSION_CHECK_SECONDS"""
+    with _lock:
+        if _versions["tables"] is not None and time.monotonic() - _versions["checked_at"] < VERSION_CHECK_SECONDS:
+            return _versions["tables"]
+    try:
+        df = pd.read_sql(
+            text(f'SELECT table_name, MAX(id) AS version FROM "{TABLES["MIS_UPDATE_LOG"]}" GROUP BY table_name'),
+            engine
+        )
+        tables = dict(zip(df["table_name"], df["version"].astype(int)))
+    except Exception:
+        tables = {}
+    with _lock:
+        _versions["tables"] = tables
+        _versions["checked_at"] = time.monotonic()
+    return tables
+
+
+def query_cache_key(engine, query):
+    """
+    Cache key of a query at the current data version
+
+    Returns:
+        tuple: (key, ttl) where ttl is None when every referenced table is
+        tracked in MIS_Update_Log, else UNTRACKED_TTL_SECONDS; (None, None)
+        for volatile queries, which must not be cached
+    """
+    if is_volatile_query(query):
+        return None, None
+    latest = _latest_versions(engine)
+    versions = []
+    tracked = True
+    for table in sorted(referenced_tables(query)):
+        version = latest.get(VERSION_SOURCE_TABLES.get(table, table))
+        tracked = tracked and version is not None
+        versions.append((table, version))
+    return (normalize_sql(query), tuple(versions)), None if tracked else UNTRACKED_TTL_SECONDS
+
+
+def _live_entry(key):
+    """Cache entry for key moved to the most recently used end, or None if absent or expired"""
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    if entry["expires_at"] is not None and time.monotonic() > entry["expires_at"]:
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return entry
+
+
+def _evict():
+    """Drop least recently used entries beyond the entry and memory limits"""
+    max_bytes = QUERY_CACHE_MAX_MB * 1024 * 1024
+    while _cache and (len(_cache) > QUERY_CACHE_MAX_ENTRIES or sum(e["bytes"] for e in _cache.values()) > max_bytes):
+        _cache.popitem(last=False)
+
+
+def get_cached_page(key, page_size, page, record=False):
+    """
+    Cached result page, or None
+
+    Args:
+        record: Count the lookup as a hit or miss in the cache statistics
+
+    Returns:
+        DataFrame or None
+    """
+    with _lock:
+        entry = _live_entry(key)
+        df = None if entry is None else entry["pages"].get((page_size, page))
+        if record:
+            _stats["hits" if df is not None else "misses"] += 1
+        return df
+
+
+def get_cached_count(key):
+    """Cached total row count of a result, or None"""
+    with _lock:
+        entry = _live_entry(key)
+        return None if entry is None else entry["count"]
+
+
+def _entry_for(key, ttl):
+    """Cache entry for key, creating an empty one if needed"""
+    entry = _live_entry(key)
+    if entry is None:
+        entry = {
+            "pages": {},
+            "count": None,
+            "bytes": 0,
+            "expires_at": None if ttl is None else time.monotonic() + ttl
+        }
+        _cache[key] = entry
+    return entry
+
+
+def cache_page(key, ttl, page_size, page, df):
+    """Store one fetched result page"""
+    size = int(df.memory_usage(deep=True).sum())
+    with _lock:
+        entry = _entry_for(key, ttl)
+        previous = entry["pages"].get((page_size, page))
+        if previous is not None:
+            entry["bytes"] -= int(previous.memory_usage(deep=True).sum())
+        entry["pages"][(page_size, page)] = df
+        entry["bytes"] += size
+        _evict()
+
+
+def cache_count(key, ttl, count):
+    """Store the total row count of a result"""
+    with _lock:
+        _entry_for(key, ttl)["count"] = count
+        _evict()
+
+
+def query_cache_stats():
+    """
+    Cache statistics
+
+    Returns:
+        dict: entries, size_mb, hits, misses
+    """
+    with _lock:
+        return {
+            "entries": len(_cache),
+            "size_mb": sum(e["bytes"] for e in _cache.values()) / (1024 * 1024),
+            "hits": _stats["hits"],
+            "misses": _stats["misses"]
+        }
+
+
+def clear_query_cache():
+    """Drop every cached result"""
+    with _lock:
+        _cache.clear()
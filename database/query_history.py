@@ -0,0 +1,243 @@
+"""
+Query History
+Local SQLite log of SQL console executions with first-page timing, size
+and cache statistics, summarized into the slowest, most frequent and
+slowing queries
+"""
+
+import hashlib
+import sqlite3
+import sys
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.query_cache import normalize_sql
+
+# Default history location: <project root>/.cache/query_history.sqlite3
+DEFAULT_HISTORY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "query_history.sqlite3"
+)
+
+# Oldest executions beyond this are pruned on insert
+QUERY_HISTORY_MAX_ROWS = 5000
+
+# A query is flagged as slowing when the median of its last SLOWDOWN_RECENT_RUNS
+# database runs is SLOWDOWN_RATIO times the median of its earlier runs
+SLOWDOWN_RECENT_RUNS = 3
+SLOWDOWN_MIN_RUNS = 6
+SLOWDOWN_RATIO = 1.5
+
+# The console pages results, so an execution is timed and sized up to its
+# first page: duration_ms is the time to the first page (or the error) and
+# bytes the in-memory size of that page
+HISTORY_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS query_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    executed_at TEXT NOT NULL,
+    query_hash TEXT NOT NULL,
+    query TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    rows INTEGER,
+    bytes INTEGER,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    target TEXT NOT NULL DEFAULT 'database'
+);
+CREATE INDEX IF NOT EXISTS idx_query_history_hash ON query_history (query_hash, executed_at);
+"""
+
+HISTORY_SUMMARY_COLUMNS = [
+    "query_hash", "target", "query", "runs", "errors", "cache_hits", "last_run", "avg_ms", "max_ms", "last_ms",
+    "baseline_ms", "recent_ms", "slowdown", "slowing"
+]
+
+_lock = threading.Lock()
+_initialized = set()
+
+
+def _connect(path):
+    """SQLite connection to the history file, creating it on first use"""
+    path = path or DEFAULT_HISTORY_PATH
+    conn = sqlite3.connect(path, timeout=10)
+    if path not in _initialized:
+        conn.executescript(HISTORY_SCHEMA_SQL)
+        # History files from before execution targets were logged
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(query_history)")}
+        if "target" not in columns:
+            conn.execute("ALTER TABLE query_history ADD COLUMN target TEXT NOT NULL DEFAULT 'database'")
+        _initialized.add(path)
+    return conn
+
+
+def query_hash(query):
+    """Stable id of a query, ignoring comments, whitespace and a trailing semicolon"""
+    return hashlib.sha1(normalize_sql(query).encode("utf-8")).hexdigest()
+
+
+def record_query(query, duration_ms, rows=None, bytes_returned=None, cache_hit=False, error=None,
+                 target="database", path=None):
+    """
+    Log one query execution
+
+    Args:
+        query: Executed query text
+        duration_ms: Time to the first page of rows (or to the error)
+        rows: Total result rows, if known (see set_query_rows)
+        bytes_returned: In-memory size of the first page of rows
+        cache_hit: Whether the rows came from the query result cache
+        error: Error message of a failed execution
+        target: Where the query ran ("database" or "local")
+        path: History file (defaults to DEFAULT_HISTORY_PATH)
+
+    Returns:
+        tuple: (history entry id, error message)
+    """
+    try:
+        with _lock:
+            if path is None:
+                os.makedirs(os.path.dirname(DEFAULT_HISTORY_PATH), exist_ok=True)
+            conn = _connect(path)
+            try:
+                with conn:
+                    cursor = conn.execute(
+                        "INSERT INTO query_history "
+                        "(executed_at, query_hash, query, duration_ms, rows, bytes, cache_hit, error, target) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            datetime.now().isoformat(timespec="seconds"), query_hash(query), query.strip(),
+                            float(duration_ms), rows, bytes_returned, int(bool(cache_hit)), error, target
+                        )
+                    )
+                    conn.execute(
+                        "DELETE FROM query_history WHERE id <= ?",
+                        (cursor.lastrowid - QUERY_HISTORY_MAX_ROWS,)
+                    )
+                return cursor.lastrowid, None
+            finally:
+                conn.close()
+    except Exception as e:
+        return None, str(e)
+
+
+def set_query_rows(entry_id, rows, path=None):
+    """
+    Fill in the total row count of a logged execution once it is known
+
+    Returns:
+        tuple: (True if updated, error message)
+    """
+    try:
+        with _lock:
+            conn = _connect(path)
+            try:
+                with conn:
+                    conn.execute("UPDATE query_history SET rows = ? WHERE id = ?", (int(rows), entry_id))
+                return True, None
+            finally:
+                conn.close()
+    except Exception as e:
+        return None, str(e)
+
+
+def load_query_history(path=None, limit=None):
+    """
+    Logged executions, newest first
+
+    Returns:
+        tuple: (DataFrame, error message)
+    """
+    if not os.path.exists(path or DEFAULT_HISTORY_PATH):
+        return pd.DataFrame(
+            columns=[
+                "id", "executed_at", "query_hash", "query", "duration_ms", "rows", "bytes", "cache_hit", "error",
+                "target"
+            ]
+        ), None
+    try:
+        with _lock:
+            conn = _connect(path)
+            try:
+                df = pd.read_sql_query(
+                    "SELECT * FROM query_history ORDER BY id DESC" + (f" LIMIT {int(limit)}" if limit else ""),
+                    conn
+                )
+            finally:
+                conn.close()
+        df["executed_at"] = pd.to_datetime(df["executed_at"])
+        df["cache_hit"] = df["cache_hit"].astype(bool)
+        return df, None
+    except Exception as e:
+        return None, str(e)
+
+
+def summarize_query_history(history):
+    """
+    Per-query statistics of a history frame, per execution target
+
+    Timings (times to the first page) only count successful runs served by
+    the database; cache hits and errors are counted separately. Queries with at least
+    SLOWDOWN_MIN_RUNS database runs are flagged as slowing when their
+    recent median time is SLOWDOWN_RATIO times their earlier median.
+
+    Returns:
+        DataFrame: HISTORY_SUMMARY_COLUMNS, one row per query and target
+    """
+    if history.empty:
+        return pd.DataFrame(columns=HISTORY_SUMMARY_COLUMNS)
+
+    history = history.sort_values("id")
+    failed = history["error"].notna()
+    timed = history[~failed & ~history["cache_hit"]]
+    keys = ["query_hash", "target"]
+    grouped = history.groupby(keys, sort=False)
+    summary = pd.DataFrame({
+        "query": grouped["query"].last(),
+        "runs": grouped.size(),
+        "errors": failed.groupby([history["query_hash"], history["target"]]).sum(),
+        "cache_hits": grouped["cache_hit"].sum(),
+        "last_run": grouped["executed_at"].max()
+    })
+
+    timing = timed.groupby(keys)["duration_ms"]
+    summary["avg_ms"] = timing.mean()
+    summary["max_ms"] = timing.max()
+    summary["last_ms"] = timing.last()
+
+    # Recent vs earlier median of database runs
+    position_from_end = timed.groupby(keys).cumcount(ascending=False)
+    recent = position_from_end < SLOWDOWN_RECENT_RUNS
+    summary["baseline_ms"] = timed[~recent].groupby(keys)["duration_ms"].median()
+    summary["recent_ms"] = timed[recent].groupby(keys)["duration_ms"].median()
+    summary["slowdown"] = summary["recent_ms"] / summary["baseline_ms"]
+    enough_runs = timing.size().reindex(summary.index, fill_value=0) >= SLOWDOWN_MIN_RUNS
+    summary["slowing"] = enough_runs & (summary["slowdown"] >= SLOWDOWN_RATIO)
+
+    return summary.reset_index()[HISTORY_SUMMARY_COLUMNS]
+
+
+def clear_query_history(path=None):
+    """
+    Delete every logged execution
+
+    Returns:
+        tuple: (rows deleted, error message)
+    """
+    if not os.path.exists(path or DEFAULT_HISTORY_PATH):
+        return 0, None
+    try:
+        with _lock:
+            conn = _connect(path)
+            try:
+                with conn:
+                    deleted = conn.execute("DELETE FROM query_history").rowcount
+                return deleted, None
+            finally:
+                conn.close()
+    except Exception as e:
+        return None, str(e)
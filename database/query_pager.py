@@ -0,0 +1,733 @@
+"""
+Query Pager
+Runs SQL console queries through a server-side cursor and fetches one page
+of rows at a time, with the total row count estimated by the planner and
+counted exactly in the background. Pages and counts go through the query
+result cache, so a repeated query only opens a cursor for uncached pages.
+Every statement runs under a statement_timeout, and pages are fetched in
+a worker thread that can be cancelled with pg_cancel_backend. Console
+statements use their own bounded connection pool, cancels a dedicated
+connection, and idle cursors give their connection back. Local pagers
+run the query in embedded DuckDB over session frames instead and page
+through its Arrow result.
+"""
+
+import json
+import re
+import sys
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.local_query import run_local_query
+from database.query_cache import (
+    cache_count, cache_page, get_cached_count, get_cached_page, normalize_sql, query_cache_key
+)
+from utils.export_service import EXPORT_CHUNK_ROWS
+
+QUERY_PAGE_SIZE_OPTIONS = [100, 500, 1000, 5000]
+DEFAULT_QUERY_PAGE_SIZE = 1000
+
+# Per-statement limit for console queries (0 disables it)
+DEFAULT_STATEMENT_TIMEOUT_SECONDS = 60
+
+# Fetches finishing within this wait are returned without a running state
+FETCH_WAIT_SECONDS = 0.25
+
+# Console statements check out connections from a separate bounded pool, so
+# open result tabs never take the connections the dashboard modules need
+CONSOLE_POOL_SIZE = 4
+CONSOLE_MAX_OVERFLOW = 6
+CONSOLE_POOL_TIMEOUT_SECONDS = 30
+
+# A statement holds at most two console connections at once (its cursor and
+# its row estimate or count), so the process-wide slots are sized to let
+# every statement get its second connection; further statements wait for a
+# slot (releasing idle cursors) instead of deadlocking the pool
+CONSOLE_STATEMENT_SLOTS = (CONSOLE_POOL_SIZE + CONSOLE_MAX_OVERFLOW) // 2
+SLOT_WAIT_SECONDS = 30
+
+# A cursor connection unused this long is released; the next page of that
+# result declares the cursor again
+CURSOR_IDLE_SECONDS = 120
+CURSOR_REAP_INTERVAL_SECONDS = 15
+
+# Quoted strings, comments and dollar-quoted bodies may contain semicolons
+_STATEMENT_TOKENS = re.compile(
+    r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/|\$(\w*)\$.*?\$\1\$|(;)", re.S
+)
+
+
+def strip_statement(query):
+    """Query text without surrounding whitespace and trailing semicolons"""
+    return query.strip().rstrip(";").strip()
+
+
+def split_statements(query):
+    """
+    Split query text into statements on top-level semicolons
+
+    Semicolons inside quotes, comments and dollar-quoted strings are kept;
+    statements holding nothing but whitespace and comments are dropped.
+
+    Returns:
+        list: Statement texts, without their semicolons
+    """
+    statements = []
+    start = 0
+    for match in _STATEMENT_TOKENS.finditer(query):
+        if match.group(2):
+            statements.append(query[start:match.start()])
+            start = match.end()
+    statements.append(query[start:])
+    return [statement.strip() for statement in statements if normalize_sql(statement)]
+
+
+# Per database engine: {"pager": bounded console engine, "cancel": one-connection engine}
+_console_engines = {}
+_console_lock = threading.Lock()
+
+# Statement slots shared by every session of the process
+_slots = threading.BoundedSemaphore(CONSOLE_STATEMENT_SLOTS)
+_slot_lock = threading.Lock()
+
+# Pagers holding a cursor connection between fetches, least recently used first
+_idle_cursors = OrderedDict()
+_idle_lock = threading.Lock()
+_reaper = None
+
+
+def console_engines(engine):
+    """
+    Engines the console runs on for a database engine, created on first use
+
+    Postgres statements go through a bounded pool of their own and cancels
+    through a dedicated connection that is never busy with a query. Other
+    dialects (e.g. a local SQLite file) use the given engine for both.
+
+    Returns:
+        tuple: (paging engine, cancel engine)
+    """
+    if engine.dialect.name != "postgresql":
+        return engine, engine
+    with _console_lock:
+        engines = _console_engines.get(id(engine))
+        if engines is None:
+            engines = {
+                "pager": create_engine(
+                    engine.url, pool_size=CONSOLE_POOL_SIZE, max_overflow=CONSOLE_MAX_OVERFLOW,
+                    pool_timeout=CONSOLE_POOL_TIMEOUT_SECONDS, pool_pre_ping=True
+                ),
+                "cancel": create_engine(engine.url, pool_size=1, max_overflow=0, pool_pre_ping=True)
+            }
+            _console_engines[id(engine)] = engines
+    return engines["pager"], engines["cancel"]
+
+
+def _subquery(query, alias):
+    """Query wrapped as a derived table; the newline ends a trailing -- comment before the parenthesis"""
+    return f"({query}\n) AS {alias}"
+
+
+def _acquire_slot():
+    """
+    Take a statement slot, releasing least recently used idle cursors while none is free
+
+    Returns:
+        bool: False if no slot freed up within SLOT_WAIT_SECONDS
+    """
+    deadline = time.monotonic() + SLOT_WAIT_SECONDS
+    while not _slots.acquire(blocking=False):
+        with _idle_lock:
+            idle = list(_idle_cursors.values())
+        if any(release_idle_cursor(pager) for pager in idle):
+            continue
+        wait = deadline - time.monotonic()
+        if wait <= 0:
+            return False
+        if _slots.acquire(timeout=min(wait, 1.0)):
+            break
+    return True
+
+
+def _hold_slot(pager, holder):
+    """
+    Register a connection holder ("cursor", "estimate" or "count") on the pager's statement slot
+
+    The first holder takes the slot; later holders of the same pager share it.
+
+    Returns:
+        str: Error message, or None
+    """
+    with _slot_lock:
+        if pager["holds"]:
+            pager["holds"].add(holder)
+            return None
+    if not _acquire_slot():
+        return f"All {CONSOLE_STATEMENT_SLOTS} SQL console connections are busy; try again shortly"
+    with _slot_lock:
+        shared = bool(pager["holds"])
+        pager["holds"].add(holder)
+    if shared:  # Another holder of this pager took a slot meanwhile
+        _slots.release()
+    return None
+
+
+def _drop_slot(pager, holder):
+    """Remove a connection holder, giving the slot back when it was the last one"""
+    with _slot_lock:
+        if holder not in pager["holds"]:
+            return
+        pager["holds"].discard(holder)
+        last = not pager["holds"]
+    if last:
+        _slots.release()
+
+
+def _rows_to_frame(rows, description):
+    """DataFrame from DBAPI rows and cursor.description"""
+    columns = [col[0] for col in description] if description else []
+    return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+
+def _checkout(engine, timeout_seconds):
+    """
+    Console pool DBAPI connection with statement_timeout set for its transaction
+
+    Returns:
+        tuple: (connection, backend PID or None for non-Postgres engines)
+    """
+    raw = console_engines(engine)[0].raw_connection()
+    if engine.dialect.name != "postgresql":
+        return raw, None
+    try:
+        if timeout_seconds:
+            raw.cursor().execute(f"SET LOCAL statement_timeout = {int(timeout_seconds * 1000)}")
+        return raw, raw.driver_connection.get_backend_pid()
+    except Exception:
+        raw.rollback()
+        raw.close()
+        raise
+
+
+def _cancel_backend(engine, raw, pid):
+    """Cancel the statement running on a connection (pg_cancel_backend, or the driver's interrupt)"""
+    try:
+        if pid is not None:
+            with console_engines(engine)[1].connect() as conn:
+                conn.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": pid})
+        else:
+            interrupt = getattr(getattr(raw, "driver_connection", raw), "interrupt", None)
+            if interrupt is not None:
+                interrupt()
+    except Exception:
+        pass
+
+
+def estimate_row_count(engine, query, timeout_seconds=DEFAULT_STATEMENT_TIMEOUT_SECONDS):
+    """
+    Planner row estimate for a query, from EXPLAIN (FORMAT JSON) without running it
+
+    Returns:
+        tuple: (estimated rows, error message)
+    """
+    try:
+        raw, _ = _checkout(engine, timeout_seconds)
+    except Exception as e:
+        return None, str(e)
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {strip_statement(query)}")
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), None
+    except Exception as e:
+        return None, str(e)
+    finally:
+        raw.rollback()
+        raw.close()
+
+
+def _count_rows(pager):
+    """Exact row count of the pager's query on its own connection (runs in a thread)"""
+    error = _hold_slot(pager, "count")
+    if error:
+        pager["count_error"] = error
+        return
+    try:
+        raw, pid = _checkout(pager["engine"], pager["timeout"])
+    except Exception as e:
+        _drop_slot(pager, "count")
+        pager["count_error"] = str(e)
+        return
+    pager["count_connection"] = (raw, pid)
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {_subquery(pager['query'], 'counted_rows')}")
+        pager["count"] = int(cursor.fetchone()[0])
+        if pager["cache_key"] is not None:
+            cache_count(pager["cache_key"], pager["cache_ttl"], pager["count"])
+    except Exception as e:
+        if not pager["closed"]:
+            pager["count_error"] = str(e)
+    finally:
+        pager["count_connection"] = None
+        try:
+            raw.rollback()
+            raw.close()
+        except Exception:
+            pass
+        _drop_slot(pager, "count")
+
+
+def _start_count(pager):
+    """Count the pager's rows in a background thread"""
+    pager["count_thread"] = threading.Thread(target=_count_rows, args=(pager,), daemon=True)
+    pager["count_thread"].start()
+
+
+def _declare_cursor(pager):
+    """
+    Check out a connection and declare the query's cursor
+
+    With psycopg2 the query runs in a scrollable named cursor on a
+    connection held until the result is read in one page, the cursor idles
+    for CURSOR_IDLE_SECONDS or close_query_pager(); other drivers page with
+    LIMIT/OFFSET on a connection released after every page.
+
+    Returns:
+        str: Error message, or None
+    """
+    error = _hold_slot(pager, "cursor")
+    if error:
+        return error
+    try:
+        raw, pid = _checkout(pager["engine"], pager["timeout"])
+    except Exception as e:
+        _drop_slot(pager, "cursor")
+        return str(e)
+    try:
+        try:
+            cursor = raw.cursor(name=f"sql_console_{uuid.uuid4().hex}", scrollable=True)
+        except TypeError:  # Driver without named (server-side) cursors
+            cursor = None
+        if cursor is not None:
+            cursor.execute(pager["query"])
+    except Exception as e:
+        raw.rollback()
+        raw.close()
+        _drop_slot(pager, "cursor")
+        return str(e)
+    pager["connection"] = raw
+    pager["backend_pid"] = pid
+    pager["cursor"] = cursor
+    return None
+
+
+def _release_cursor(pager):
+    """Close the pager's cursor and return its connection to the pool (caller holds pager["lock"])"""
+    with _idle_lock:
+        _idle_cursors.pop(pager["id"], None)
+    raw, cursor = pager["connection"], pager["cursor"]
+    pager["connection"], pager["backend_pid"], pager["cursor"] = None, None, None
+    if raw is None:
+        return
+    try:
+        if cursor is not None:
+            cursor.close()
+        raw.rollback()
+        raw.close()
+    except Exception:
+        pass
+    _drop_slot(pager, "cursor")
+
+
+def _mark_idle(pager):
+    """Register the pager's cursor connection as idle, starting the idle reaper on first use"""
+    global _reaper
+    with _idle_lock:
+        pager["idle_since"] = time.monotonic()
+        _idle_cursors[pager["id"]] = pager
+        _idle_cursors.move_to_end(pager["id"])
+        if _reaper is None:
+            _reaper = threading.Thread(target=_reap_idle_cursors, daemon=True)
+            _reaper.start()
+
+
+def release_idle_cursor(pager, idle_seconds=0):
+    """
+    Release a pager's cursor connection if it has been idle for idle_seconds
+
+    A pager in the middle of a fetch is left alone.
+
+    Returns:
+        bool: True if a connection was released
+    """
+    if not pager["lock"].acquire(blocking=False):
+        return False
+    try:
+        if pager["connection"] is None or time.monotonic() - pager["idle_since"] < idle_seconds:
+            return False
+        _release_cursor(pager)
+        return True
+    finally:
+        pager["lock"].release()
+
+
+def _reap_idle_cursors():
+    """Reaper thread body: release cursor connections idle for CURSOR_IDLE_SECONDS"""
+    while True:
+        time.sleep(CURSOR_REAP_INTERVAL_SECONDS)
+        cutoff = time.monotonic() - CURSOR_IDLE_SECONDS
+        with _idle_lock:
+            stale = [pager for pager in _idle_cursors.values() if pager["idle_since"] <= cutoff]
+        for pager in stale:
+            release_idle_cursor(pager, CURSOR_IDLE_SECONDS)
+
+
+def _fetch_rows(pager, offset, size):
+    """
+    One page of rows from the pager's cursor, declaring it first if needed (caller holds pager["lock"])
+
+    Returns:
+        tuple: (DataFrame of the page, error message)
+    """
+    if pager["connection"] is None:
+        error = _declare_cursor(pager)
+        if error:
+            return None, error
+    try:
+        if pager["cursor"] is not None:
+            pager["cursor"].scroll(offset, mode="absolute")
+            rows = pager["cursor"].fetchmany(size)
+            description = pager["cursor"].description
+        else:
+            cursor = pager["connection"].cursor()
+            cursor.execute(f"SELECT * FROM {_subquery(pager['query'], 'paged_rows')} LIMIT {size} OFFSET {offset}")
+            rows = cursor.fetchall()
+            description = cursor.description
+    except Exception as e:
+        return None, str(e)
+    return _rows_to_frame(rows, description), None
+
+
+def open_query_pager(engine, query, page_size=DEFAULT_QUERY_PAGE_SIZE, use_cache=True,
+                     timeout_seconds=DEFAULT_STATEMENT_TIMEOUT_SECONDS):
+    """
+    Prepare a query for paging and start counting its rows
+
+    When the first page is cached for the current data version nothing is
+    sent to the database; otherwise the cursor is declared here so query
+    errors surface immediately. No rows are fetched here.
+
+    Args:
+        engine: SQLAlchemy engine
+        query: Read-only SELECT query
+        page_size: Rows per page
+        use_cache: Serve and store pages through the query result cache
+        timeout_seconds: statement_timeout for every statement (0 for none)
+
+    Returns:
+        tuple: (pager dict, error message)
+    """
+    opened_at = time.monotonic()
+    query = strip_statement(query)
+    cache_key, cache_ttl = query_cache_key(engine, query) if use_cache else (None, None)
+    pager = _new_pager(engine, query, page_size, timeout_seconds, opened_at, cache_key, cache_ttl)
+
+    if cache_key is None or get_cached_page(cache_key, page_size, 0) is None:
+        error = _declare_cursor(pager)
+        if error:
+            return None, error
+        if pager["count"] is None and _hold_slot(pager, "estimate") is None:
+            try:
+                pager["estimate"] = estimate_row_count(engine, query, timeout_seconds)[0]
+            finally:
+                _drop_slot(pager, "estimate")
+        _mark_idle(pager)
+    if pager["count"] is None:
+        _start_count(pager)
+    return pager, None
+
+
+def open_local_pager(frames, query, page_size=DEFAULT_QUERY_PAGE_SIZE,
+                     timeout_seconds=DEFAULT_STATEMENT_TIMEOUT_SECONDS):
+    """
+    Prepare a query for paging over session frames in embedded DuckDB
+
+    The query runs on the first page fetch (in the worker thread, so it
+    can be cancelled); its Arrow result is kept and sliced into pages, and
+    its row count is exact from then on. Local results bypass the query
+    result cache, which is keyed by database table versions.
+
+    Args:
+        frames: Dict of table name -> DataFrame
+        query: Read-only SELECT query
+        page_size: Rows per page
+        timeout_seconds: Interrupt the query after this many seconds (0 for none)
+
+    Returns:
+        tuple: (pager dict, error message)
+    """
+    pager = _new_pager(None, strip_statement(query), page_size, timeout_seconds, time.monotonic())
+    pager["frames"] = frames
+    return pager, None
+
+
+def _new_pager(engine, query, page_size, timeout_seconds, opened_at, cache_key=None, cache_ttl=None):
+    """Pager dict with nothing fetched yet"""
+    return {
+        "id": uuid.uuid4().hex,
+        "engine": engine,
+        "frames": None,
+        "result": None,
+        "query": query,
+        "cache_key": cache_key,
+        "cache_ttl": cache_ttl,
+        "timeout": timeout_seconds,
+        "connection": None,
+        "backend_pid": None,
+        "cursor": None,
+        "lock": threading.Lock(),
+        "holds": set(),
+        "idle_since": opened_at,
+        "page_size": page_size,
+        "page": None,
+        "page_df": None,
+        "page_cached": False,
+        "opened_at": opened_at,
+        "first_page_seconds": None,
+        "fetch": None,
+        "cancelled": False,
+        "estimate": None,
+        "count": None if cache_key is None else get_cached_count(cache_key),
+        "count_error": None,
+        "count_thread": None,
+        "count_connection": None,
+        "closed": False
+    }
+
+
+def _mark_first_page(pager):
+    """Record the seconds from opening the pager to its first page of rows (or its error)"""
+    if pager["first_page_seconds"] is None:
+        pager["first_page_seconds"] = time.monotonic() - pager["opened_at"]
+
+
+def fetch_query_page(pager, page, page_size=None):
+    """
+    Fetch one page of rows (0-based page number), reusing the last page if unchanged
+
+    Cached pages are returned without touching the database; the cursor is
+    declared on the first uncached page. A short page means the end of the
+    result, which also fixes the total row count before the background
+    count finishes.
+
+    Returns:
+        tuple: (DataFrame of the page, error message)
+    """
+    if page_size is not None and page_size != pager["page_size"]:
+        pager["page_size"] = page_size
+        pager["page"] = None
+    if pager["page"] == page and pager["page_df"] is not None:
+        return pager["page_df"], None
+
+    size = pager["page_size"]
+    offset = page * size
+    cache_key = pager["cache_key"]
+    if cache_key is not None:
+        df = get_cached_page(cache_key, size, page, record=True)
+        if df is not None:
+            pager["page"], pager["page_df"], pager["page_cached"] = page, df, True
+            _mark_first_page(pager)
+            return df, None
+
+    if pager["frames"] is not None:
+        error = _run_local(pager) if pager["result"] is None else None
+        if error:
+            _mark_first_page(pager)
+            return None, error
+        df = pager["result"].slice(offset, size).to_pandas()
+    else:
+        with pager["lock"]:
+            with _idle_lock:
+                _idle_cursors.pop(pager["id"], None)
+            df, error = _fetch_rows(pager, offset, size)
+            # Keep a scrollable cursor for further pages unless this page held the whole result
+            if error is None and pager["cursor"] is not None and not pager["closed"] and \
+                    not (offset == 0 and len(df) < size):
+                _mark_idle(pager)
+            else:
+                _release_cursor(pager)
+        if error:
+            _mark_first_page(pager)
+            return None, error
+
+    if len(df) < size and (len(df) or offset == 0):
+        pager["count"] = offset + len(df)
+        if cache_key is not None:
+            cache_count(cache_key, pager["cache_ttl"], pager["count"])
+    if cache_key is not None:
+        cache_page(cache_key, pager["cache_ttl"], size, page, df)
+    pager["page"], pager["page_df"], pager["page_cached"] = page, df, False
+    _mark_first_page(pager)
+    return df, None
+
+
+def _run_local(pager):
+    """
+    Run a local pager's query in DuckDB, keeping its connection for cancel_query() while it runs
+
+    Returns:
+        str: Error message, or None
+    """
+    def keep_connection(con):
+        pager["connection"] = con
+
+    table, error = run_local_query(pager["frames"], pager["query"], pager["timeout"], on_connect=keep_connection)
+    pager["connection"] = None
+    if error:
+        return error
+    pager["result"] = table
+    pager["count"] = table.num_rows
+    return None
+
+
+def iter_query_rows(engine, query, batch_rows=EXPORT_CHUNK_ROWS,
+                    timeout_seconds=DEFAULT_STATEMENT_TIMEOUT_SECONDS):
+    """
+    Stream a query's full result in row batches on a dedicated connection
+
+    With psycopg2 a forward-only named cursor keeps the result on the
+    server, so at most batch_rows rows are held at a time. At least one
+    (possibly empty) batch is yielded, so the columns are always known.
+    The export takes a statement slot of its own while it runs.
+
+    Yields:
+        tuple: (column names, list of row tuples)
+    """
+    if not _acquire_slot():
+        raise RuntimeError(f"All {CONSOLE_STATEMENT_SLOTS} SQL console connections are busy; try again shortly")
+    try:
+        raw, _ = _checkout(engine, timeout_seconds)
+    except Exception:
+        _slots.release()
+        raise
+    try:
+        try:
+            cursor = raw.cursor(name=f"sql_export_{uuid.uuid4().hex}")
+        except TypeError:  # Driver without named cursors; fetchmany still streams
+            cursor = raw.cursor()
+        cursor.execute(strip_statement(query))
+        first = True
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if rows or first:
+                yield [col[0] for col in cursor.description], rows
+            first = False
+            if len(rows) < batch_rows:
+                break
+        cursor.close()
+    finally:
+        raw.rollback()
+        raw.close()
+        _slots.release()
+
+
+def _run_fetch(pager, fetch):
+    """Worker thread body: fetch the requested page and record the outcome"""
+    fetch["df"], fetch["error"] = fetch_query_page(pager, fetch["page"], fetch["page_size"])
+    fetch["elapsed"] = time.monotonic() - fetch["started"]
+
+
+def request_query_page(pager, page, page_size, wait_seconds=FETCH_WAIT_SECONDS):
+    """
+    Page of rows without blocking on the database
+
+    Pages already at hand (current or cached) are returned directly; any
+    other page is fetched in a worker thread. Fetches not done within
+    wait_seconds are reported as running until they finish, so a wait of
+    0 just starts the fetch.
+
+    Returns:
+        tuple: (DataFrame or None, error message, running flag)
+    """
+    fetch = pager["fetch"]
+    if fetch is not None:
+        fetch["thread"].join(wait_seconds)
+        if fetch["thread"].is_alive():
+            return None, None, True
+        pager["fetch"] = None
+        if (fetch["page"], fetch["page_size"]) == (page, page_size):
+            return fetch["df"], fetch["error"], False
+
+    if page_size == pager["page_size"] and pager["page"] == page and pager["page_df"] is not None:
+        return pager["page_df"], None, False
+    if pager["cache_key"] is not None and get_cached_page(pager["cache_key"], page_size, page) is not None:
+        df, error = fetch_query_page(pager, page, page_size)
+        return df, error, False
+
+    fetch = {"page": page, "page_size": page_size, "started": time.monotonic(), "df": None, "error": None}
+    fetch["thread"] = threading.Thread(target=_run_fetch, args=(pager, fetch), daemon=True)
+    pager["fetch"] = fetch
+    fetch["thread"].start()
+    fetch["thread"].join(wait_seconds)
+    if fetch["thread"].is_alive():
+        return None, None, True
+    pager["fetch"] = None
+    return fetch["df"], fetch["error"], False
+
+
+def fetch_elapsed(pager):
+    """Seconds the running page fetch has taken so far (None when idle)"""
+    fetch = pager["fetch"]
+    if fetch is None:
+        return None
+    return fetch.get("elapsed", time.monotonic() - fetch["started"])
+
+
+def is_fetching(pager):
+    """True while a page is being fetched in the worker thread"""
+    return pager["fetch"] is not None and pager["fetch"]["thread"].is_alive()
+
+
+def is_counting(pager):
+    """True while the background row count is still running"""
+    thread = pager["count_thread"]
+    return pager["count"] is None and pager["count_error"] is None and thread is not None and thread.is_alive()
+
+
+def cancel_query(pager):
+    """Cancel the running page fetch and row count on their backends"""
+    pager["cancelled"] = True
+    if is_fetching(pager) and pager["connection"] is not None:
+        _cancel_backend(pager["engine"], pager["connection"], pager["backend_pid"])
+    count_connection = pager["count_connection"]
+    if count_connection is not None:
+        _cancel_backend(pager["engine"], *count_connection)
+
+
+def close_query_pager(pager):
+    """Cancel running statements, close the cursor and return the connection to the pool"""
+    pager["closed"] = True
+    cancel_query(pager)
+    if pager["fetch"] is not None:
+        pager["fetch"]["thread"].join(timeout=5)
+    pager["result"] = None
+    if pager["frames"] is not None:
+        return
+    # A fetch still running after the wait releases the connection itself once it finishes
+    if pager["lock"].acquire(timeout=5):
+        try:
+            _release_cursor(pager)
+        finally:
+            pager["lock"].release()
@@ -0,0 +1,103 @@
+"""
+Query Profiler
+EXPLAIN (ANALYZE, BUFFERS) of SQL console queries in a read-only
+transaction, flattened into per-node timings and row counts
+"""
+
+import json
+import sys
+import os
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database_config import TABLES
+from database.query_pager import DEFAULT_STATEMENT_TIMEOUT_SECONDS, strip_statement
+
+# Large tables whose sequential scans are flagged in the profile
+LARGE_TABLES = [TABLES["MIS_DATA"], TABLES["CAMPAIGN_DATA"]]
+
+PLAN_NODE_COLUMNS = [
+    "node", "relation", "total_ms", "self_ms", "estimated_rows", "actual_rows",
+    "loops", "shared_hit_blocks", "shared_read_blocks", "large_seq_scan"
+]
+
+
+def profile_query(engine, query, timeout_seconds=DEFAULT_STATEMENT_TIMEOUT_SECONDS):
+    """
+    Run EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) in a read-only transaction
+
+    The query is executed (that is how ANALYZE measures it) under
+    statement_timeout and rolled back; the read-only transaction rejects
+    any write it might attempt.
+
+    Returns:
+        tuple: (plan dict with "Plan", "Planning Time" and "Execution Time", error message)
+    """
+    try:
+        raw = engine.raw_connection()
+    except Exception as e:
+        return None, str(e)
+    try:
+        cursor = raw.cursor()
+        cursor.execute("SET TRANSACTION READ ONLY")
+        if timeout_seconds:
+            cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_seconds * 1000)}")
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {strip_statement(query)}")
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0], None
+    except Exception as e:
+        return None, str(e)
+    finally:
+        raw.rollback()
+        raw.close()
+
+
+def _node_total_ms(node):
+    """Inclusive time of a plan node over all its loops"""
+    return node.get("Actual Total Time", 0.0) * node.get("Actual Loops", 1)
+
+
+def plan_nodes(plan):
+    """
+    Flatten a plan tree into one row per node, in depth-first order
+
+    Times and rows are totals over all loops; self_ms excludes the time
+    of child nodes. Node labels are indented by depth.
+
+    Returns:
+        DataFrame: PLAN_NODE_COLUMNS
+    """
+    rows = []
+
+    def visit(node, depth):
+        children = node.get("Plans", [])
+        total_ms = _node_total_ms(node)
+        relation = node.get("Relation Name")
+        label = node["Node Type"]
+        if relation:
+            label += f" on {relation}"
+            if node.get("Alias") and node["Alias"] != relation:
+                label += f" {node['Alias']}"
+        loops = node.get("Actual Loops", 1)
+        rows.append({
+            "node": "    " * depth + ("→ " if depth else "") + label,
+            "relation": relation,
+            "total_ms": round(total_ms, 3),
+            "self_ms": round(max(total_ms - sum(_node_total_ms(child) for child in children), 0.0), 3),
+            "estimated_rows": node.get("Plan Rows", 0) * loops,
+            "actual_rows": node.get("Actual Rows", 0) * loops,
+            "loops": loops,
+            "shared_hit_blocks": node.get("Shared Hit Blocks", 0),
+            "shared_read_blocks": node.get("Shared Read Blocks", 0),
+            "large_seq_scan": node["Node Type"] == "Seq Scan" and relation in LARGE_TABLES
+        })
+        for child in children:
+            visit(child, depth + 1)
+
+    visit(plan["Plan"], 0)
+    return pd.DataFrame(rows, columns=PLAN_NODE_COLUMNS)
@@ -0,0 +1,132 @@
+"""
+Schema Catalog
+Tables, columns, row estimates and indexes of the public schema, loaded
+once per process for the SQL console and refreshed on demand or after DDL
+"""
+
+import threading
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import text
+
+CATALOG_COLUMNS_SQL = """
+SELECT table_name, column_name, data_type
+FROM information_schema.columns
+WHERE table_schema = 'public'
+ORDER BY table_name, ordinal_position
+"""
+
+CATALOG_TABLES_SQL = """
+SELECT table_name
+FROM information_schema.tables
+WHERE table_schema = 'public'
+ORDER BY table_name
+"""
+
+# reltuples is the planner's row estimate (-1 before the first ANALYZE)
+CATALOG_ROW_ESTIMATES_SQL = """
+SELECT c.relname AS table_name, c.reltuples::BIGINT AS row_estimate
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'm')
+"""
+
+CATALOG_INDEXES_SQL = """
+SELECT tablename AS table_name, indexname AS index_name, indexdef AS definition
+FROM pg_indexes
+WHERE schemaname = 'public'
+ORDER BY tablename, indexname
+"""
+
+# One catalog per engine, shared by every session of the process
+_catalogs = {}
+_lock = threading.Lock()
+
+
+def load_schema_catalog(engine):
+    """
+    Read the public schema catalog in one connection
+
+    Returns:
+        tuple: (catalog dict, error message). The catalog holds "tables"
+        (sorted names), "columns" and "indexes" (DataFrames per table),
+        "row_estimates" (table -> rows, None if never analyzed) and
+        "loaded_at"
+    """
+    try:
+        with engine.connect() as conn:
+            tables = pd.read_sql(text(CATALOG_TABLES_SQL), conn)["table_name"].tolist()
+            columns = pd.read_sql(text(CATALOG_COLUMNS_SQL), conn)
+            estimates = pd.read_sql(text(CATALOG_ROW_ESTIMATES_SQL), conn)
+            indexes = pd.read_sql(text(CATALOG_INDEXES_SQL), conn)
+    except Exception as e:
+        return None, str(e)
+
+    catalog = {
+        "tables": tables,
+        "columns": {
+            table: group[["column_name", "data_type"]].reset_index(drop=True)
+            for table, group in columns.groupby("table_name", sort=False)
+        },
+        "row_estimates": {
+            table: int(rows) if rows >= 0 else None
+            for table, rows in zip(estimates["table_name"], estimates["row_estimate"])
+        },
+        "indexes": {
+            table: group[["index_name", "definition"]].reset_index(drop=True)
+            for table, group in indexes.groupby("table_name", sort=False)
+        },
+        "loaded_at": datetime.now()
+    }
+    return catalog, None
+
+
+def get_schema_catalog(engine, refresh=False):
+    """
+    Schema catalog for an engine, loaded on first use and kept for the process
+
+    Failed loads are not kept, so the next call retries.
+
+    Args:
+        engine: SQLAlchemy engine
+        refresh: Reload even if a catalog is cached
+
+    Returns:
+        tuple: (catalog dict, error message)
+    """
+    with _lock:
+        catalog = None if refresh else _catalogs.get(id(engine))
+    if catalog is not None:
+        return catalog, None
+
+    catalog, error = load_schema_catalog(engine)
+    if catalog is not None:
+        with _lock:
+            _catalogs[id(engine)] = catalog
+    return catalog, error
+
+
+def invalidate_schema_catalog():
+    """Drop every cached catalog (call after DDL such as an MIS table replace)"""
+    with _lock:
+        _catalogs.clear()
+
+
+def catalog_identifiers(catalog):
+    """
+    Quoted table and column identifiers for query autocomplete
+
+    Returns:
+        list: (identifier, label) pairs, tables first, then columns by table
+    """
+    identifiers = [(f'"{table}"', f'"{table}" · table') for table in catalog["tables"]]
+    for table in catalog["tables"]:
+        columns = catalog["columns"].get(table)
+        if columns is None:
+            continue
+        identifiers.extend(
+            (f'"{column}"', f'"{column}" · {table} ({data_type})')
+            for column, data_type in zip(columns["column_name"], columns["data_type"])
+        )
+    return identifiers
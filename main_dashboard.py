@@ -13,6 +13,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # Import configuration
 from config import APP_TITLE, APP_ICON, PAGE_LAYOUT
 from database.connection import get_db_engine
+from database.daily_rollup import load_mis_version
+from utils.mis_store import set_source_version
 
 # Import modules
 from modules import phone_numbers
@@ -491,15 +493,21 @@ div, p, span, label, input, textarea, select {
 # -------------------------
 @st.cache_data(ttl=3600, show_spinner=False)  # Cache for 1 hour
 def load_mis_data_from_db(_engine):
-    """Load MIS data from database with caching"""
+    """
+    Load MIS data from database with caching
+
+    Returns:
+        tuple: (DataFrame, MIS data version it was loaded at, error message)
+    """
     import pandas as pd
 
     try:
+        version, _ = load_mis_version(_engine)
         df = pd.read_sql('SELECT * FROM "HDFC_MIS_Data"', _engine)
         df.columns = df.columns.str.strip()
-        return df, None
+        return df, version, None
     except Exception as e:
-        return None, str(e)
+        return None, None, str(e)
 
 
 def auto_load_data(engine):
@@ -511,9 +519,10 @@ def auto_load_data(engine):
             st.session_state.auto_load_attempted = True
 
             with st.spinner("🔄 Loading MIS data from database..."):
-                df, error = load_mis_data_from_db(engine)
+                df, version, error = load_mis_data_from_db(engine)
 
                 if df is not None and len(df) > 0:
+                    set_source_version(df, version)
                     st.session_state.mis_data = df
                     st.session_state.mis_filename = "Database (Auto-loaded)"
                     st.session_state.mis_source = "database"
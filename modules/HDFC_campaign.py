@@ -3,21 +3,34 @@ HDFC Campaign Analysis Module
 Analyze campaign performance across multiple channels
 """
 
+import multiprocessing
+import os
+import sys
+import numpy as np
 import pandas as pd
 import streamlit as st
-from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
-
-# Campaign costs configuration
-CAMPAIGN_COSTS = {
-    "SMS": 0.1,
-    "RCS": 0.085,
-    "Whatsapp Marketing": 0.8,
-    "Whatsapp Utility": 0.115,
-}
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.app_config import (
+    CAMPAIGN_COSTS, CAMPAIGN_COST_COMPONENTS, GOOGLE_SHEETS_URL, SHEETS_CACHE_TTL_SECONDS
+)
+from utils.date_utils import parse_dates_safely
+from utils.export_service import (
+    ARROW_STREAM_MIME, CSV_MIME, EXCEL_MIME, EXPORT_MEMORY_NOTE, PARQUET_MIME, export_arrow, export_csv, export_excel,
+    export_parquet, read_export_file
+)
+from utils.mis_store import (
+    cached_latest, count_status, encode_status, encode_values, filter_date_ranges, get_date_index, get_date_range,
+    get_parsed_dates
+)
+from utils.sheets_cache import fetch_sheet_csv
 
 # Final status mapping
 FINAL_STATUS_MAP = {
@@ -28,6 +41,15 @@ FINAL_STATUS_MAP = {
     "Inprocess": "Inprogress",
 }
 
+# Identifier sheets at least this large are matched across a process pool
+PARALLEL_MIN_IDENTIFIERS = 5000
+
+# Pool workers are started from a clean server process rather than forked from
+# the threaded Streamlit server (spawn where forkserver is unavailable)
+MATCH_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
 
 def find_column(df, keywords):
     """Find column that contains any of the keywords (case insensitive)"""
@@ -41,25 +63,6 @@ def find_column(df, keywords):
     return None
 
 
-def parse_dates_safely(date_series):
-    """Parse dates with multiple format handling"""
-    parsed_dates = []
-    for date_val in date_series:
-        if pd.isna(date_val):
-            parsed_dates.append(pd.NaT)
-            continue
-        try:
-            parsed = pd.to_datetime(date_val, dayfirst=True, format='mixed')
-            parsed_dates.append(parsed)
-        except:
-            try:
-                parsed = pd.to_datetime(date_val, dayfirst=True)
-                parsed_dates.append(parsed)
-            except:
-                parsed_dates.append(pd.NaT)
-    return pd.Series(parsed_dates)
-
-
 def find_date_column(df):
     """Find a date column in the dataframe"""
     date_keywords = ['date', 'created', 'timestamp', 'time', 'dt']
@@ -76,8 +79,263 @@ def find_date_column(df):
     return None
 
 
-def analyze_campaigns(df_identifiers, df_mis, start_date=None, end_date=None, date_col=None):
-    """Main analysis function for campaign data"""
+def _mis_code_arrays(df_mis):
+    """Extract the MIS columns used for campaign matching as flat numpy arrays"""
+    n = len(df_mis)
+    empty = pd.Series([""] * n, index=df_mis.index)
+    lc1 = df_mis.get("lc1_code", empty).astype(str).to_numpy(dtype=str)
+    lg = df_mis.get("lg_code", empty).astype(str).to_numpy(dtype=str)
+    ipa_approved = encode_values(df_mis.get("ipa_status", empty), {"APPROVE": 1}, normalize=True)
+
+    if "final_decision" in df_mis.columns:
+        status = encode_status(df_mis["final_decision"], FINAL_STATUS_MAP)
+    else:
+        status = np.zeros(n, dtype=np.int8)
+
+    return {"lc1": lc1, "lg": lg, "ipa_approved": ipa_approved, "status": status}
+
+
+def _build_lg_index(lg):
+    """
+    Group MIS row positions by LG code
+
+    Returns:
+        tuple: (row positions ordered by LG code, dict of LG code -> (start, stop)
+        slice of those positions)
+    """
+    keys, inverse = np.unique(lg, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    sizes = np.bincount(inverse, minlength=len(keys))
+    stops = np.cumsum(sizes)
+    starts = stops - sizes
+    return order, dict(zip(keys.tolist(), zip(starts.tolist(), stops.tolist())))
+
+
+def _count_campaign_matches(arrays, positions, lc_code):
+    """Count applications and statuses for one LC code among the MIS rows of its LG code"""
+    if len(positions) == 0:
+        return 0, 0, 0, 0, 0
+
+    lc_match = pd.Series(arrays["lc1"][positions]).str.contains(lc_code, case=False, na=False).to_numpy(dtype=bool)
+    matched = positions[lc_match]
+    statuses, ipa_approved = count_status(arrays["status"][matched], arrays["ipa_approved"][matched])
+
+    return (
+        len(matched),
+        ipa_approved,
+        statuses["Declined"],
+        statuses["Inprogress"],
+        statuses["Card Out"],
+    )
+
+
+def _share_arrays(arrays):
+    """Copy arrays into shared memory blocks, returning the blocks and attach specs"""
+    blocks, specs = [], {}
+    try:
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+            specs[name] = (block.name, array.shape, array.dtype.str)
+    except Exception:
+        _release_blocks(blocks, unlink=True)
+        raise
+    return blocks, specs
+
+
+def _release_blocks(blocks, unlink=False):
+    """Close (and optionally unlink) shared memory blocks"""
+    for block in blocks:
+        block.close()
+        if unlink:
+            block.unlink()
+
+
+def _match_partition(specs, tasks):
+    """
+    Worker entry point: match one partition of identifiers against shared MIS arrays
+
+    The LG index is built once by the parent; each task carries the slice of
+    the shared "order" array holding the row positions of its LG code.
+    """
+    blocks, arrays = [], {}
+    try:
+        for name, (block_name, shape, dtype) in specs.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+        return [
+            (position, _count_campaign_matches(arrays, arrays["order"][start:stop], lc_code))
+            for position, lc_code, start, stop in tasks
+        ]
+    finally:
+        # Views must be dropped before the shared buffers can be closed
+        arrays.clear()
+        _release_blocks(blocks)
+
+
+def _match_campaigns_parallel(arrays, lg_index, codes, partition_keys, max_workers=None):
+    """Match identifiers across a process pool, partitioned so equal keys share a worker"""
+    partitions = {}
+    for position, key in enumerate(partition_keys):
+        partitions.setdefault(key, []).append(position)
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(partitions)))
+
+    # Greedy balancing: largest partitions first, each onto the lightest worker
+    buckets = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for positions in sorted(partitions.values(), key=len, reverse=True):
+        target = loads.index(min(loads))
+        buckets[target].extend(positions)
+        loads[target] += len(positions)
+
+    # Workers only need the columns read per match plus the shared LG index
+    order, bounds = lg_index
+    shared = {"lc1": arrays["lc1"], "ipa_approved": arrays["ipa_approved"], "status": arrays["status"],
+              "order": order}
+
+    results = [None] * len(codes)
+    blocks, specs = _share_arrays(shared)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=MATCH_MP_CONTEXT) as pool:
+            futures = [
+                pool.submit(_match_partition, specs, [
+                    (position, codes[position][0], *bounds.get(codes[position][1], (0, 0)))
+                    for position in bucket
+                ])
+                for bucket in buckets if bucket
+            ]
+            for future in futures:
+                for position, counts in future.result():
+                    results[position] = counts
+    finally:
+        _release_blocks(blocks, unlink=True)
+
+    return results
+
+
+def match_campaigns(df_mis, codes, partition_keys=None, parallel=None, max_workers=None):
+    """
+    Count MIS applications and statuses for each (LC code, LG code) pair
+
+    Args:
+        df_mis: MIS DataFrame with lower-cased column names
+        codes: List of (lc_code, lg_code) tuples, one per identifier row
+        partition_keys: Per-identifier keys (channel or LG code) used to split work
+            across processes; defaults to the LG codes
+        parallel: True to use a process pool, False to run single-process
+            (useful for debugging), None to decide by PARALLEL_MIN_IDENTIFIERS
+        max_workers: Process pool size (defaults to the CPU count)
+
+    Returns:
+        List of (applications, ipa_approved, declined, inprogress, card_out) tuples
+    """
+    arrays = _mis_code_arrays(df_mis)
+    lg_index = _build_lg_index(arrays["lg"])
+
+    if parallel is None:
+        parallel = len(codes) >= PARALLEL_MIN_IDENTIFIERS
+    if parallel and len(codes) > 0 and len(df_mis) > 0:
+        if partition_keys is None:
+            partition_keys = [lg_code for _, lg_code in codes]
+        try:
+            return _match_campaigns_parallel(arrays, lg_index, codes, partition_keys, max_workers)
+        except Exception as e:
+            st.warning(f"Parallel matching unavailable, running single-process: {e}")
+
+    order, bounds = lg_index
+    results = []
+    for lc_code, lg_code in codes:
+        start, stop = bounds.get(lg_code, (0, 0))
+        results.append(_count_campaign_matches(arrays, order[start:stop], lc_code))
+    return results
+
+
+def build_price_table(costs=None):
+    """
+    Flatten the CAMPAIGN_COSTS config into per-channel component prices
+
+    Flat prices become a single "units" component; dict prices (e.g.
+    IVR Orbital) keep their named components.
+
+    Returns:
+        dict: {channel_lower: {component: price}}
+    """
+    costs = CAMPAIGN_COSTS if costs is None else costs
+    table = {}
+    for channel, pricing in costs.items():
+        components = pricing if isinstance(pricing, dict) else {"units": pricing}
+        table[channel.strip().lower()] = {name: float(price) for name, price in components.items()}
+    return table
+
+
+def _identifier_metric(df_identifiers, keywords):
+    """Numeric identifier column matched by keywords, zero-filled (zeros if absent)"""
+    col = find_column(df_identifiers, keywords)
+    if not col:
+        return np.zeros(len(df_identifiers))
+    return pd.to_numeric(df_identifiers[col], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+
+def _safe_rate(numerator, denominator):
+    """Percentage rounded to 2 decimals, 0 where the denominator is not positive"""
+    positive = denominator > 0
+    rate = np.divide(numerator * 100, denominator, out=np.zeros(len(numerator)), where=positive)
+    return np.round(rate, 2)
+
+
+def compute_campaign_costs(channels, df_identifiers, price_table=None):
+    """
+    Compute Cost, Answer Rate and Response Rate for every identifier row at once
+
+    Each cost component's price is broadcast over the rows by channel and
+    multiplied with the identifier column named in CAMPAIGN_COST_COMPONENTS.
+    Answer/response rates apply to channels billed per connected call.
+
+    Args:
+        channels: Sequence of channel names, one per identifier row
+        df_identifiers: Identifier DataFrame holding the metric columns
+        price_table: Output of build_price_table (defaults to CAMPAIGN_COSTS)
+
+    Returns:
+        dict of numpy arrays: "Cost", "Answer Rate (%)", "Response Rate (%)"
+    """
+    price_table = build_price_table() if price_table is None else price_table
+    channel_keys = pd.Series(list(channels), dtype=object).astype(str).str.strip().str.lower()
+
+    cost = np.zeros(len(channel_keys))
+    for component, keywords in CAMPAIGN_COST_COMPONENTS.items():
+        component_prices = {channel: prices[component] for channel, prices in price_table.items() if component in prices}
+        if not component_prices:
+            continue
+        prices = channel_keys.map(component_prices).fillna(0).to_numpy(dtype=float)
+        cost += prices * _identifier_metric(df_identifiers, keywords)
+
+    call_channels = [channel for channel, prices in price_table.items() if "connected" in prices]
+    is_call = channel_keys.isin(call_channels).to_numpy(dtype=bool)
+    dialed = _identifier_metric(df_identifiers, ['dailed', 'dialed'])
+    connected = _identifier_metric(df_identifiers, 'connected')
+    dtmf = _identifier_metric(df_identifiers, 'dtmf')
+
+    return {
+        "Cost": np.round(cost, 2),
+        "Answer Rate (%)": np.where(is_call, _safe_rate(connected, dialed), 0),
+        "Response Rate (%)": np.where(is_call, _safe_rate(dtmf, connected), 0),
+    }
+
+
+def analyze_campaigns(df_identifiers, df_mis, start_date=None, end_date=None, date_col=None,
+                      parallel=None, partition_by="lg", max_workers=None):
+    """
+    Main analysis function for campaign data
+
+    Identifier matching runs across a process pool for large sheets; pass
+    parallel=False to force single-process execution, and partition_by
+    ("lg" or "channel") to choose how identifiers are split between workers.
+    """
     df_identifiers = df_identifiers.copy()
     df_mis = df_mis.copy()
     
@@ -105,105 +363,49 @@ def analyze_campaigns(df_identifiers, df_mis, start_date=None, end_date=None, da
     if lg_col:
         df_identifiers[lg_col] = df_identifiers[lg_col].astype(str)
 
-    output_rows = []
-
-    # Process each campaign
-    for _, ident_row in df_identifiers.iterrows():
-        channel_col = find_column(df_identifiers, 'channel')
-        channel = str(ident_row.get(channel_col, "")).strip() if channel_col else ""
-        lc_code = str(ident_row.get(lc_col, "")) if lc_col else ""
-        lg_code = str(ident_row.get(lg_col, "")) if lg_col else ""
-
-        # Filter MIS data
-        lc_series = df_mis.get("lc1_code", pd.Series([""] * len(df_mis))).astype(str)
-        lg_series = df_mis.get("lg_code", pd.Series([""] * len(df_mis))).astype(str)
-        mis_filtered = df_mis[
-            lc_series.str.contains(lc_code, case=False, na=False) & 
-            (lg_series == lg_code)
-        ]
-
-        # Build row data
-        row = {"Channel": channel, "LC Code": lc_code, "LG Code": lg_code}
-        for col in df_identifiers.columns:
-            if col not in [lc_col, lg_col, channel_col]:
-                row[col] = ident_row[col]
-
-        # Calculate metrics
-        row["Applications"] = len(mis_filtered)
-        row["IPA Approved"] = int(
-            (mis_filtered.get("ipa_status", pd.Series([])).astype(str).str.upper() == "APPROVE").sum()
-        )
-
-        if "final_decision" in mis_filtered.columns:
-            mis_final = mis_filtered["final_decision"].astype(str).map(FINAL_STATUS_MAP).fillna("Other")
-            row["Declined"] = int((mis_final == "Declined").sum())
-            row["Inprogress"] = int((mis_final == "Inprogress").sum())
-            row["Card Out"] = int((mis_final == "Card Out").sum())
-        else:
-            row.update({"Declined": 0, "Inprogress": 0, "Card Out": 0})
-
-        # Get delivery metrics
-        delivered_col = find_column(df_identifiers, 'delivered')
-        read_col = find_column(df_identifiers, 'read')
-        clicks_col = find_column(df_identifiers, 'clicks')
-        
-        delivered = pd.to_numeric(ident_row.get(delivered_col, 0), errors='coerce') if delivered_col else 0
-        read_count = pd.to_numeric(ident_row.get(read_col, 0), errors='coerce') if read_col else 0
-        clicks = pd.to_numeric(ident_row.get(clicks_col, 0), errors='coerce') if clicks_col else 0
-
-        delivered, read_count, clicks = map(lambda x: 0 if pd.isna(x) else x, [delivered, read_count, clicks])
-        row.update({"Delivered": float(delivered), "Read": float(read_count), "Clicks": float(clicks)})
-
-        # Calculate cost and rates
-        if channel.lower() == "ivr orbital":
-            dialed_col = find_column(df_identifiers, ['dailed', 'dialed'])
-            connected_col = find_column(df_identifiers, 'connected')
-            dtmf_col = find_column(df_identifiers, 'dtmf')
-            sms_trig_col = find_column(df_identifiers, ['sms triggered', 'sms_triggered'])
-
-            dialed = pd.to_numeric(ident_row.get(dialed_col, 0), errors='coerce') if dialed_col else 0
-            connected = pd.to_numeric(ident_row.get(connected_col, 0), errors='coerce') if connected_col else 0
-            dtmf = pd.to_numeric(ident_row.get(dtmf_col, 0), errors='coerce') if dtmf_col else 0
-            sms_triggered = pd.to_numeric(ident_row.get(sms_trig_col, 0), errors='coerce') if sms_trig_col else 0
-
-            dialed, connected, dtmf, sms_triggered = map(
-                lambda x: 0 if pd.isna(x) else x,
-                [dialed, connected, dtmf, sms_triggered]
-            )
-
-            row["Answer Rate (%)"] = round((connected / dialed * 100), 2) if dialed > 0 else 0
-            row["Response Rate (%)"] = round((dtmf / connected * 100), 2) if connected > 0 else 0
-            row["Cost"] = round((connected * 0.09) + (sms_triggered * 0.1), 2)
-        else:
-            # Case-insensitive lookup for channel costs
-            cost_per_unit = 0
-            for key, value in CAMPAIGN_COSTS.items():
-                if key.lower() == channel.lower():
-                    cost_per_unit = value
-                    break
-            row["Cost"] = round(delivered * cost_per_unit, 2)
-            row["Answer Rate (%)"] = 0
-            row["Response Rate (%)"] = 0
-
-        output_rows.append(row)
-
-    df_output = pd.DataFrame(output_rows)
+    channel_col = find_column(df_identifiers, 'channel')
+    n_identifiers = len(df_identifiers)
+    channels = df_identifiers[channel_col].astype(str).str.strip().tolist() if channel_col else [""] * n_identifiers
+    lc_codes = df_identifiers[lc_col].tolist() if lc_col else [""] * n_identifiers
+    lg_codes = df_identifiers[lg_col].tolist() if lg_col else [""] * n_identifiers
+    codes = list(zip(lc_codes, lg_codes))
+
+    # Match every identifier against MIS (optionally across a process pool)
+    partition_keys = [channel.lower() for channel in channels] if partition_by == "channel" else lg_codes
+    match_counts = match_campaigns(df_mis, codes, partition_keys, parallel=parallel, max_workers=max_workers)
+
+    # Build the detailed frame column-wise
+    df_output = pd.DataFrame({"Channel": channels, "LC Code": lc_codes, "LG Code": lg_codes})
+    for col in df_identifiers.columns:
+        if col not in [lc_col, lg_col, channel_col]:
+            df_output[col] = df_identifiers[col].to_numpy()
+
+    # Calculate metrics
+    counts = np.array(match_counts, dtype=np.int64).reshape(-1, 5)
+    for position, name in enumerate(["Applications", "IPA Approved", "Declined", "Inprogress", "Card Out"]):
+        df_output[name] = counts[:, position]
+
+    # Get delivery metrics
+    df_output["Delivered"] = _identifier_metric(df_identifiers, 'delivered')
+    df_output["Read"] = _identifier_metric(df_identifiers, 'read')
+    df_output["Clicks"] = _identifier_metric(df_identifiers, 'clicks')
+
+    # Calculate cost and rates
+    price_table = build_price_table()
+    for name, values in compute_campaign_costs(channels, df_identifiers, price_table).items():
+        df_output[name] = values
 
     # Create summary
     summary_rows = []
-    all_channels = list(CAMPAIGN_COSTS.keys()) + ["IVR Orbital"]
+    all_channels = list(CAMPAIGN_COSTS.keys())
 
     for channel in all_channels:
         df_channel = df_output[df_output["Channel"].astype(str).str.lower() == channel.lower()]
         if len(df_channel) == 0:
             continue
 
-        # Case-insensitive lookup for channel costs
-        cost_per_unit = 0
-        for key, value in CAMPAIGN_COSTS.items():
-            if key.lower() == channel.lower():
-                cost_per_unit = value
-                break
+        # Multi-component channels have no single per-unit price
+        cost_per_unit = price_table.get(channel.lower(), {}).get("units", 0)
 
         applications = int(df_channel["Applications"].sum())
         inprogress = int(df_channel["Inprogress"].sum())
@@ -373,7 +575,7 @@ def render_campaign_analysis_module(df_mis=None, db_engine=None):
                 st.warning("⚠️ File uploaded - Google Sheets loading disabled. Remove file to use Sheets.")
                 st.text_input(
                     "Google Sheets URL (CSV export format)",
-                    value="https://docs.google.com/spreadsheets/d/184yquIAWt0XyQEYhI3yv0djg9f6pUtZS7TZ4Un7NLXI/export?format=csv&gid=2141873222",
+                    value=GOOGLE_SHEETS_URL,
                     key="campaign_sheet_url",
                     disabled=True
                 )
@@ -381,17 +583,26 @@ def render_campaign_analysis_module(df_mis=None, db_engine=None):
             else:
                 sheet_url = st.text_input(
                     "Google Sheets URL (CSV export format)",
-                    value="https://docs.google.com/spreadsheets/d/184yquIAWt0XyQEYhI3yv0djg9f6pUtZS7TZ4Un7NLXI/export?format=csv&gid=2141873222",
+                    value=GOOGLE_SHEETS_URL,
                     key="campaign_sheet_url"
                 )
+                force_refresh = st.checkbox(
+                    "Bypass cache (fetch latest from Sheets)",
+                    key="campaign_sheets_force_refresh"
+                )
                 if st.button("🔗 Load from Google Sheets", key="campaign_load_sheets", use_container_width=True):
                     try:
                         with st.spinner("Loading from Google Sheets..."):
-                            df_campaign_sheets = pd.read_csv(sheet_url)
-                            df_campaign_sheets.columns = df_campaign_sheets.columns.str.strip()
+                            df_campaign_sheets, fetch_status = fetch_sheet_csv(
+                                sheet_url,
+                                ttl=SHEETS_CACHE_TTL_SECONDS,
+                                force_refresh=force_refresh
+                            )
                             st.session_state.campaign_identifiers_data = df_campaign_sheets
-                            st.session_state.campaign_identifiers_source = "Google Sheets"
-                            st.success(f"✅ Loaded {len(df_campaign_sheets):,} campaigns from Sheets")
+                            st.session_state.campaign_identifiers_source = (
+                                "Google Sheets (offline copy)" if fetch_status == "offline" else "Google Sheets"
+                            )
+                            st.success(f"✅ Loaded {len(df_campaign_sheets):,} campaigns from Sheets ({fetch_status})")
                             st.rerun()
                     except Exception as e:
                         st.error(f"❌ Error loading from Sheets: {str(e)}")
@@ -408,23 +619,19 @@ def render_campaign_analysis_module(df_mis=None, db_engine=None):
     if df_mis is not None and df_identifiers is not None:
         try:
             with st.spinner("🔄 Processing campaign data..."):
-                df_mis = df_mis.copy()
-                
                 # Find date column
                 date_col = find_date_column(df_identifiers)
                 
                 if date_col:
-                    df_identifiers[date_col] = parse_dates_safely(df_identifiers[date_col])
-                    valid_date_mask = df_identifiers[date_col].notna()
-                    valid_count = valid_date_mask.sum()
-                    df_identifiers = df_identifiers[valid_date_mask].copy()
+                    # Parsed dates and their sort order are cached per loaded sheet
+                    parsed_dates = get_parsed_dates(df_identifiers, date_col)
+                    valid_count = len(get_date_index(df_identifiers, date_col)[0])
                     
-                    if len(df_identifiers) == 0:
+                    if valid_count == 0:
                         st.error("❌ No valid dates found in the data")
                         return
                     
-                    min_date = df_identifiers[date_col].min()
-                    max_date = df_identifiers[date_col].max()
+                    min_date, max_date = get_date_range(df_identifiers, date_col, after=None)
                     
                     st.success(f"✅ Loaded {len(df_mis):,} MIS records | {valid_count:,} valid campaigns")
                     st.info(f"📅 Date range: {min_date.strftime('%b %d, %Y')} to {max_date.strftime('%b %d, %Y')}")
@@ -472,28 +679,35 @@ def render_campaign_analysis_module(df_mis=None, db_engine=None):
                             start_date = min_date.date()
                             end_date = max_date.date()
                     
-                    # Run analysis
-                    df_output, df_summary = analyze_campaigns(
-                        df_identifiers, df_mis, 
-                        pd.Timestamp(start_date), 
-                        pd.Timestamp(end_date), 
-                        date_col
+                    # Binary-search the cached date index for the selected range
+                    positions = filter_date_ranges(
+                        df_identifiers,
+                        [(date_col, pd.Timestamp(start_date), pd.Timestamp(end_date))]
                     )
-                    
-                    # Show filtered count
-                    filtered_count = len(df_identifiers[
-                        (df_identifiers[date_col] >= pd.Timestamp(start_date)) & 
-                        (df_identifiers[date_col] <= pd.Timestamp(end_date))
-                    ])
+                    filtered_count = len(positions)
                     
                     if filtered_count > 0:
                         st.info(f"📊 Analyzing {filtered_count:,} campaigns from {start_date.strftime('%b %d')} to {end_date.strftime('%b %d, %Y')}")
                     else:
                         st.warning("⚠️ No campaigns found in selected date range")
                         return
+                    
+                    def analyze_period():
+                        df_period = df_identifiers.iloc[positions].copy()
+                        df_period[date_col] = parsed_dates.to_numpy()[positions]
+                        return analyze_campaigns(df_period, df_mis)
+
+                    # Run analysis (reused on widget reruns until the data or range changes)
+                    df_output, df_summary = cached_latest(
+                        df_mis, "campaign_analysis", (date_col, start_date, end_date), analyze_period,
+                        depends_on=(df_identifiers,)
+                    )
                 else:
                     st.warning("⚠️ No date column found. Analyzing all campaigns.")
-                    df_output, df_summary = analyze_campaigns(df_identifiers, df_mis)
+                    df_output, df_summary = cached_latest(
+                        df_mis, "campaign_analysis", None, lambda: analyze_campaigns(df_identifiers, df_mis),
+                        depends_on=(df_identifiers,)
+                    )
             
             # Display metrics
             st.markdown("### 📈 Key Performance Metrics")
@@ -831,22 +1045,19 @@ def render_campaign_analysis_module(df_mis=None, db_engine=None):
             
             with tab4:
                 st.markdown("### 📥 Download Reports")
+                st.caption(EXPORT_MEMORY_NOTE)
                 
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
-                    # Excel download
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                        df_output.to_excel(writer, sheet_name="Detailed Analysis", index=False)
-                        df_summary.to_excel(writer, sheet_name="Summary", index=False)
-                    output.seek(0)
-                    
+                    # Excel download (streamed to a temp file in chunks when clicked)
                     st.download_button(
                         label="📊 Download Excel Report",
-                        data=output,
+                        data=lambda: read_export_file(
+                            export_excel(df_output, "Detailed Analysis", [("Summary", df_summary)])
+                        ),
                         file_name=f"Campaign_Analysis_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        mime=EXCEL_MIME,
                         use_container_width=True
                     )
                 
@@ -862,13 +1073,31 @@ def render_campaign_analysis_module(df_mis=None, db_engine=None):
                     )
                 
                 with col3:
-                    # Detailed CSV
-                    csv_detailed = df_output.to_csv(index=False)
+                    # Detailed CSV (streamed to a temp file in chunks when clicked)
                     st.download_button(
                         label="📋 Download Detailed CSV",
-                        data=csv_detailed,
+                        data=lambda: read_export_file(export_csv(df_output)),
                         file_name=f"Campaign_Detailed_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv",
+                        mime=CSV_MIME,
+                        use_container_width=True
+                    )
+
+                # Columnar formats
+                arrow_col1, arrow_col2 = st.columns(2)
+                with arrow_col1:
+                    st.download_button(
+                        label="🗜️ Download as Parquet",
+                        data=lambda: read_export_file(export_parquet(df_output)),
+                        file_name=f"Campaign_Detailed_{datetime.now().strftime('%Y%m%d')}.parquet",
+                        mime=PARQUET_MIME,
+                        use_container_width=True
+                    )
+                with arrow_col2:
+                    st.download_button(
+                        label="🏹 Download as Arrow",
+                        data=lambda: read_export_file(export_arrow(df_output)),
+                        file_name=f"Campaign_Detailed_{datetime.now().strftime('%Y%m%d')}.arrows",
+                        mime=ARROW_STREAM_MIME,
                         use_container_width=True
                     )
         
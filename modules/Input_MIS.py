@@ -9,6 +9,15 @@ from sqlalchemy.types import DateTime
 import streamlit as st
 from datetime import datetime
 import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.daily_rollup import ROLLUP_TABLE, refresh_daily_rollup
+from database.lc2_phone_map import LC2_MAP_TABLE, LC2_SOURCE_COLUMN, update_lc2_phone_map
+from database.query_cache import invalidate_table_versions
+from database.schema_catalog import invalidate_schema_catalog
 
 # =====================================================================
 # 🏦 BANK CONFIGURATION
@@ -240,6 +249,26 @@ def process_mis_upload(uploaded_file, engine):
                     except Exception as e:
                         st.warning(f"⚠️ Could not log update: {e}")
 
+                    # Rebuild the daily status rollup used for KPIs and trends
+                    st.write("📊 Refreshing daily status rollup...")
+                    rollup_rows, rollup_error = refresh_daily_rollup(engine, TABLE_NAME)
+                    if rollup_error:
+                        st.warning(f"⚠️ Could not refresh '{ROLLUP_TABLE}': {rollup_error}")
+                    else:
+                        st.success(f"✅ '{ROLLUP_TABLE}' refreshed ({rollup_rows:,} rows)")
+
+                    # Decode LC2 codes seen for the first time
+                    if LC2_SOURCE_COLUMN in df.columns:
+                        st.write("📞 Updating LC2 phone map...")
+                        added_codes, map_error = update_lc2_phone_map(engine, df[LC2_SOURCE_COLUMN])
+                        if map_error:
+                            st.warning(f"⚠️ Could not update '{LC2_MAP_TABLE}': {map_error}")
+                        else:
+                            st.success(f"✅ '{LC2_MAP_TABLE}' updated ({added_codes:,} new LC2 codes)")
+
+                    # Tables may have been created or replaced
+                    invalidate_schema_catalog()
+
                     st.balloons()
                     st.success(f"🎉 Upload complete for {BANK_NAME}")
 
@@ -263,6 +292,7 @@ def log_update(engine, table_name, record_count, new_records, updated_records):
             'notes': f'New: {new_records}, Updated: {updated_records}'
         }])
         log_entry.to_sql('MIS_Update_Log', engine, if_exists='append', index=False)
+        invalidate_table_versions()
     except Exception as e:
         # Silently fail if log table doesn't exist
         pass
@@ -3,9 +3,11 @@ Google Ads Summary Module
 Process and analyze Google Ads campaigns with MIS data
 """
 
+import os
+import sys
+import numpy as np
 import pandas as pd
 import streamlit as st
-from io import BytesIO
 from datetime import datetime
 import smtplib
 from email.mime.multipart import MIMEMultipart
@@ -15,6 +17,15 @@ from email import encoders
 import plotly.express as px
 import plotly.graph_objects as go
 
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_grid import render_data_grid
+from utils.export_service import (
+    ARROW_STREAM_MIME, CSV_MIME, EXCEL_MIME, EXPORT_MEMORY_NOTE, PARQUET_MIME, export_arrow, export_csv, export_excel, export_parquet,
+    read_export_file
+)
+from utils.mis_store import cached, cached_latest, column_value_counts, distinct_values
 
 # === Email Configuration ===
 SMTP_SERVER = "smtp.zoho.com"
@@ -161,7 +172,7 @@ Venugopal"""
     msg.attach(MIMEText(body, 'plain'))
 
     part = MIMEBase('application', 'octet-stream')
-    part.set_payload(output_data.getvalue())
+    part.set_payload(output_data.read())
     encoders.encode_base64(part)
     today = datetime.today().strftime("%d-%b-%Y")
     filename = f"GoogleAds_HDFC_MIS_{today}.xlsx"
@@ -200,6 +211,216 @@ Venugopal"""
                 pass
 
 
+@st.fragment
+def render_google_pie(final_df, global_positions, categorical_cols, decision_col):
+    """Chart 1 panel, counted from the cached column codes of the globally filtered rows"""
+    st.markdown("#### 📊 Chart 1: Distribution Pie Chart")
+    with st.expander("⚙️ Customize Pie Chart", expanded=True):
+        pie_col1, pie_col2, pie_col3 = st.columns(3)
+
+        with pie_col1:
+            pie_category_col = st.selectbox(
+                "Category Column:",
+                options=categorical_cols,
+                index=categorical_cols.index(decision_col) if decision_col and decision_col in categorical_cols else 0,
+                key="pie_category_col"
+            )
+
+        with pie_col2:
+            if pie_category_col:
+                pie_categories = distinct_values(final_df, pie_category_col, global_positions, sort=False)
+                pie_filter = st.multiselect(
+                    "Filter Categories:",
+                    options=pie_categories,
+                    default=pie_categories[:min(10, len(pie_categories))],
+                    key="pie_filter"
+                )
+
+        with pie_col3:
+            pie_top_n = st.number_input(
+                "Show Top N:",
+                min_value=3,
+                max_value=20,
+                value=10,
+                key="pie_top_n"
+            )
+
+    if pie_category_col and pie_filter:
+        pie_data = column_value_counts(final_df, pie_category_col, global_positions)
+        pie_data = pie_data[pie_data.index.isin(pie_filter)].head(pie_top_n)
+
+        fig1 = px.pie(
+            values=pie_data.values,
+            names=pie_data.index,
+            title=f"{pie_category_col} Distribution (Top {pie_top_n})",
+            hole=0.4
+        )
+        fig1.update_traces(textposition='inside', textinfo='percent+label+value')
+        st.plotly_chart(fig1, use_container_width=True)
+
+
+@st.fragment
+def render_mis_match_chart(match_counts):
+    """Chart 2 panel over the precomputed Present in MIS counts"""
+    st.markdown("#### 📊 Chart 2: MIS Match Status")
+    with st.expander("⚙️ Customize MIS Match Chart", expanded=False):
+        mis_chart_col1, mis_chart_col2 = st.columns(2)
+
+        with mis_chart_col1:
+            mis_chart_filter = st.multiselect(
+                "MIS Status:",
+                options=["Yes", "No"],
+                default=["Yes", "No"],
+                key="mis_chart_filter"
+            )
+
+        with mis_chart_col2:
+            mis_chart_type = st.selectbox(
+                "Chart Type:",
+                options=["Bar Chart", "Pie Chart"],
+                key="mis_chart_type"
+            )
+
+    match_status = match_counts[match_counts.index.isin(mis_chart_filter)]
+
+    if mis_chart_type == "Bar Chart":
+        fig2 = px.bar(
+            x=match_status.index,
+            y=match_status.values,
+            title="Campaign MIS Match Status",
+            labels={'x': 'Status', 'y': 'Count'},
+            color=match_status.values,
+            color_continuous_scale="Blues",
+            text=match_status.values
+        )
+        fig2.update_traces(textposition='outside')
+    else:
+        fig2 = px.pie(
+            values=match_status.values,
+            names=match_status.index,
+            title="Campaign MIS Match Status",
+            hole=0.4
+        )
+        fig2.update_traces(textposition='inside', textinfo='percent+label+value')
+
+    st.plotly_chart(fig2, use_container_width=True)
+
+
+@st.fragment
+def render_google_breakdown(final_df, global_positions, categorical_cols, decision_col):
+    """Chart 3 panel, counted from the cached column codes of the globally filtered rows"""
+    st.markdown("#### 📊 Chart 3: Custom Breakdown")
+    with st.expander("⚙️ Customize Breakdown Chart", expanded=False):
+        bar_col1, bar_col2, bar_col3 = st.columns(3)
+
+        with bar_col1:
+            bar_groupby_col = st.selectbox(
+                "Group By:",
+                options=categorical_cols,
+                index=categorical_cols.index(decision_col) if decision_col and decision_col in categorical_cols else 0,
+                key="bar_groupby_col"
+            )
+
+        with bar_col2:
+            bar_top_n = st.number_input(
+                "Show Top N:",
+                min_value=3,
+                max_value=30,
+                value=10,
+                key="bar_top_n"
+            )
+
+        with bar_col3:
+            bar_sort = st.selectbox(
+                "Sort:",
+                options=["Descending", "Ascending"],
+                key="bar_sort"
+            )
+
+    if bar_groupby_col:
+        groupby_data = column_value_counts(final_df, bar_groupby_col, global_positions).head(bar_top_n)
+        if bar_sort == "Ascending":
+            groupby_data = groupby_data.sort_values()
+
+        fig3 = px.bar(
+            x=groupby_data.index,
+            y=groupby_data.values,
+            title=f"Top {bar_top_n} by {bar_groupby_col}",
+            labels={'x': bar_groupby_col, 'y': 'Count'},
+            color=groupby_data.values,
+            color_continuous_scale="Viridis",
+            text=groupby_data.values
+        )
+        fig3.update_traces(textposition='outside')
+        fig3.update_layout(showlegend=False)
+        st.plotly_chart(fig3, use_container_width=True)
+
+
+@st.fragment
+def render_pivot_panel(pivot_df):
+    """Pivot Analysis tab; the trend column choice reruns only this tab"""
+    st.markdown("### 📊 Pivot Analysis")
+    if pivot_df is not None and not pivot_df.empty:
+        # Custom column selection for pivot visualization
+        with st.expander("⚙️ Customize Pivot Chart", expanded=False):
+            st.markdown("**Select columns to display in trend chart:**")
+
+            available_cols = [col for col in pivot_df.columns if col != "Total"]
+            selected_pivot_cols = st.multiselect(
+                "Select decision statuses to plot:",
+                options=available_cols,
+                default=available_cols
+            )
+
+        st.dataframe(pivot_df, use_container_width=True)
+
+        if len(pivot_df) > 1 and selected_pivot_cols:
+            pivot_viz = pivot_df.iloc[:-1].copy()
+            fig = go.Figure()
+
+            for col in selected_pivot_cols:
+                if col in pivot_viz.columns:
+                    fig.add_trace(go.Scatter(
+                        x=pivot_viz.index,
+                        y=pivot_viz[col],
+                        mode='lines+markers',
+                        name=col
+                    ))
+
+            fig.update_layout(
+                title="Daily Decision Trends (Customized)",
+                xaxis_title="Date",
+                yaxis_title="Count",
+                height=400,
+                hovermode='x unified'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("ℹ️ No pivot data available")
+
+
+@st.fragment
+def render_campaign_data(sep_campaign_output):
+    """Campaign Data tab; its filters rerun only this tab"""
+    col1, col2 = st.columns(2)
+    with col1:
+        status_filter = st.multiselect("Filter by MIS Status:", ["Yes", "No"], default=["Yes", "No"])
+    with col2:
+        search = st.text_input("🔍 Search SeqId:", "")
+
+    def filter_campaigns():
+        filtered = sep_campaign_output[sep_campaign_output["Present in MIS"].isin(status_filter)]
+        if search:
+            filtered = filtered[filtered["seqId"].astype(str).str.contains(search, case=False)]
+        return filtered
+
+    # Same frame object across reruns, so the grid's sort and search caches hit
+    filtered_campaigns = cached_latest(
+        sep_campaign_output, "campaign_data_view", (tuple(status_filter), search), filter_campaigns
+    )
+    render_data_grid(filtered_campaigns, key="google_campaign_grid", height=500, searchable=False)
+
+
 def render_google_ads_module(engine, df_mis=None):
     """Main render function for Google Ads module"""
     st.markdown("## 🎯 Google Ads Campaign Summary")
@@ -327,16 +548,21 @@ def render_google_ads_module(engine, df_mis=None):
     if df_mis is not None and 'google_campaign_data' in st.session_state:
         try:
             with st.spinner("🔄 Processing Google Ads data..."):
-                hdfc = df_mis.copy()
                 sep_google = st.session_state.google_campaign_data
 
-                final_df, sep_campaign_output, pivot_df = process_google_ads_summary(sep_google, hdfc)
+                # Matching is redone only when the MIS or campaign data changes
+                final_df, sep_campaign_output, pivot_df = cached(
+                    df_mis, "google_ads_summary",
+                    lambda: process_google_ads_summary(sep_google, df_mis),
+                    depends_on=(sep_google,)
+                )
 
                 st.markdown("### 📊 Processing Summary")
                 col1, col2, col3, col4 = st.columns(4)
                 total_campaigns = len(sep_google)
                 matched_count = len(final_df)
-                present_in_mis = (sep_campaign_output["Present in MIS"] == "Yes").sum()
+                match_counts = sep_campaign_output["Present in MIS"].value_counts()
+                present_in_mis = match_counts.get("Yes", 0)
                 match_rate = (matched_count / total_campaigns * 100) if total_campaigns > 0 else 0
 
                 with col1:
@@ -372,7 +598,7 @@ def render_google_ads_module(engine, df_mis=None):
 
                         with global_filter_col1:
                             if decision_col:
-                                all_decisions = final_df[decision_col].dropna().unique().tolist()
+                                all_decisions = distinct_values(final_df, decision_col, sort=False)
                                 global_decision_filter = st.multiselect(
                                     "Filter by Final Decision (Global):",
                                     options=all_decisions,
@@ -390,159 +616,28 @@ def render_google_ads_module(engine, df_mis=None):
                                 key="google_global_mis"
                             )
 
-                        # Apply global filters
-                        df_global = final_df.copy()
+                        # Apply global filters (row positions only; charts count from cached codes)
+                        global_positions = None
+                        df_global = final_df
                         if decision_col and global_decision_filter:
-                            df_global = df_global[df_global[decision_col].isin(global_decision_filter)]
+                            global_positions = np.flatnonzero(final_df[decision_col].isin(global_decision_filter).to_numpy())
+                            df_global = final_df.iloc[global_positions]
 
                         # Get categorical columns for customization
                         categorical_cols = df_global.select_dtypes(include=['object']).columns.tolist()
 
                         st.markdown("---")
 
-                        # Chart 1: Custom Pie Chart
-                        st.markdown("#### 📊 Chart 1: Distribution Pie Chart")
-                        with st.expander("⚙️ Customize Pie Chart", expanded=True):
-                            pie_col1, pie_col2, pie_col3 = st.columns(3)
-
-                            with pie_col1:
-                                pie_category_col = st.selectbox(
-                                    "Category Column:",
-                                    options=categorical_cols,
-                                    index=categorical_cols.index(decision_col) if decision_col and decision_col in categorical_cols else 0,
-                                    key="pie_category_col"
-                                )
-
-                            with pie_col2:
-                                if pie_category_col:
-                                    pie_categories = df_global[pie_category_col].dropna().unique().tolist()
-                                    pie_filter = st.multiselect(
-                                        "Filter Categories:",
-                                        options=pie_categories,
-                                        default=pie_categories[:min(10, len(pie_categories))],
-                                        key="pie_filter"
-                                    )
-
-                            with pie_col3:
-                                pie_top_n = st.number_input(
-                                    "Show Top N:",
-                                    min_value=3,
-                                    max_value=20,
-                                    value=10,
-                                    key="pie_top_n"
-                                )
-
-                        df_pie = df_global.copy()
-                        if pie_category_col and pie_filter:
-                            df_pie = df_pie[df_pie[pie_category_col].isin(pie_filter)]
-                            pie_data = df_pie[pie_category_col].value_counts().head(pie_top_n)
-
-                            fig1 = px.pie(
-                                values=pie_data.values,
-                                names=pie_data.index,
-                                title=f"{pie_category_col} Distribution (Top {pie_top_n})",
-                                hole=0.4
-                            )
-                            fig1.update_traces(textposition='inside', textinfo='percent+label+value')
-                            st.plotly_chart(fig1, use_container_width=True)
+                        # Each chart panel is a fragment over precomputed aggregates
+                        render_google_pie(final_df, global_positions, categorical_cols, decision_col)
 
                         col1, col2 = st.columns(2)
 
                         with col1:
-                            # Chart 2: MIS Match Status
-                            st.markdown("#### 📊 Chart 2: MIS Match Status")
-                            with st.expander("⚙️ Customize MIS Match Chart", expanded=False):
-                                mis_chart_col1, mis_chart_col2 = st.columns(2)
-
-                                with mis_chart_col1:
-                                    mis_chart_filter = st.multiselect(
-                                        "MIS Status:",
-                                        options=["Yes", "No"],
-                                        default=["Yes", "No"],
-                                        key="mis_chart_filter"
-                                    )
-
-                                with mis_chart_col2:
-                                    mis_chart_type = st.selectbox(
-                                        "Chart Type:",
-                                        options=["Bar Chart", "Pie Chart"],
-                                        key="mis_chart_type"
-                                    )
-
-                            sep_filtered_output = sep_campaign_output[
-                                sep_campaign_output["Present in MIS"].isin(mis_chart_filter)
-                            ]
-                            match_status = sep_filtered_output["Present in MIS"].value_counts()
-
-                            if mis_chart_type == "Bar Chart":
-                                fig2 = px.bar(
-                                    x=match_status.index,
-                                    y=match_status.values,
-                                    title="Campaign MIS Match Status",
-                                    labels={'x': 'Status', 'y': 'Count'},
-                                    color=match_status.values,
-                                    color_continuous_scale="Blues",
-                                    text=match_status.values
-                                )
-                                fig2.update_traces(textposition='outside')
-                            else:
-                                fig2 = px.pie(
-                                    values=match_status.values,
-                                    names=match_status.index,
-                                    title="Campaign MIS Match Status",
-                                    hole=0.4
-                                )
-                                fig2.update_traces(textposition='inside', textinfo='percent+label+value')
-
-                            st.plotly_chart(fig2, use_container_width=True)
+                            render_mis_match_chart(match_counts)
 
                         with col2:
-                            # Chart 3: Custom Bar Chart
-                            st.markdown("#### 📊 Chart 3: Custom Breakdown")
-                            with st.expander("⚙️ Customize Breakdown Chart", expanded=False):
-                                bar_col1, bar_col2, bar_col3 = st.columns(3)
-
-                                with bar_col1:
-                                    bar_groupby_col = st.selectbox(
-                                        "Group By:",
-                                        options=categorical_cols,
-                                        index=categorical_cols.index(decision_col) if decision_col and decision_col in categorical_cols else 0,
-                                        key="bar_groupby_col"
-                                    )
-
-                                with bar_col2:
-                                    bar_top_n = st.number_input(
-                                        "Show Top N:",
-                                        min_value=3,
-                                        max_value=30,
-                                        value=10,
-                                        key="bar_top_n"
-                                    )
-
-                                with bar_col3:
-                                    bar_sort = st.selectbox(
-                                        "Sort:",
-                                        options=["Descending", "Ascending"],
-                                        key="bar_sort"
-                                    )
-
-                            if bar_groupby_col:
-                                groupby_data = df_global[bar_groupby_col].value_counts().head(bar_top_n)
-                                if bar_sort == "Ascending":
-                                    groupby_data = groupby_data.sort_values()
-
-                                fig3 = px.bar(
-                                    x=groupby_data.index,
-                                    y=groupby_data.values,
-                                    title=f"Top {bar_top_n} by {bar_groupby_col}",
-                                    labels={'x': bar_groupby_col, 'y': 'Count'},
-                                    color=groupby_data.values,
-                                    color_continuous_scale="Viridis",
-                                    text=groupby_data.values
-                                )
-                                fig3.update_traces(textposition='outside')
-                                fig3.update_layout(showlegend=False)
-                                st.plotly_chart(fig3, use_container_width=True)
+                            render_google_breakdown(final_df, global_positions, categorical_cols, decision_col)
 
                         st.markdown("#### 📋 Filtered Data Preview")
                         st.dataframe(df_global.head(100), use_container_width=True, height=400)
@@ -551,96 +646,66 @@ def render_google_ads_module(engine, df_mis=None):
                         st.warning("⚠️ No matched data found")
 
                 with tab2:
-                    st.markdown("### 📊 Pivot Analysis")
-                    if pivot_df is not None and not pivot_df.empty:
-                        # Custom column selection for pivot visualization
-                        with st.expander("⚙️ Customize Pivot Chart", expanded=False):
-                            st.markdown("**Select columns to display in trend chart:**")
-
-                            available_cols = [col for col in pivot_df.columns if col != "Total"]
-                            selected_pivot_cols = st.multiselect(
-                                "Select decision statuses to plot:",
-                                options=available_cols,
-                                default=available_cols
-                            )
-
-                        st.dataframe(pivot_df, use_container_width=True)
-
-                        if len(pivot_df) > 1 and selected_pivot_cols:
-                            pivot_viz = pivot_df.iloc[:-1].copy()
-                            fig = go.Figure()
-
-                            for col in selected_pivot_cols:
-                                if col in pivot_viz.columns:
-                                    fig.add_trace(go.Scatter(
-                                        x=pivot_viz.index,
-                                        y=pivot_viz[col],
-                                        mode='lines+markers',
-                                        name=col
-                                    ))
-
-                            fig.update_layout(
-                                title="Daily Decision Trends (Customized)",
-                                xaxis_title="Date",
-                                yaxis_title="Count",
-                                height=400,
-                                hovermode='x unified'
-                            )
-                            st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.info("ℹ️ No pivot data available")
+                    render_pivot_panel(pivot_df)
 
                 with tab3:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        status_filter = st.multiselect("Filter by MIS Status:", ["Yes", "No"], default=["Yes", "No"])
-                    with col2:
-                        search = st.text_input("🔍 Search SeqId:", "")
-                    filtered_campaigns = sep_campaign_output[
-                        sep_campaign_output["Present in MIS"].isin(status_filter)
-                    ]
-                    if search:
-                        filtered_campaigns = filtered_campaigns[
-                            filtered_campaigns["seqId"].astype(str).str.contains(search, case=False)
-                        ]
-                    st.dataframe(filtered_campaigns, use_container_width=True, height=500)
+                    render_campaign_data(sep_campaign_output)
 
                 with tab4:
                     st.markdown("### 📥 Download & Email Options")
+                    st.caption(EXPORT_MEMORY_NOTE)
 
-                    # ✅ Only export Matched Data, Pivot Table, and Campaign Data
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                        final_df.to_excel(writer, index=False, sheet_name="Matched Data")
-                        if pivot_df is not None and not pivot_df.empty:
-                            pivot_df.to_excel(writer, sheet_name="Pivot Table")
-                        sep_campaign_output.to_excel(writer, index=False, sheet_name="Campaign Data")
-                    output.seek(0)
+                    # ✅ Only export Matched Data, Pivot Table, and Campaign Data (streamed to a temp file when needed)
+                    extra_sheets = []
+                    if pivot_df is not None and not pivot_df.empty:
+                        extra_sheets.append(("Pivot Table", pivot_df.reset_index()))
+                    extra_sheets.append(("Campaign Data", sep_campaign_output))
+
+                    def excel_report_path():
+                        return export_excel(final_df, "Matched Data", extra_sheets)
 
                     col1, col2 = st.columns(2)
                     with col1:
                         today = datetime.today().strftime("%d-%b-%Y")
                         st.download_button(
                             label="⬇️ Download Excel Report",
-                            data=output,
+                            data=lambda: read_export_file(excel_report_path()),
                             file_name=f"GoogleAds_HDFC_MIS_{today}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            mime=EXCEL_MIME,
                             use_container_width=True
                         )
-                        csv_matched = final_df.to_csv(index=False)
                         st.download_button(
                             label="📄 Download Matched Data CSV",
-                            data=csv_matched,
+                            data=lambda: read_export_file(export_csv(final_df)),
                             file_name=f"GoogleAds_Matched_{today}.csv",
-                            mime="text/csv",
+                            mime=CSV_MIME,
                             use_container_width=True
                         )
+
+                        # Columnar formats
+                        arrow_col1, arrow_col2 = st.columns(2)
+                        with arrow_col1:
+                            st.download_button(
+                                label="🗜️ Download as Parquet",
+                                data=lambda: read_export_file(export_parquet(final_df)),
+                                file_name=f"GoogleAds_Matched_{today}.parquet",
+                                mime=PARQUET_MIME,
+                                use_container_width=True
+                            )
+                        with arrow_col2:
+                            st.download_button(
+                                label="🏹 Download as Arrow",
+                                data=lambda: read_export_file(export_arrow(final_df)),
+                                file_name=f"GoogleAds_Matched_{today}.arrows",
+                                mime=ARROW_STREAM_MIME,
+                                use_container_width=True
+                            )
                     with col2:
                         if st.button("📧 Send Report via Email", use_container_width=True):
                             try:
                                 with st.spinner("Sending email..."):
-                                    output.seek(0)
-                                    send_email_report(output)
+                                    with open(excel_report_path(), "rb") as excel_file:
+                                        send_email_report(excel_file)
                                     st.success(f"✅ Email sent successfully to {TO_EMAIL}!")
                                     st.info(f"📬 CC: {', '.join(CC_EMAILS)}")
                             except Exception as e:
@@ -3,13 +3,24 @@ Phone Numbers Extraction Module
 Extract and map phone numbers from campaign data using LC2 codes
 """
 
+import os
+import sys
 import pandas as pd
 import streamlit as st
-from io import BytesIO
 from datetime import datetime
-import re
 from sqlalchemy import create_engine
 
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.lc2_phone_map import extract_phone_numbers_sql, get_lc2_phone_map, lookup_lc2_phones
+from utils.export_service import (
+    ARROW_STREAM_MIME, CSV_MIME, EXCEL_MIME, EXPORT_MEMORY_NOTE, PARQUET_MIME, export_arrow, export_csv, export_excel,
+    export_parquet, read_export_file
+)
+from utils.lc2_utils import decode_lc2_phones, lc2_seq_ids, normalize_lc2
+from utils.mis_store import cached_latest
+
 
 def find_col(df, candidate_names, fallback_index=None):
     """Find column by matching candidate names"""
@@ -25,41 +36,13 @@ def find_col(df, candidate_names, fallback_index=None):
     raise KeyError(f"None of {candidate_names} found in columns")
 
 
-def derive_phone_from_lc2(s):
-    """Derive phone number from LC2 code using various transformations"""
-    if not s:
-        return None
-    
-    s_up = s.upper().strip()
-    
-    # Handle IV prefix (base36 conversion)
-    if s_up.startswith('IV') and len(s_up) > 2:
-        try:
-            base36_part = s_up[2:]
-            phone_num = int(base36_part, 36)
-            return str(phone_num)
-        except ValueError:
-            pass
-    
-    # Handle MNOPQRSTUV conversion
-    mapping = str.maketrans("MNOPQRSTUV", "0123456789")
-    mapping_keys = set("MNOPQRSTUV")
-    
-    s_no_cg = re.sub(r'(?i)^CG', '', s_up)
-    if len(s_no_cg) == 10 and set(s_no_cg).issubset(mapping_keys):
-        return s_no_cg.translate(mapping)
-    if len(s_up) == 10 and set(s_up).issubset(mapping_keys):
-        return s_up.translate(mapping)
-    
-    return None
-
-
 def load_campaign_data_from_db(engine):
     """Load campaign data from PostgreSQL database"""
     query = """
     SELECT "seqId", "phoneNo"
     FROM "Campaign_Data"
     WHERE "storeSlug" ILIKE %s
+    ORDER BY ctid
     """
     try:
         df = pd.read_sql(query, engine, params=("%hdfc%",))
@@ -68,8 +51,13 @@ def load_campaign_data_from_db(engine):
         return None, str(e)
 
 
-def process_phone_numbers(sep, hdfc):
-    """Process and merge phone numbers from campaign and MIS data"""
+def process_phone_numbers(sep, hdfc, lc2_map=None):
+    """
+    Process and merge phone numbers from campaign and MIS data
+
+    LC2 codes are looked up in lc2_map (see database.lc2_phone_map) when
+    given, otherwise decoded directly.
+    """
     # Process campaign data
     sep_clean = sep[["seqId", "phoneNo"]].copy()
     sep_clean["seqId"] = sep_clean["seqId"].astype(str).str.strip().str.upper()
@@ -86,11 +74,12 @@ def process_phone_numbers(sep, hdfc):
     hdfc_lc2_col = find_col(hdfc, ["LC2_CODE"], 10)
     hdfc_app_col = find_col(hdfc, ["APPLICATION_REFERENCE_NUMBER"], 0)
 
-    hdfc["LC2_raw"] = hdfc[hdfc_lc2_col].fillna("").astype(str).str.strip()
-    hdfc["DerivedPhone"] = hdfc["LC2_raw"].apply(derive_phone_from_lc2)
-
-    lc2_no_cg = hdfc["LC2_raw"].str.upper().str.replace(r'(?i)^CG', '', regex=True).str.strip()
-    hdfc["seqId"] = lc2_no_cg.where(hdfc["DerivedPhone"].isna(), None)
+    hdfc["LC2_raw"] = normalize_lc2(hdfc[hdfc_lc2_col])
+    if lc2_map is not None:
+        hdfc["DerivedPhone"], hdfc["seqId"] = lookup_lc2_phones(hdfc["LC2_raw"], lc2_map)
+    else:
+        hdfc["DerivedPhone"] = decode_lc2_phones(hdfc["LC2_raw"])
+        hdfc["seqId"] = lc2_seq_ids(hdfc["LC2_raw"], hdfc["DerivedPhone"])
     hdfc = hdfc.rename(columns={hdfc_app_col: "APPLICATION_REFERENCE_NUMBER"})
 
     # Merge
@@ -98,6 +87,11 @@ def process_phone_numbers(sep, hdfc):
     merged["FinalPhone"] = merged["DerivedPhone"].fillna(merged["phoneNo"])
     merged = merged.drop(columns=["phoneNo", "DerivedPhone", "LC2_raw"])
 
+    return order_phone_columns(merged)
+
+
+def order_phone_columns(merged):
+    """Put application, decision and phone columns first"""
     # Reorder columns - prioritize important columns
     priority_cols = ["APPLICATION_REFERENCE_NUMBER"]
 
@@ -266,16 +260,55 @@ def render_phone_numbers_module(engine, df_mis=None):
     if df_mis is None and 'phone_mis_data' in st.session_state:
         df_mis = st.session_state.phone_mis_data
 
-    # Process if both files are available
-    if df_mis is not None and 'phone_campaign_data' in st.session_state:
+    # SQL pushdown: run the join in the database and fetch only the result
+    use_pushdown = False
+    if engine is not None:
+        use_pushdown = st.checkbox(
+            "⚡ Run the phone join in the database (SQL pushdown)",
+            key="phone_sql_pushdown",
+            help="Joins HDFC_MIS_Data with Campaign_Data inside PostgreSQL instead of loading both tables"
+        )
+
+    pushdown_result = None
+    if use_pushdown:
+        if st.button("⚡ Extract Phone Numbers in Database", key="phone_run_pushdown", use_container_width=True):
+            with st.spinner("Running phone extraction in the database..."):
+                result, error = extract_phone_numbers_sql(engine)
+            if error:
+                st.error(f"❌ Database error: {error[:200]}")
+            else:
+                app_col = find_col(result, ["APPLICATION_REFERENCE_NUMBER"], 0)
+                st.session_state.phone_pushdown_result = order_phone_columns(
+                    result.rename(columns={app_col: "APPLICATION_REFERENCE_NUMBER"})
+                )
+        pushdown_result = st.session_state.get('phone_pushdown_result')
+        if pushdown_result is None:
+            st.info("ℹ️ Click the button to extract phone numbers in the database")
+
+    # Process if both files are available (or the database result is ready)
+    if pushdown_result is not None or (
+        not use_pushdown and df_mis is not None and 'phone_campaign_data' in st.session_state
+    ):
         try:
             with st.spinner("🔄 Processing phone numbers..."):
-                # Use MIS data from main dashboard
-                hdfc = df_mis.copy()
-                sep = st.session_state.phone_campaign_data
-                
-                # Process
-                merged = process_phone_numbers(sep, hdfc)
+                if pushdown_result is not None:
+                    merged = pushdown_result
+                else:
+                    # Use MIS data from main dashboard (copied only when processed)
+                    hdfc = df_mis
+                    sep = st.session_state.phone_campaign_data
+
+                    # LC2 decodes come from the LC2_Phone_Map table (or are decoded once per data version)
+                    lc2_map = get_lc2_phone_map(
+                        df_mis, find_col(df_mis, ["LC2_CODE"], 10), engine,
+                        use_database=st.session_state.phone_mis_source != "uploaded file"
+                    )
+
+                    # Process once per MIS, campaign data and map, so reruns reuse the result (and its exports)
+                    merged = cached_latest(
+                        df_mis, "phone_numbers", None,
+                        lambda: process_phone_numbers(sep, hdfc.copy(), lc2_map), depends_on=(sep, lc2_map)
+                    )
                 
                 # Display metrics
                 st.markdown("### 📊 Processing Results")
@@ -337,45 +370,59 @@ def render_phone_numbers_module(engine, df_mis=None):
                 
                 with tab3:
                     st.markdown("### 📥 Download Processed Data")
+                    st.caption(EXPORT_MEMORY_NOTE)
                     
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        # Excel download
-                        output = BytesIO()
-                        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                            merged.to_excel(writer, index=False, sheet_name="Phone Numbers")
-                            
-                            # Add summary sheet
-                            summary_df = pd.DataFrame({
-                                'Metric': ['Total Records', 'Phone Numbers Found', 'Success Rate', 'Missing Numbers'],
-                                'Value': [
-                                    len(merged),
-                                    phone_count,
-                                    f"{success_rate:.1f}%",
-                                    missing_count
-                                ]
-                            })
-                            summary_df.to_excel(writer, index=False, sheet_name="Summary")
-                        output.seek(0)
-                        
+                        # Excel download (streamed to a temp file in chunks when clicked)
+                        summary_df = pd.DataFrame({
+                            'Metric': ['Total Records', 'Phone Numbers Found', 'Success Rate', 'Missing Numbers'],
+                            'Value': [
+                                len(merged),
+                                phone_count,
+                                f"{success_rate:.1f}%",
+                                missing_count
+                            ]
+                        })
+
                         today = datetime.today().strftime("%d-%b-%Y")
                         st.download_button(
                             label="📊 Download Excel Report",
-                            data=output,
+                            data=lambda: read_export_file(
+                                export_excel(merged, "Phone Numbers", [("Summary", summary_df)])
+                            ),
                             file_name=f"HDFC_Phone_Numbers_{today}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            mime=EXCEL_MIME,
                             use_container_width=True
                         )
-                    
+
                     with col2:
-                        # CSV download
-                        csv = merged.to_csv(index=False)
+                        # CSV download (streamed to a temp file in chunks when clicked)
                         st.download_button(
                             label="📄 Download CSV",
-                            data=csv,
+                            data=lambda: read_export_file(export_csv(merged)),
                             file_name=f"HDFC_Phone_Numbers_{today}.csv",
-                            mime="text/csv",
+                            mime=CSV_MIME,
+                            use_container_width=True
+                        )
+
+                    # Columnar formats
+                    arrow_col1, arrow_col2 = st.columns(2)
+                    with arrow_col1:
+                        st.download_button(
+                            label="🗜️ Download as Parquet",
+                            data=lambda: read_export_file(export_parquet(merged)),
+                            file_name=f"HDFC_Phone_Numbers_{today}.parquet",
+                            mime=PARQUET_MIME,
+                            use_container_width=True
+                        )
+                    with arrow_col2:
+                        st.download_button(
+                            label="🏹 Download as Arrow",
+                            data=lambda: read_export_file(export_arrow(merged)),
+                            file_name=f"HDFC_Phone_Numbers_{today}.arrows",
+                            mime=ARROW_STREAM_MIME,
                             use_container_width=True
                         )
                 
@@ -384,7 +431,7 @@ def render_phone_numbers_module(engine, df_mis=None):
             with st.expander("🔍 View Error Details"):
                 st.exception(e)
 
-    else:
+    elif not use_pushdown:
         st.warning("⚠️ Please load both MIS Data and Campaign Data to begin processing")
 
 
@@ -3,11 +3,36 @@ SQL Console Module
 Interactive SQL query console with export functionality
 """
 
+import os
+import sys
 import pandas as pd
 import streamlit as st
 from datetime import datetime
-from io import BytesIO
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database_config import TABLES
+from database.local_query import iter_table_rows, local_query_available
+from database.query_cache import clear_query_cache, is_volatile_query, query_cache_stats
+from database.query_history import (
+    clear_query_history, load_query_history, record_query, set_query_rows, summarize_query_history
+)
+from database.query_pager import (
+    DEFAULT_QUERY_PAGE_SIZE, DEFAULT_STATEMENT_TIMEOUT_SECONDS, QUERY_PAGE_SIZE_OPTIONS, cancel_query,
+    close_query_pager, fetch_elapsed, is_counting, is_fetching, iter_query_rows, open_local_pager,
+    open_query_pager, request_query_page, split_statements
+)
+from database.query_profiler import plan_nodes, profile_query
+from database.schema_catalog import catalog_identifiers, get_schema_catalog
+from utils.export_service import (
+    ARROW_STREAM_MIME, CSV_MIME, EXCEL_MAX_ROWS, EXCEL_MIME, EXPORT_CHUNK_ROWS, EXPORT_MEMORY_NOTE, JSON_MIME,
+    PARQUET_MIME, export_query_result, read_export_file
+)
+from utils.mis_store import cached
 
 
 def is_safe_query(query):
@@ -27,49 +52,519 @@ def is_safe_query(query):
     return True, None
 
 
-def execute_sql_query(query, engine):
-    """Execute SQL query and return results"""
+# Seconds between checks of the background row count
+COUNT_POLL_SECONDS = 2
+
+# Seconds between refreshes of the running query timer
+RUNNING_POLL_SECONDS = 0.5
+
+# Statements run concurrently per execution. Across sessions they share the
+# console's CONSOLE_STATEMENT_SLOTS, so extra statements wait for a slot.
+MAX_CONCURRENT_STATEMENTS = 5
+
+# Queries listed per query history tab
+HISTORY_LIST_SIZE = 10
+
+
+def execute_sql_query(query, engine, page_size=DEFAULT_QUERY_PAGE_SIZE, use_cache=True,
+                      timeout_seconds=DEFAULT_STATEMENT_TIMEOUT_SECONDS, frames=None):
+    """
+    Execute SQL query through a server-side cursor (or the result cache) and return its pager
+
+    With frames (table name -> DataFrame) the query runs locally in DuckDB instead.
+    """
     try:
         # Check if query is safe
         is_safe, error_msg = is_safe_query(query)
         if not is_safe:
             return None, error_msg
 
-        # Execute query
-        df = pd.read_sql(query, engine)
-        return df, None
+        if frames is not None:
+            return open_local_pager(frames, query, page_size, timeout_seconds=timeout_seconds)
+
+        # Declare the cursor; rows are fetched one page at a time
+        return open_query_pager(engine, query, page_size, use_cache=use_cache, timeout_seconds=timeout_seconds)
     except Exception as e:
         return None, str(e)
 
 
+def execute_sql_statements(statements, engine, page_size=DEFAULT_QUERY_PAGE_SIZE, use_cache=True,
+                           timeout_seconds=DEFAULT_STATEMENT_TIMEOUT_SECONDS, frames=None):
+    """
+    Execute independent statements concurrently, each in its own console
+    statement slot (or its own DuckDB connection when running locally on frames)
+
+    The statements are opened in parallel threads and their first pages
+    start fetching in the background right away, so the wall time is that
+    of the slowest statement rather than the sum.
+
+    Returns:
+        list: (pager, error message, seconds taken to open) per statement, in input order
+    """
+    def execute(statement):
+        started_at = time.monotonic()
+        pager, error = execute_sql_query(statement, engine, page_size, use_cache, timeout_seconds, frames)
+        return pager, error, time.monotonic() - started_at
+
+    with ThreadPoolExecutor(max_workers=len(statements)) as pool:
+        results = list(pool.map(execute, statements))
+    for pager, _, _ in results:
+        if pager is not None:
+            request_query_page(pager, 0, page_size, wait_seconds=0)
+    return results
+
+
+def session_frames():
+    """
+    Frames loaded in this session for the Local target
+
+    The MIS frame is the HDFC_MIS_Data table and keeps its name. The campaign
+    frames are a campaign identifier sheet and a filtered subset of
+    Campaign_Data, so they get names of their own rather than posing as the
+    Campaign_Data table.
+
+    Returns:
+        dict: Table name -> DataFrame (only the frames that are loaded)
+    """
+    frames = {
+        TABLES["MIS_DATA"]: st.session_state.get('mis_data'),
+        "campaign_identifiers": st.session_state.get('campaign_identifiers_data'),
+        "google_campaign_data": st.session_state.get('google_campaign_data')
+    }
+    return {name: df for name, df in frames.items() if df is not None}
+
+
+def _step_result_page(delta, suffix=""):
+    """Move the query result page (of the result with this key suffix) by delta"""
+    key = f'sql_result_page{suffix}'
+    st.session_state[key] = max(st.session_state.get(key, 0) + delta, 0)
+
+
+def record_sql_result(sql_result, df_result, error):
+    """
+    Log an executed query to the query history once, when its first page
+    (or its error) is in, and add its total row count when that arrives
+    """
+    pager = sql_result["pager"]
+    if not sql_result.get("finished"):
+        if error:
+            if pager is None:
+                duration = sql_result["open_seconds"]
+            elif pager["first_page_seconds"] is not None:
+                duration = pager["first_page_seconds"]
+            else:  # Failed before any page was fetched
+                duration = time.monotonic() - pager["opened_at"]
+            entry_id, _ = record_query(
+                sql_result["query"], duration * 1000, error="Cancelled" if pager is not None and pager["cancelled"]
+                else error, target=sql_result.get("target", "database")
+            )
+        else:
+            entry_id, _ = record_query(
+                sql_result["query"], pager["first_page_seconds"] * 1000, rows=pager["count"],
+                bytes_returned=int(df_result.memory_usage(deep=True).sum()), cache_hit=pager["page_cached"],
+                target=sql_result.get("target", "database")
+            )
+        sql_result["history_id"] = entry_id
+        sql_result["history_rows"] = None if error else pager["count"]
+        sql_result["finished"] = True
+    elif sql_result["history_rows"] is None and pager is not None and pager["count"] is not None:
+        set_query_rows(sql_result["history_id"], pager["count"])
+        sql_result["history_rows"] = pager["count"]
+
+
+def _rerun_query(query, target):
+    """Load a query from the history into the editor and execute it on the target it ran on"""
+    st.session_state.query_input = query
+    st.session_state.sql_query = query
+    st.session_state.sql_target = "Local" if target == "local" else "Database"
+    st.session_state.sql_run_pending = True
+
+
+def render_query_history():
+    """Query history panel: recent, slowest, most frequent and slowing queries with one-click re-run"""
+    history, error = load_query_history()
+    if error:
+        st.warning(f"⚠️ Could not load query history: {error}")
+        return
+    if history.empty:
+        st.info("No query history yet. Execute a query to see it here.")
+        return
+
+    summary = summarize_query_history(history)
+    slowing = summary[summary["slowing"]].sort_values("slowdown", ascending=False)
+    if not slowing.empty:
+        st.warning(f"📉 {len(slowing)} {'query is' if len(slowing) == 1 else 'queries are'} getting slower over time")
+
+    recent = history.drop_duplicates(["query_hash", "target"]).merge(
+        summary[["query_hash", "target", "runs", "avg_ms"]], on=["query_hash", "target"]
+    ).head(HISTORY_LIST_SIZE)
+    st.caption("⏱️ Times are until the first page of rows arrived")
+    tabs = st.tabs(["🕒 Recent", "🐢 Slowest", "🔁 Most Frequent", "📉 Getting Slower"])
+    lists = [
+        ("recent", recent),
+        ("slowest", summary.dropna(subset=["avg_ms"]).sort_values("avg_ms", ascending=False).head(HISTORY_LIST_SIZE)),
+        ("frequent", summary.sort_values(["runs", "last_run"], ascending=False).head(HISTORY_LIST_SIZE)),
+        ("slowing", slowing.head(HISTORY_LIST_SIZE))
+    ]
+
+    for tab, (name, entries) in zip(tabs, lists):
+        with tab:
+            if entries.empty:
+                st.caption("Nothing here yet - slowing queries need "
+                           "a few database runs to compare." if name == "slowing" else "No queries yet.")
+            for i, entry in enumerate(entries.itertuples(index=False)):
+                col1, col2 = st.columns([5, 1])
+                with col1:
+                    text_query = entry.query if len(entry.query) <= 100 else f"{entry.query[:100]}..."
+                    st.text(text_query)
+                    if name == "recent":
+                        details = [
+                            entry.executed_at.strftime('%Y-%m-%d %H:%M:%S'),
+                            ("" if pd.notna(entry.error) else "first page ") + f"{entry.duration_ms:,.0f} ms"
+                            + (" (cache hit)" if entry.cache_hit else ""),
+                            "error" if pd.notna(entry.error) else
+                            f"{entry.rows:,.0f} rows" if pd.notna(entry.rows) else "rows not counted",
+                            f"{entry.runs:,} runs"
+                        ]
+                    elif name == "slowing":
+                        details = [
+                            f"first page {entry.baseline_ms:,.0f} ms → {entry.recent_ms:,.0f} ms",
+                            f"{entry.slowdown:.1f}× slower",
+                            f"{entry.runs:,} runs"
+                        ]
+                    else:
+                        avg_text = (
+                            f"first page avg {entry.avg_ms:,.0f} ms" if pd.notna(entry.avg_ms) else "no timed runs"
+                        )
+                        details = [
+                            avg_text,
+                            f"max {entry.max_ms:,.0f} ms" if pd.notna(entry.max_ms) else None,
+                            f"{entry.runs:,} runs",
+                            f"{entry.cache_hits:,} cache hits" if entry.cache_hits else None,
+                            f"{entry.errors:,} errors" if entry.errors else None,
+                            f"last {entry.last_run.strftime('%Y-%m-%d %H:%M')}"
+                        ]
+                    if entry.target == "local":
+                        details.insert(0, "🦆 Local")
+                    st.caption(" · ".join(d for d in details if d))
+                with col2:
+                    st.button(
+                        "▶️ Re-run", key=f"sql_history_{name}_{i}", use_container_width=True,
+                        on_click=_rerun_query, args=(entry.query, entry.target)
+                    )
+
+    if st.button("🧹 Clear history", key="sql_clear_history"):
+        clear_query_history()
+        st.rerun()
+
+
+def query_export(pager, fmt):
+    """
+    Download callable building a full-result export on click
+
+    Streamlit runs it on its own thread when the button is clicked. The
+    rows are streamed from a fresh cursor (or the kept Arrow result of a
+    local query) into a temp file in batches (as Arrow record batches for
+    Parquet/Arrow), built once per result and format (per data version
+    when the result cache is on).
+    """
+    key = pager["cache_key"] if pager["cache_key"] is not None else ("result", pager["id"])
+    engine, query, timeout_seconds = pager["engine"], pager["query"], pager["timeout"]
+    local_result = pager["result"]
+
+    def build():
+        if local_result is not None:
+            path = export_query_result(key, fmt, lambda: iter_table_rows(local_result, EXPORT_CHUNK_ROWS))
+        else:
+            path = export_query_result(
+                key, fmt, lambda: iter_query_rows(engine, query, timeout_seconds=timeout_seconds)
+            )
+        return read_export_file(path)
+
+    return build
+
+
+def profile_sql_query(query, engine, timeout_seconds=DEFAULT_STATEMENT_TIMEOUT_SECONDS):
+    """Profile SQL query with EXPLAIN ANALYZE and return its plan"""
+    is_safe, error_msg = is_safe_query(query)
+    if not is_safe:
+        return None, error_msg
+    return profile_query(engine, query, timeout_seconds)
+
+
+def render_query_profile(plan):
+    """Plan tree with per-node timings, estimated vs actual rows and buffer usage"""
+    nodes = plan_nodes(plan)
+
+    profile_col1, profile_col2, profile_col3, profile_col4 = st.columns(4)
+    with profile_col1:
+        st.metric("⏱️ Execution", f"{plan.get('Execution Time', 0):,.1f} ms")
+    with profile_col2:
+        st.metric("🧠 Planning", f"{plan.get('Planning Time', 0):,.1f} ms")
+    with profile_col3:
+        st.metric("💾 Buffer Hits", f"{int(nodes['shared_hit_blocks'].iloc[0]):,}")
+    with profile_col4:
+        st.metric("📀 Buffer Reads", f"{int(nodes['shared_read_blocks'].iloc[0]):,}")
+
+    # Sequential scans over the large tables are the usual cause of slow console queries
+    for _, node in nodes[nodes["large_seq_scan"]].iterrows():
+        st.warning(
+            f"🐢 Sequential scan on {node['relation']}: {node['actual_rows']:,} rows in {node['total_ms']:,.1f} ms. "
+            "Filter on an indexed column or add a LIMIT to avoid reading the whole table."
+        )
+
+    display = nodes.drop(columns=["relation"]).rename(columns={
+        "node": "Node",
+        "total_ms": "Total (ms)",
+        "self_ms": "Self (ms)",
+        "estimated_rows": "Est. Rows",
+        "actual_rows": "Actual Rows",
+        "loops": "Loops",
+        "shared_hit_blocks": "Buffer Hits",
+        "shared_read_blocks": "Buffer Reads",
+        "large_seq_scan": "⚠️ Seq Scan"
+    })
+    st.dataframe(display, use_container_width=True, hide_index=True)
+
+    with st.expander("📄 Raw plan (JSON)"):
+        st.json(plan, expanded=False)
+
+
+def render_running_query(pager, suffix=""):
+    """Elapsed timer and Cancel button for a page being fetched in the worker thread"""
+    run_col1, run_col2 = st.columns([4, 1])
+    with run_col1:
+        timeout_text = f" (timeout {pager['timeout']}s)" if pager["timeout"] else ""
+        st.info(f"⏳ Query running... {fetch_elapsed(pager) or 0:.1f}s elapsed{timeout_text}")
+    with run_col2:
+        if st.button("🛑 Cancel", key=f"sql_cancel_query{suffix}", use_container_width=True):
+            cancel_query(pager)
+
+    # Show the page (or the error) as soon as the fetch finishes
+    if not is_fetching(pager):
+        st.rerun()
+
+
+def render_row_count(pager, suffix=""):
+    """Total row count metric: exact once known, planner estimate while counting"""
+    counting = is_counting(pager)
+    if pager["count"] is not None:
+        st.metric("📝 Total Rows", f"{pager['count']:,}")
+    else:
+        estimate = f"≈ {pager['estimate']:,}" if pager["estimate"] is not None else "Unknown"
+        st.metric("📝 Total Rows", estimate)
+        if counting:
+            st.caption("⏳ Counting rows in the background...")
+        elif pager["count_error"]:
+            st.caption("⚠️ Row count unavailable")
+
+    # Rerun the page once the count arrives so navigation knows the last page
+    pending_key = f'sql_count_pending{suffix}'
+    if st.session_state.get(pending_key) and not counting:
+        st.session_state[pending_key] = False
+        st.rerun()
+    st.session_state[pending_key] = counting
+
+
+def render_query_result(sql_result):
+    """
+    Result of one executed statement: status, page of rows, navigation and exports
+
+    Widget keys and page state carry the result's key suffix, so several
+    statement results can be shown side by side in tabs.
+    """
+    suffix = sql_result.get("key_suffix", "")
+    result_query = sql_result["query"]
+    pager = sql_result["pager"]
+    error = sql_result["error"]
+
+    page_size = st.session_state.get(f'sql_page_size{suffix}', DEFAULT_QUERY_PAGE_SIZE)
+    if pager is not None and page_size != pager["page_size"]:
+        st.session_state[f'sql_result_page{suffix}'] = 0
+    page = st.session_state.get(f'sql_result_page{suffix}', 0)
+    running = False
+    if not error:
+        # Pages not at hand are fetched in a worker thread so the query can be cancelled
+        df_result, error, running = request_query_page(pager, page, page_size)
+    if not running:
+        record_sql_result(sql_result, None if error else df_result, error)
+
+    if running:
+        st.fragment(render_running_query, run_every=RUNNING_POLL_SECONDS)(pager, suffix)
+    elif error:
+        if pager is not None and pager["cancelled"]:
+            st.warning("🛑 Query cancelled")
+        else:
+            st.error(f"❌ Query Error: {error}")
+
+        with st.expander("🔍 Query Details"):
+            st.code(result_query, language="sql")
+    else:
+        # Success - show the fetched page
+        first_row = page * page_size
+        timing = f" in {pager['first_page_seconds']:.2f}s" if pager["first_page_seconds"] is not None else ""
+        if len(df_result):
+            st.success(
+                f"✅ Query executed successfully{timing}! "
+                f"Showing rows {first_row + 1:,}–{first_row + len(df_result):,}."
+            )
+        else:
+            st.success(f"✅ Query executed successfully{timing}! No rows on this page.")
+
+        # Cache indicator
+        cache_col1, cache_col2 = st.columns([4, 1])
+        with cache_col1:
+            stats = query_cache_stats()
+            source = "⚡ Cache hit - page served from the result cache" if pager["page_cached"] else (
+                "🦆 Ran locally in DuckDB on the session's loaded data" if pager["frames"] is not None
+                else "🗄️ Cache miss - page fetched from the database" if pager["cache_key"] is not None
+                else "🗄️ Page fetched from the database (not cached: uses the current time or random values)"
+                if is_volatile_query(pager["query"])
+                else "🗄️ Page fetched from the database (cache off)"
+            )
+            st.caption(
+                f"{source} · {stats['entries']} cached results, {stats['size_mb']:.1f} MB · "
+                f"{stats['hits']:,} hits / {stats['misses']:,} misses"
+            )
+        with cache_col2:
+            if st.button("🧹 Clear cache", key=f"sql_clear_cache{suffix}", use_container_width=True):
+                clear_query_cache()
+
+        # Result metrics
+        result_col1, result_col2, result_col3 = st.columns(3)
+
+        with result_col1:
+            st.fragment(
+                render_row_count,
+                run_every=COUNT_POLL_SECONDS if is_counting(pager) else None
+            )(pager, suffix)
+        with result_col2:
+            st.metric("📋 Columns", len(df_result.columns))
+        with result_col3:
+            memory_mb = cached(
+                df_result, "memory_mb",
+                lambda: df_result.memory_usage(deep=True).sum() / (1024 * 1024)
+            )
+            st.metric("💾 Page Memory", f"{memory_mb:.2f} MB")
+
+        st.dataframe(df_result, use_container_width=True, height=400)
+
+        # Page navigation (each page is fetched from the server-side cursor)
+        total_rows = pager["count"]
+        last_page = None if total_rows is None else max((total_rows - 1) // page_size, 0)
+        nav_col1, nav_col2, nav_col3, nav_col4 = st.columns([1, 2, 3, 1])
+
+        with nav_col1:
+            st.button(
+                "◀ Prev", key=f"sql_result_prev{suffix}", use_container_width=True, disabled=page <= 0,
+                on_click=_step_result_page, args=(-1, suffix)
+            )
+
+        with nav_col2:
+            st.selectbox(
+                "Rows per page:", QUERY_PAGE_SIZE_OPTIONS,
+                index=QUERY_PAGE_SIZE_OPTIONS.index(DEFAULT_QUERY_PAGE_SIZE), key=f"sql_page_size{suffix}"
+            )
+
+        with nav_col3:
+            pages_text = f"{last_page + 1:,}" if last_page is not None else "?"
+            st.caption(f"Page {page + 1:,} of {pages_text}")
+
+        with nav_col4:
+            st.button(
+                "Next ▶", key=f"sql_result_next{suffix}", use_container_width=True,
+                disabled=(last_page is not None and page >= last_page) or len(df_result) < page_size,
+                on_click=_step_result_page, args=(1, suffix)
+            )
+
+        # Export options (built once per page, not on every rerun)
+        st.markdown("### 📥 Export Results")
+        st.caption(f"Exports contain every row of the result. {EXPORT_MEMORY_NOTE}")
+
+        export_col1, export_col2, export_col3, export_col4, export_col5 = st.columns(5)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        with export_col1:
+            too_many_rows = total_rows is not None and total_rows > EXCEL_MAX_ROWS - 1
+            st.download_button(
+                label="📊 Download as Excel",
+                data=query_export(pager, "xlsx"),
+                key=f"sql_export_xlsx{suffix}",
+                file_name=f"query_results_{timestamp}.xlsx",
+                mime=EXCEL_MIME,
+                use_container_width=True,
+                disabled=too_many_rows,
+                help=f"Excel is limited to {EXCEL_MAX_ROWS - 1:,} rows; use CSV" if too_many_rows else None
+            )
+
+        with export_col2:
+            st.download_button(
+                label="📄 Download as CSV",
+                data=query_export(pager, "csv"),
+                key=f"sql_export_csv{suffix}",
+                file_name=f"query_results_{timestamp}.csv",
+                mime=CSV_MIME,
+                use_container_width=True
+            )
+
+        with export_col3:
+            st.download_button(
+                label="📋 Download as JSON",
+                data=query_export(pager, "json"),
+                key=f"sql_export_json{suffix}",
+                file_name=f"query_results_{timestamp}.json",
+                mime=JSON_MIME,
+                use_container_width=True
+            )
+
+        with export_col4:
+            st.download_button(
+                label="🗜️ Download as Parquet",
+                data=query_export(pager, "parquet"),
+                key=f"sql_export_parquet{suffix}",
+                file_name=f"query_results_{timestamp}.parquet",
+                mime=PARQUET_MIME,
+                use_container_width=True,
+                help="Columnar, zstd-compressed; best for large pulls into pandas/Spark"
+            )
+
+        with export_col5:
+            st.download_button(
+                label="🏹 Download as Arrow",
+                data=query_export(pager, "arrows"),
+                key=f"sql_export_arrows{suffix}",
+                file_name=f"query_results_{timestamp}.arrows",
+                mime=ARROW_STREAM_MIME,
+                use_container_width=True,
+                help="Arrow IPC stream; read with pyarrow.ipc.open_stream"
+            )
+
+        # Query info
+        with st.expander("🔍 Query Details"):
+            st.code(result_query, language="sql")
+
+
 def get_table_list(engine):
-    """Get list of tables in database"""
-    try:
-        query = """
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = 'public'
-        ORDER BY table_name
-        """
-        df = pd.read_sql(query, engine)
-        return df['table_name'].tolist()
-    except:
-        return []
+    """Get list of tables in database (from the cached schema catalog)"""
+    catalog, _ = get_schema_catalog(engine)
+    return catalog["tables"] if catalog else []
 
 
 def get_table_columns(table_name, engine):
-    """Get columns for a specific table"""
-    try:
-        query = f"""
-        SELECT column_name, data_type
-        FROM information_schema.columns
-        WHERE table_name = '{table_name}'
-        ORDER BY ordinal_position
-        """
-        df = pd.read_sql(query, engine)
-        return df
-    except:
+    """Get columns for a specific table (from the cached schema catalog)"""
+    catalog, _ = get_schema_catalog(engine)
+    if not catalog:
         return None
+    return catalog["columns"].get(table_name)
+
+
+def _insert_identifier():
+    """Append the identifier picked in the autocomplete box to the query"""
+    picked = st.session_state.get('sql_autocomplete')
+    if picked:
+        current_query = st.session_state.get('query_input', '').rstrip()
+        st.session_state.query_input = f"{current_query} {picked[0]}" if current_query else picked[0]
+    st.session_state.sql_autocomplete = None
 
 
 def render_sql_console_module(engine):
@@ -81,12 +576,16 @@ def render_sql_console_module(engine):
         st.error("❌ Database connection not available")
         return
 
-    # Sidebar with table browser
+    # Sidebar with table browser (schema catalog is loaded once per process)
     with st.sidebar:
         st.markdown("### 📋 Database Tables")
 
+        refresh_schema = st.button("🔄 Refresh schema", key="sql_refresh_schema", use_container_width=True)
         with st.spinner("Loading tables..."):
-            tables = get_table_list(engine)
+            catalog, catalog_error = get_schema_catalog(engine, refresh=refresh_schema)
+        tables = catalog["tables"] if catalog else []
+        if catalog:
+            st.caption(f"Schema loaded at {catalog['loaded_at'].strftime('%H:%M:%S')}")
 
         if tables:
             selected_table = st.selectbox(
@@ -98,8 +597,18 @@ def render_sql_console_module(engine):
             if selected_table != "-- Select a table --":
                 st.markdown(f"**Table:** `{selected_table}`")
 
-                with st.spinner("Loading columns..."):
-                    columns_df = get_table_columns(selected_table, engine)
+                row_estimate = catalog["row_estimates"].get(selected_table)
+                if row_estimate is not None:
+                    st.caption(f"≈ {row_estimate:,} rows (planner estimate)")
+
+                table_indexes = catalog["indexes"].get(selected_table)
+                if table_indexes is not None:
+                    with st.expander(f"🗂️ Indexes ({len(table_indexes)})"):
+                        for index_name, definition in zip(table_indexes["index_name"], table_indexes["definition"]):
+                            st.markdown(f"**{index_name}**")
+                            st.code(definition, language="sql")
+
+                columns_df = catalog["columns"].get(selected_table)
 
                 if columns_df is not None and len(columns_df) > 0:
                     st.markdown("**Columns:** (Click to copy)")
@@ -145,6 +654,8 @@ WHERE table_name = '{selected_table}'
 ORDER BY ordinal_position
 """
                         st.rerun()
+        elif catalog_error:
+            st.warning(f"⚠️ Could not load tables: {catalog_error}")
         else:
             st.warning("No tables found")
 
@@ -227,6 +738,18 @@ DISTINCT - Unique values only
 COUNT, SUM, AVG, MAX, MIN - Aggregate functions
         """, language="sql")
 
+    # Autocomplete from the schema catalog (type to filter, pick to append)
+    if catalog:
+        st.selectbox(
+            "🔎 Insert table or column:",
+            options=catalog_identifiers(catalog),
+            index=None,
+            format_func=lambda identifier: identifier[1],
+            placeholder="Type a table or column name...",
+            key="sql_autocomplete",
+            on_change=_insert_identifier
+        )
+
     # Query editor (AFTER suggestions)
     default_query = st.session_state.get('sql_query', 'SELECT * FROM "HDFC_MIS_Data" LIMIT 10')
 
@@ -239,26 +762,75 @@ COUNT, SUM, AVG, MAX, MIN - Aggregate functions
     )
 
     # Action buttons
-    action_col1, action_col2, action_col3, action_col4 = st.columns(4)
+    action_col1, action_col2, action_col3, action_col4, action_col5 = st.columns(5)
 
     with action_col1:
         execute_btn = st.button("▶️ Execute Query", type="primary", use_container_width=True)
 
     with action_col2:
+        profile_btn = st.button(
+            "🔬 Profile", use_container_width=True,
+            help="Run EXPLAIN (ANALYZE, BUFFERS) in a read-only transaction"
+        )
+
+    with action_col3:
         clear_btn = st.button("🗑️ Clear", use_container_width=True)
         if clear_btn:
             st.session_state.sql_query = ""
             st.rerun()
 
-    with action_col3:
+    with action_col4:
         if st.button("📋 Sample Query", use_container_width=True):
             st.session_state.sql_query = 'SELECT * FROM "HDFC_MIS_Data" WHERE "IPA_STATUS" = \'APPROVE\' LIMIT 50'
             st.rerun()
 
-    with action_col4:
+    with action_col5:
         if st.button("💡 Help", use_container_width=True):
             st.session_state.show_help = not st.session_state.get('show_help', False)
 
+    option_col1, option_col2, option_col3 = st.columns([2, 2, 1])
+
+    with option_col1:
+        use_cache = st.checkbox(
+            "⚡ Use result cache",
+            value=True,
+            key="sql_use_cache",
+            help="Reuse results of identical queries until the tables they read are updated"
+        )
+
+    with option_col2:
+        # Local target: embedded DuckDB over the frames loaded in this session
+        frames = session_frames()
+        local_ready = local_query_available() and bool(frames)
+        if not local_ready and st.session_state.get('sql_target') == "Local":
+            st.session_state.sql_target = "Database"
+        target = st.radio(
+            "🎯 Run on:",
+            ["Database", "Local"],
+            horizontal=True,
+            key="sql_target",
+            disabled=not local_ready,
+            help="Local runs the query in embedded DuckDB on the MIS/campaign data already loaded in this "
+                 "session, without touching the shared database"
+        )
+        if not local_query_available():
+            st.caption("🦆 Local needs DuckDB (pip install duckdb)")
+        elif not frames:
+            st.caption("🦆 Load MIS or campaign data to query it locally")
+        elif target == "Local":
+            st.caption("🦆 " + ", ".join(f'"{name}" ({len(df):,} rows)' for name, df in frames.items()))
+
+    with option_col3:
+        timeout_seconds = st.number_input(
+            "⏱️ Timeout (seconds):",
+            min_value=0,
+            max_value=3600,
+            value=DEFAULT_STATEMENT_TIMEOUT_SECONDS,
+            step=10,
+            key="sql_timeout",
+            help="statement_timeout for each statement of the query (0 for no limit)"
+        )
+
     # Help section
     if st.session_state.get('show_help', False):
         with st.expander("📖 SQL Query Help", expanded=True):
@@ -301,109 +873,102 @@ COUNT, SUM, AVG, MAX, MIN - Aggregate functions
             - Use double quotes for table and column names
             - Add LIMIT to avoid loading too much data
             - Use WHERE clauses to filter results
+            - Separate independent SELECTs with `;` to run them concurrently (up to 5), each in its own tab
+            - Run on **Local** to query the loaded MIS/campaign data in embedded DuckDB (DuckDB SQL dialect)
             """)
 
-    # Execute query
-    if execute_btn and query.strip():
-        st.markdown("---")
-        st.markdown("### 📊 Query Results")
+    # Execute query (or a query re-run from the history); the cursor is kept
+    # open so pages can be fetched on reruns
+    run_pending = st.session_state.pop('sql_run_pending', False)
+    if (execute_btn or run_pending) and query.strip():
+        statements = split_statements(query)
+        if len(statements) > MAX_CONCURRENT_STATEMENTS:
+            st.error(
+                f"❌ {len(statements)} statements entered; run at most {MAX_CONCURRENT_STATEMENTS} at a time."
+            )
+        elif statements:
+            for previous in st.session_state.get('sql_results', []):
+                if previous["pager"] is not None:
+                    close_query_pager(previous["pager"])
+            # A single statement keeps the plain widget keys; several get one tab each
+            suffixes = [""] if len(statements) == 1 else [f"_{i}" for i in range(len(statements))]
+            started_at = time.monotonic()
+            with st.spinner("🔄 Executing query..." if len(statements) == 1 else
+                            f"🔄 Executing {len(statements)} statements concurrently..."):
+                results = execute_sql_statements(
+                    statements, engine, st.session_state.get('sql_page_size', DEFAULT_QUERY_PAGE_SIZE),
+                    use_cache, int(timeout_seconds), frames if target == "Local" else None
+                )
+            st.session_state.sql_results = [
+                {
+                    "query": statement, "pager": pager, "error": error, "started_at": started_at,
+                    "open_seconds": open_seconds, "key_suffix": suffix,
+                    "target": "local" if target == "Local" else "database"
+                }
+                for statement, suffix, (pager, error, open_seconds) in zip(statements, suffixes, results)
+            ]
+            for suffix in suffixes:
+                st.session_state[f'sql_result_page{suffix}'] = 0
+
+    # Profile query (executes it under EXPLAIN ANALYZE; the plan replaces the previous one)
+    if profile_btn and query.strip():
+        if target == "Local":
+            plan, error = None, "Profile runs on the Database target; switch 'Run on' to Database."
+        elif len(split_statements(query)) > 1:
+            plan, error = None, "Profile runs one statement at a time; leave a single statement in the editor."
+        else:
+            with st.spinner("🔬 Profiling query..."):
+                plan, error = profile_sql_query(query, engine, int(timeout_seconds))
+        st.session_state.sql_profile = {"query": query, "plan": plan, "error": error}
 
-        with st.spinner("🔄 Executing query..."):
-            df_result, error = execute_sql_query(query, engine)
+    sql_profile = st.session_state.get('sql_profile')
 
-        if error:
-            st.error(f"❌ Query Error: {error}")
+    if sql_profile:
+        st.markdown("---")
+        st.markdown("### 🔬 Query Profile")
 
-            with st.expander("🔍 Query Details"):
-                st.code(query, language="sql")
+        if sql_profile["error"]:
+            st.error(f"❌ Profile Error: {sql_profile['error']}")
         else:
-            # Success - show results
-            st.success(f"✅ Query executed successfully! Retrieved {len(df_result):,} rows.")
-
-            # Result metrics
-            result_col1, result_col2, result_col3 = st.columns(3)
-
-            with result_col1:
-                st.metric("📝 Rows", f"{len(df_result):,}")
-            with result_col2:
-                st.metric("📋 Columns", len(df_result.columns))
-            with result_col3:
-                memory_mb = df_result.memory_usage(deep=True).sum() / (1024 * 1024)
-                st.metric("💾 Memory", f"{memory_mb:.2f} MB")
-
-            # Display results
-            st.dataframe(df_result, use_container_width=True, height=400)
-
-            # Export options
-            st.markdown("### 📥 Export Results")
-
-            export_col1, export_col2, export_col3 = st.columns(3)
-
-            with export_col1:
-                # Excel export
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                    df_result.to_excel(writer, index=False, sheet_name="Query Results")
-                output.seek(0)
-
-                st.download_button(
-                    label="📊 Download as Excel",
-                    data=output,
-                    file_name=f"query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True
-                )
+            render_query_profile(sql_profile["plan"])
 
-            with export_col2:
-                # CSV export
-                csv = df_result.to_csv(index=False)
-                st.download_button(
-                    label="📄 Download as CSV",
-                    data=csv,
-                    file_name=f"query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+        with st.expander("🔍 Profiled Query"):
+            st.code(sql_profile["query"], language="sql")
 
-            with export_col3:
-                # JSON export
-                json = df_result.to_json(orient='records', indent=2)
-                st.download_button(
-                    label="📋 Download as JSON",
-                    data=json,
-                    file_name=f"query_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json",
-                    use_container_width=True
-                )
+    sql_results = st.session_state.get('sql_results')
 
-            # Query info
-            with st.expander("🔍 Query Details"):
-                st.code(query, language="sql")
+    if sql_results:
+        st.markdown("---")
+        st.markdown("### 📊 Query Results")
 
-    # Query history (optional - can add later)
+        if len(sql_results) == 1:
+            render_query_result(sql_results[0])
+        else:
+            tabs = st.tabs([
+                f"{i}. {result['query'][:40]}{'...' if len(result['query']) > 40 else ''}"
+                for i, result in enumerate(sql_results, 1)
+            ])
+            for tab, sql_result in zip(tabs, sql_results):
+                with tab:
+                    render_query_result(sql_result)
+
+            # Wall time of the batch against the time the statements would take one after another
+            if all(result.get("finished") for result in sql_results):
+                timed = [
+                    result["pager"] for result in sql_results
+                    if result["pager"] is not None and result["pager"]["first_page_seconds"] is not None
+                ]
+                if timed:
+                    wall = max(p["opened_at"] + p["first_page_seconds"] for p in timed) - sql_results[0]["started_at"]
+                    st.caption(
+                        f"⏱️ {len(sql_results)} statements ran concurrently in {wall:.2f}s "
+                        f"(sum of statement times {sum(p['first_page_seconds'] for p in timed):.2f}s)"
+                    )
+
+    # Query history (kept in a local SQLite file across sessions)
     st.markdown("---")
-    st.markdown("### 📜 Recent Queries")
-
-    if 'query_history' not in st.session_state:
-        st.session_state.query_history = []
-
-    # Add current query to history if executed
-    if execute_btn and query.strip() and query not in st.session_state.query_history:
-        st.session_state.query_history.insert(0, query)
-        st.session_state.query_history = st.session_state.query_history[:5]  # Keep last 5
-
-    if st.session_state.query_history:
-        for i, hist_query in enumerate(st.session_state.query_history, 1):
-            col1, col2 = st.columns([5, 1])
-            with col1:
-                st.text(f"{i}. {hist_query[:100]}..." if len(hist_query) > 100 else f"{i}. {hist_query}")
-            with col2:
-                if st.button("🔄", key=f"rerun_{i}"):
-                    st.session_state.sql_query = hist_query
-                    st.rerun()
-    else:
-        st.info("No query history yet. Execute a query to see it here.")
-
+    st.markdown("### 📜 Query History")
+    render_query_history()
 
 if __name__ == "__main__":
     st.set_page_config(page_title="SQL Console", layout="wide", page_icon="💻")
@@ -3,12 +3,32 @@ HDFC Final Status Analysis Module
 Analyze final decision counts with creation and final decision date filters
 """
 
+import os
+import sys
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from io import BytesIO
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.app_config import STATUS_CATEGORIES
+from database.daily_rollup import (
+    ROLLUP_SOURCE_COLUMNS, build_daily_rollup, filter_rollup, load_daily_rollup, load_mis_version,
+    rollup_status_counts
+)
+from utils.data_grid import render_data_grid
+from utils.export_service import (
+    ARROW_STREAM_MIME, EXCEL_MIME, EXPORT_MEMORY_NOTE, PARQUET_MIME, export_arrow, export_excel, export_parquet,
+    read_export_file
+)
+from utils.mis_store import (
+    cached, cached_latest, column_value_counts, distinct_values, filter_date_ranges, get_date_range,
+    get_parsed_dates, get_source_version, get_status_codes, set_source_version
+)
 
 
 # Status mapping
@@ -23,25 +43,6 @@ FINAL_STATUS_MAP = {
 }
 
 
-def parse_dates_safely(date_series):
-    """Parse dates with multiple format handling"""
-    parsed_dates = []
-    for date_val in date_series:
-        if pd.isna(date_val):
-            parsed_dates.append(pd.NaT)
-            continue
-        try:
-            parsed = pd.to_datetime(date_val, dayfirst=True, format='mixed')
-            parsed_dates.append(parsed)
-        except:
-            try:
-                parsed = pd.to_datetime(date_val, dayfirst=True)
-                parsed_dates.append(parsed)
-            except:
-                parsed_dates.append(pd.NaT)
-    return pd.Series(parsed_dates)
-
-
 def find_column(df, keywords):
     """Find column that contains any of the keywords (case insensitive)"""
     if isinstance(keywords, str):
@@ -54,6 +55,577 @@ def find_column(df, keywords):
     return None
 
 
+def end_of_day(date_value):
+    """Last instant of the given day, so end-date filters include the whole day"""
+    return pd.Timestamp(date_value).normalize() + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+
+
+def get_status_rollup(df_mis, db_engine, creation_col, decision_col, ipa_col, status_col):
+    """
+    Daily status rollup matching the loaded MIS data
+
+    Uses the HDFC_MIS_Daily_Rollup table when the data was loaded from the
+    database at the MIS version the table was built from (and the counts
+    cover exactly these rows); otherwise builds the same rollup from the
+    loaded frame. Either way it is fetched once per data version.
+    """
+    detected = {"creation": creation_col, "decision": decision_col, "ipa": ipa_col, "status": status_col}
+    source_version = get_source_version(df_mis)
+
+    if db_engine is not None and source_version is not None and detected == ROLLUP_SOURCE_COLUMNS:
+        db_rollup, error = cached(
+            df_mis, "daily_rollup_table", lambda: load_daily_rollup(db_engine, source_version=source_version)
+        )
+        if not error and not db_rollup.empty and db_rollup["application_count"].sum() == len(df_mis):
+            return db_rollup
+
+    return build_daily_rollup(df_mis, creation_col, decision_col, ipa_col, status_col)
+
+
+def get_filtered_positions(df_mis, date_ranges):
+    """Row positions of df_mis in the date ranges, kept for the latest filter"""
+    return cached_latest(
+        df_mis, "status_positions", tuple(date_ranges), lambda: filter_date_ranges(df_mis, date_ranges)
+    )
+
+
+def get_filtered_rows(df_mis, date_ranges, creation_col, decision_col, status_col):
+    """
+    MIS rows in the date ranges with parsed date columns and the mapped status
+
+    Only the drill-down and download paths build this frame; the latest
+    filter's rows are kept per data version, so reruns reuse them.
+    """
+    def compute():
+        positions = get_filtered_positions(df_mis, date_ranges)
+        df_filtered = df_mis.iloc[positions].copy()
+        for col in (creation_col, decision_col):
+            if col:
+                df_filtered[col] = get_parsed_dates(df_mis, col).to_numpy()[positions]
+        if status_col:
+            # Mapped status for display from the cached int8 category codes
+            status_codes = get_status_codes(df_mis, status_col, FINAL_STATUS_MAP, normalize=True)[positions]
+            df_filtered['mapped_status'] = np.array(STATUS_CATEGORIES, dtype=object)[status_codes]
+        return df_filtered
+
+    key = (tuple(date_ranges), creation_col, decision_col, status_col)
+    return cached_latest(df_mis, "status_filtered_rows", key, compute)
+
+
+@st.fragment
+def render_status_pie(status_counts):
+    """Chart 1 panel; reruns on its own when its options change"""
+    # Chart 1: Pie Chart
+    st.markdown("#### 📊 Chart 1: Status Distribution Pie Chart")
+    with st.expander("⚙️ Customize Pie Chart", expanded=True):
+        pie_col1, pie_col2 = st.columns(2)
+
+        with pie_col1:
+            pie_status_filter = st.multiselect(
+                "Select statuses:",
+                options=['Card Out', 'Declined', 'Inprogress', 'Other'],
+                default=['Card Out', 'Declined', 'Inprogress', 'Other'],
+
+                key="pie_status_filter"
+            )
+
+        with pie_col2:
+            pie_chart_type = st.selectbox(
+                "Chart Style:",
+                options=["Donut (Hole)", "Full Pie"],
+                key="pie_chart_type"
+            )
+
+    status_df_pie = pd.DataFrame({
+        'Status': ['Card Out', 'Declined', 'Inprogress', 'Other'],
+        'Count': [
+            status_counts['Card Out'],
+            status_counts['Declined'],
+            status_counts['Inprogress'],
+            status_counts['Other']
+        ]
+    })
+    status_df_pie = status_df_pie[status_df_pie['Status'].isin(pie_status_filter)]
+    status_df_pie = status_df_pie[status_df_pie['Count'] > 0]
+
+    if not status_df_pie.empty:
+        fig1 = px.pie(
+            status_df_pie,
+            values='Count',
+            names='Status',
+            title='Final Decision Distribution',
+            hole=0.4 if pie_chart_type == "Donut (Hole)" else 0,
+            color='Status',
+            color_discrete_map={
+                'Card Out': '#10B981',
+                'Declined': '#EF4444',
+                'Inprogress': '#3B82F6',
+                'Other': '#6B7280'
+            }
+        )
+        fig1.update_traces(textposition='inside', textinfo='percent+label+value')
+        st.plotly_chart(fig1, use_container_width=True)
+    else:
+        st.info("No data to display - select at least one status")
+
+
+@st.fragment
+def render_status_bar(status_counts):
+    """Chart 2 panel; reruns on its own when its options change"""
+    # Chart 2: Bar Chart
+    st.markdown("#### 📊 Chart 2: Status Count Bar Chart")
+    with st.expander("⚙️ Customize Bar Chart", expanded=False):
+        bar_col1, bar_col2 = st.columns(2)
+
+        with bar_col1:
+            bar_status_filter = st.multiselect(
+                "Select statuses:",
+                options=['Card Out', 'Declined', 'Inprogress', 'Other'],
+                default=['Card Out', 'Declined', 'Inprogress', 'Other'],
+                key="bar_status_filter"
+            )
+
+        with bar_col2:
+            bar_orientation = st.selectbox(
+                "Orientation:",
+                options=["Vertical", "Horizontal"],
+                key="bar_orientation"
+            )
+
+    status_df_bar = pd.DataFrame({
+        'Status': ['Card Out', 'Declined', 'Inprogress', 'Other'],
+        'Count': [
+            status_counts['Card Out'],
+            status_counts['Declined'],
+            status_counts['Inprogress'],
+            status_counts['Other']
+        ]
+    })
+    status_df_bar = status_df_bar[status_df_bar['Status'].isin(bar_status_filter)]
+    status_df_bar = status_df_bar[status_df_bar['Count'] > 0]
+
+    if not status_df_bar.empty:
+        if bar_orientation == "Vertical":
+            fig2 = px.bar(
+                status_df_bar,
+                x='Status',
+                y='Count',
+                title='Status Counts',
+                color='Status',
+                color_discrete_map={
+                    'Card Out': '#10B981',
+                    'Declined': '#EF4444',
+                    'Inprogress': '#3B82F6',
+                    'Other': '#6B7280'
+                },
+                text='Count'
+            )
+            fig2.update_traces(textposition='outside')
+        else:
+            fig2 = px.bar(
+                status_df_bar,
+                y='Status',
+                x='Count',
+                title='Status Counts',
+                orientation='h',
+                color='Status',
+                color_discrete_map={
+                    'Card Out': '#10B981',
+                    'Declined': '#EF4444',
+                    'Inprogress': '#3B82F6',
+                    'Other': '#6B7280'
+                },
+                text='Count'
+            )
+            fig2.update_traces(textposition='outside')
+
+        fig2.update_layout(showlegend=False)
+        st.plotly_chart(fig2, use_container_width=True)
+
+
+@st.fragment
+def render_conversion_funnel(status_counts):
+    """Chart 3 panel; reruns on its own when its options change"""
+    st.markdown("#### 📊 Chart 3: Conversion Funnel")
+    with st.expander("⚙️ Customize Funnel", expanded=False):
+        funnel_col1, funnel_col2 = st.columns(2)
+
+        with funnel_col1:
+            funnel_stages = st.multiselect(
+                "Funnel stages:",
+                options=["Total Applications", "IPA Approved", "Card Out"],
+                default=["Total Applications", "IPA Approved", "Card Out"],
+
+                key="funnel_stages"
+            )
+
+        with funnel_col2:
+            funnel_show_percentages = st.checkbox(
+                "Show percentages",
+                value=True,
+                key="funnel_show_percentages"
+            )
+
+    funnel_y = []
+    funnel_x = []
+
+    if "Total Applications" in funnel_stages:
+        funnel_y.append("Total Applications")
+        funnel_x.append(status_counts['Total Applications'])
+    if "IPA Approved" in funnel_stages:
+        funnel_y.append("IPA Approved")
+        funnel_x.append(status_counts['IPA Approved'])
+    if "Card Out" in funnel_stages:
+        funnel_y.append("Card Out")
+        funnel_x.append(status_counts['Card Out'])
+
+    if funnel_y:
+        fig3 = go.Figure(go.Funnel(
+            y=funnel_y,
+            x=funnel_x,
+            textposition="inside",
+            textinfo="value+percent initial" if funnel_show_percentages else "value",
+            marker={
+                "color": ["#3B82F6", "#764ba2", "#10B981"][:len(funnel_y)],
+                "line": {"width": 1, "color": "white"}
+            }
+        ))
+        fig3.update_layout(title="Conversion Funnel", height=400)
+        st.plotly_chart(fig3, use_container_width=True)
+
+
+@st.fragment
+def render_category_breakdown(df_mis, positions, categorical_cols, status_counts):
+    """Chart 4 panel, counted from the cached column codes of the filtered rows"""
+    st.markdown("#### 📊 Chart 4: Custom Category Breakdown")
+    with st.expander("⚙️ Customize Breakdown Chart", expanded=False):
+        custom_col1, custom_col2, custom_col3 = st.columns(3)
+
+        with custom_col1:
+            if categorical_cols:
+                custom_category_col = st.selectbox(
+                    "Select column:",
+                    options=['None'] + categorical_cols,
+
+                    key="custom_category_col"
+                )
+            else:
+                custom_category_col = 'None'
+
+        with custom_col2:
+            custom_top_n = st.number_input(
+                "Show Top N:",
+                min_value=5,
+                max_value=50,
+                value=10,
+                key="custom_top_n"
+            )
+
+        with custom_col3:
+            custom_chart_type = st.selectbox(
+                "Chart Type:",
+                options=["Bar Chart", "Pie Chart"],
+                key="custom_chart_type"
+            )
+
+    if custom_category_col == 'mapped_status':
+        category_counts = pd.Series(
+            {category: status_counts[category] for category in STATUS_CATEGORIES}, name="count"
+        )
+        category_counts = category_counts[category_counts > 0].sort_values(ascending=False, kind='stable')
+    elif custom_category_col != 'None' and custom_category_col in df_mis.columns:
+        category_counts = column_value_counts(df_mis, custom_category_col, positions)
+    else:
+        category_counts = None
+
+    if category_counts is not None:
+        category_counts = category_counts.head(custom_top_n)
+
+        if custom_chart_type == "Bar Chart":
+            fig_custom = px.bar(
+                x=category_counts.index,
+                y=category_counts.values,
+                title=f"Top {custom_top_n} - Distribution by {custom_category_col}",
+                labels={'x': custom_category_col, 'y': 'Count'},
+                color=category_counts.values,
+                color_continuous_scale="Viridis",
+                text=category_counts.values
+            )
+            fig_custom.update_traces(textposition='outside')
+            fig_custom.update_layout(showlegend=False, height=400)
+        else:
+            fig_custom = px.pie(
+                values=category_counts.values,
+                names=category_counts.index,
+                title=f"Top {custom_top_n} - Distribution by {custom_category_col}",
+                hole=0.4
+            )
+            fig_custom.update_traces(textposition='inside', textinfo='percent+label+value')
+            fig_custom.update_layout(height=400)
+
+        st.plotly_chart(fig_custom, use_container_width=True)
+
+
+@st.fragment
+def render_status_detail(df_filtered, df_mis, positions, status_counts,
+                         creation_col, final_decision_col, final_status_col, ipa_status_col):
+    """Detailed Data tab; column choice and value filters rerun only this tab"""
+    # Default important columns
+    default_cols = [creation_col, final_decision_col, ipa_status_col, final_status_col]
+    default_cols = [col for col in default_cols if col is not None]
+
+    # Add mapped_status to default
+    if 'mapped_status' in df_filtered.columns:
+        default_cols.append('mapped_status')
+
+    # Column selector
+    col_select1, col_select2 = st.columns([3, 1])
+
+    with col_select1:
+        # Get all available columns
+        all_cols = df_filtered.columns.tolist()
+
+        # Multiselect for columns
+        selected_cols = st.multiselect(
+            "Select columns to display:",
+            options=all_cols,
+            default=[col for col in default_cols if col in all_cols],
+
+        )
+
+    with col_select2:
+        if st.button("Reset Columns", use_container_width=True):
+            selected_cols = default_cols
+
+    # Use selected columns or default
+    display_cols = selected_cols if selected_cols else default_cols
+
+    # Column value filters
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
+
+    # Selected (column, values) filters, applied together below
+    value_filters = []
+
+    # Add filters for each displayed column
+    with filter_col1:
+        if final_status_col and final_status_col in display_cols:
+            unique_values = distinct_values(df_mis, final_status_col, positions)
+            selected_status = st.multiselect(
+                f"Filter {final_status_col}:",
+                options=unique_values,
+
+            )
+            if selected_status:
+                value_filters.append((final_status_col, tuple(selected_status)))
+
+    with filter_col2:
+        if ipa_status_col and ipa_status_col in display_cols:
+            unique_values = distinct_values(df_mis, ipa_status_col, positions)
+            selected_ipa = st.multiselect(
+                f"Filter {ipa_status_col}:",
+                options=unique_values,
+
+            )
+            if selected_ipa:
+                value_filters.append((ipa_status_col, tuple(selected_ipa)))
+
+    with filter_col3:
+        if 'mapped_status' in df_filtered.columns and 'mapped_status' in display_cols:
+            unique_values = sorted(category for category in STATUS_CATEGORIES if status_counts[category])
+            selected_mapped = st.multiselect(
+                "Filter Status Category:",
+                options=unique_values,
+
+            )
+            if selected_mapped:
+                value_filters.append(('mapped_status', tuple(selected_mapped)))
+
+    # Additional column filters (expandable)
+    with st.expander("➕ More Column Filters", expanded=False):
+        other_cols = [col for col in display_cols if col not in [final_status_col, ipa_status_col, 'mapped_status', creation_col, final_decision_col]]
+
+        if other_cols:
+            filter_cols = st.columns(min(3, len(other_cols)))
+            for idx, col in enumerate(other_cols):
+                with filter_cols[idx % 3]:
+                    if df_filtered[col].dtype == 'object':
+                        unique_values = distinct_values(df_mis, col, positions)
+                        if len(unique_values) <= 50:  # Only show filter if reasonable number of unique values
+                            selected_vals = st.multiselect(
+                                f"Filter {col}:",
+                                options=unique_values,
+                                key=f"filter_{col}"
+                            )
+                            if selected_vals:
+                                value_filters.append((col, tuple(selected_vals)))
+
+    def build_view():
+        view = df_filtered
+        for col, values in value_filters:
+            view = view[view[col].isin(values)]
+
+        # Select only chosen columns
+        view = view[display_cols]
+
+        # Rename columns for better readability
+        rename_map = {}
+        if final_status_col and final_status_col in view.columns:
+            rename_map[final_status_col] = 'FINAL_DECISION'
+        if 'mapped_status' in view.columns:
+            rename_map['mapped_status'] = 'STATUS_CATEGORY'
+
+        if rename_map:
+            view = view.rename(columns=rename_map)
+        return view
+
+    # The same view object is reused while columns and filters are unchanged,
+    # so the grid's per-frame sort and search caches keep hitting
+    display_df = cached_latest(
+        df_filtered, "status_detail_view", (tuple(display_cols), tuple(value_filters)), build_view
+    )
+
+    # Paginated grid, sorted by creation date in ascending order if available
+    render_data_grid(
+        display_df,
+        key="status_detail_grid",
+        default_sort=creation_col if creation_col in display_df.columns else None,
+        height=500
+    )
+
+    st.caption(f"Showing {len(display_df):,} of {len(df_filtered):,} filtered records ({len(df_mis):,} total)")
+
+
+def render_status_downloads(get_rows, status_counts):
+    """
+    Download tab: status summary and the filtered rows in every export format
+
+    Args:
+        get_rows: Zero-argument callable returning the filtered rows; called
+            only when a rows download is clicked
+        status_counts: Status counts for the summary
+    """
+    st.caption(EXPORT_MEMORY_NOTE)
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Summary CSV
+        summary_df = pd.DataFrame([status_counts])
+        csv_summary = summary_df.to_csv(index=False)
+
+        st.download_button(
+            label="📊 Download Status Summary (CSV)",
+            data=csv_summary,
+            file_name=f"Status_Summary_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
+    with col2:
+        # Filtered data Excel (streamed to a temp file in chunks when clicked)
+        st.download_button(
+            label="📥 Download Filtered Data (Excel)",
+            data=lambda: read_export_file(export_excel(get_rows(), "Filtered Data", [("Summary", summary_df)])),
+            file_name=f"Status_Analysis_{datetime.now().strftime('%Y%m%d')}.xlsx",
+            mime=EXCEL_MIME,
+            use_container_width=True
+        )
+
+    # Columnar formats
+    arrow_col1, arrow_col2 = st.columns(2)
+    with arrow_col1:
+        st.download_button(
+            label="🗜️ Download as Parquet",
+            data=lambda: read_export_file(export_parquet(get_rows())),
+            file_name=f"Status_Analysis_{datetime.now().strftime('%Y%m%d')}.parquet",
+            mime=PARQUET_MIME,
+            use_container_width=True
+        )
+    with arrow_col2:
+        st.download_button(
+            label="🏹 Download as Arrow",
+            data=lambda: read_export_file(export_arrow(get_rows())),
+            file_name=f"Status_Analysis_{datetime.now().strftime('%Y%m%d')}.arrows",
+            mime=ARROW_STREAM_MIME,
+            use_container_width=True
+        )
+
+
+def render_status_visualizations(df_mis, positions, status_counts, rollup_filtered, filter_type,
+                                 creation_col, final_decision_col, final_status_col):
+    """Visualizations tab: status charts, category breakdown, daily trend and conversion rates"""
+    st.markdown("### 📊 Visualizations")
+
+    # Get categorical columns (text columns of the filtered rows, dates parsed)
+    categorical_cols = [
+        col for col in df_mis.select_dtypes(include=['object']).columns
+        if col not in (creation_col, final_decision_col)
+    ]
+    if final_status_col:
+        categorical_cols.append('mapped_status')
+
+    st.markdown("---")
+
+    # Each chart panel is a fragment over the precomputed counts
+    viz_col1, viz_col2 = st.columns(2)
+
+    with viz_col1:
+        render_status_pie(status_counts)
+
+    with viz_col2:
+        render_status_bar(status_counts)
+
+    render_conversion_funnel(status_counts)
+    render_category_breakdown(df_mis, positions, categorical_cols, status_counts)
+
+    # Chart 5: Daily Trend (from the daily rollup)
+    st.markdown("#### 📈 Chart 5: Daily Status Trend")
+    trend_date_col = "decision_date" if filter_type == "Final Decision Date" else "creation_date"
+    trend_df = (
+        rollup_filtered.dropna(subset=[trend_date_col])
+        .groupby([trend_date_col, "mapped_status"])["application_count"]
+        .sum()
+        .reset_index()
+    )
+    if not trend_df.empty:
+        fig_trend = px.line(
+            trend_df,
+            x=trend_date_col,
+            y="application_count",
+            color="mapped_status",
+            markers=True,
+            title="Daily Applications by Status",
+            labels={
+                trend_date_col: "Decision Date" if trend_date_col == "decision_date" else "Creation Date",
+                "application_count": "Count",
+                "mapped_status": "Status"
+            },
+            color_discrete_map={
+                'Card Out': '#10B981',
+                'Declined': '#EF4444',
+                'Inprogress': '#3B82F6',
+                'Other': '#6B7280'
+            }
+        )
+        fig_trend.update_layout(height=400, hovermode='x unified')
+        st.plotly_chart(fig_trend, use_container_width=True)
+
+    # Conversion rates
+    st.markdown("#### 📈 Conversion Rates")
+    conv_col1, conv_col2, conv_col3 = st.columns(3)
+
+    with conv_col1:
+        ipa_rate = (status_counts['IPA Approved'] / status_counts['Total Applications'] * 100) if status_counts['Total Applications'] > 0 else 0
+        st.metric("IPA Approval Rate", f"{ipa_rate:.2f}%")
+
+    with conv_col2:
+        card_out_rate = (status_counts['Card Out'] / status_counts['Total Applications'] * 100) if status_counts['Total Applications'] > 0 else 0
+        st.metric("Card Out Rate", f"{card_out_rate:.2f}%")
+
+    with conv_col3:
+        decline_rate = (status_counts['Declined'] / status_counts['Total Applications'] * 100) if status_counts['Total Applications'] > 0 else 0
+        st.metric("Decline Rate", f"{decline_rate:.2f}%")
+
+
 def render_status_analysis_module(df_mis=None, db_engine=None):
     """Main render function for status analysis module"""
     st.markdown("## 📊 Final Status Analysis")
@@ -115,8 +687,10 @@ def render_status_analysis_module(df_mis=None, db_engine=None):
                 if db_engine:
                     with st.spinner("Loading MIS data from database..."):
                         try:
+                            version, _ = load_mis_version(db_engine)
                             df_mis_loaded = pd.read_sql('SELECT * FROM "HDFC_MIS_Data"', db_engine)
                             df_mis_loaded.columns = df_mis_loaded.columns.str.strip()
+                            set_source_version(df_mis_loaded, version)
                             st.session_state.status_mis_data = df_mis_loaded
                             st.session_state.status_mis_source = "database"
                             st.success(f"✅ Loaded {len(df_mis_loaded):,} records from DB")
@@ -145,23 +719,11 @@ def render_status_analysis_module(df_mis=None, db_engine=None):
                     st.warning("⚠️ No date columns found. Available columns: " + ", ".join(df_mis.columns.tolist()))
                     return
 
-                # Parse dates
-                if creation_col:
-                    df_mis[creation_col] = parse_dates_safely(df_mis[creation_col])
-                if final_decision_col:
-                    df_mis[final_decision_col] = parse_dates_safely(df_mis[final_decision_col])
-
                 # Get date ranges from CREATION_DATE_TIME - filter out invalid dates properly
                 if creation_col:
-                    # Filter for valid dates only (not NaT and after year 2000 to avoid epoch dates)
-                    valid_creation = df_mis[
-                        (df_mis[creation_col].notna()) &
-                        (df_mis[creation_col] > pd.Timestamp('2000-01-01'))
-                    ]
-                    if len(valid_creation) > 0:
-                        min_creation = valid_creation[creation_col].min()
-                        max_creation = valid_creation[creation_col].max()
-                    else:
+                    # Valid dates only (not NaT and after year 2000 to avoid epoch dates)
+                    min_creation, max_creation = get_date_range(df_mis, creation_col)
+                    if min_creation is None:
                         st.error("❌ No valid creation dates found (dates must be after 2000-01-01)")
                         return
                 else:
@@ -169,14 +731,8 @@ def render_status_analysis_module(df_mis=None, db_engine=None):
                     return
 
                 if final_decision_col:
-                    # Filter for valid dates only (not NaT and after year 2000)
-                    valid_decision = df_mis[
-                        (df_mis[final_decision_col].notna()) &
-                        (df_mis[final_decision_col] > pd.Timestamp('2000-01-01'))
-                    ]
-                    if len(valid_decision) > 0:
-                        min_decision = valid_decision[final_decision_col].min()
-                        max_decision = valid_decision[final_decision_col].max()
+                    # Valid dates only (not NaT and after year 2000)
+                    min_decision, max_decision = get_date_range(df_mis, final_decision_col)
 
                 # Date filter selection
                 st.markdown("### 📅 Filter Options")
@@ -254,91 +810,51 @@ def render_status_analysis_module(df_mis=None, db_engine=None):
                     st.markdown("<br>", unsafe_allow_html=True)
                     search_button = st.button("🔍 Search", use_container_width=True, type="primary")
 
-                # Apply filters
-                df_filtered = df_mis.copy()
+                # Date ranges: end dates include the whole day, matching the daily rollup
+                date_ranges = []
 
                 if filter_type == "Creation Date" and creation_col:
-                    df_filtered = df_filtered[
-                        (df_filtered[creation_col] >= pd.Timestamp(start_date)) &
-                        (df_filtered[creation_col] <= pd.Timestamp(end_date))
-                    ]
+                    date_ranges.append((creation_col, pd.Timestamp(start_date), end_of_day(end_date)))
                     date_range_text = f"Creation Date: {start_date.strftime('%b %d, %Y')} to {end_date.strftime('%b %d, %Y')}"
                 elif filter_type == "Final Decision Date" and final_decision_col:
-                    df_filtered = df_filtered[
-                        (df_filtered[final_decision_col] >= pd.Timestamp(start_date)) &
-                        (df_filtered[final_decision_col] <= pd.Timestamp(end_date))
-                    ]
+                    date_ranges.append((final_decision_col, pd.Timestamp(start_date), end_of_day(end_date)))
                     date_range_text = f"Final Decision Date: {start_date.strftime('%b %d, %Y')} to {end_date.strftime('%b %d, %Y')}"
                 elif filter_type == "Both Dates":
                     if creation_col:
-                        df_filtered = df_filtered[
-                            (df_filtered[creation_col] >= pd.Timestamp(start_date_creation)) &
-                            (df_filtered[creation_col] <= pd.Timestamp(max_creation))
-                        ]
+                        date_ranges.append((creation_col, pd.Timestamp(start_date_creation), pd.Timestamp(max_creation)))
                     if final_decision_col:
-                        df_filtered = df_filtered[
-                            (df_filtered[final_decision_col] >= pd.Timestamp(min_decision)) &
-                            (df_filtered[final_decision_col] <= pd.Timestamp(end_date_decision))
-                        ]
+                        date_ranges.append((final_decision_col, pd.Timestamp(min_decision), end_of_day(end_date_decision)))
                     date_range_text = f"Creation: {start_date_creation.strftime('%b %d, %Y')}+ | Decision: until {end_date_decision.strftime('%b %d, %Y')}"
 
-                if len(df_filtered) == 0:
+                # KPIs and trends come from the daily rollup
+                rollup = get_status_rollup(
+                    df_mis, db_engine, creation_col, final_decision_col, ipa_status_col, final_status_col
+                )
+                rollup_date_cols = {creation_col: "creation_date", final_decision_col: "decision_date"}
+                rollup_filtered = filter_rollup(
+                    rollup, [(rollup_date_cols[col], start, end) for col, start, end in date_ranges]
+                )
+                status_counts = rollup_status_counts(rollup_filtered)
+
+                if status_counts["Total Applications"] == 0:
                     st.warning("⚠️ No records found in selected date range")
                     return
 
-                # Calculate status counts
-                status_counts = {}
-
-                # Prepare columns
-                if final_status_col:
-                    df_filtered['final_decision_upper'] = df_filtered[final_status_col].astype(str).str.upper().str.strip()
-
-                if ipa_status_col:
-                    df_filtered['ipa_status_upper'] = df_filtered[ipa_status_col].astype(str).str.upper().str.strip()
-
-                # IPA Approved: Use IPA_STATUS column ONLY
-                if ipa_status_col:
-                    ipa_approved_count = int((df_filtered['ipa_status_upper'] == "APPROVE").sum())
-                    status_counts["IPA Approved"] = ipa_approved_count
-                else:
-                    status_counts["IPA Approved"] = 0
-
-                # Card Out: when FINAL_DECISION is "Approve"
-                if final_status_col:
-                    approve_count = int((df_filtered['final_decision_upper'] == "APPROVE").sum())
-                    status_counts["Card Out"] = approve_count
-
-                    # Declined: when FINAL_DECISION is "IPA REJECT" or "Decline"
-                    declined_mask = (
-                        (df_filtered['final_decision_upper'] == "IPA REJECT") |
-                        (df_filtered['final_decision_upper'] == "DECLINE")
-                    )
-                    status_counts["Declined"] = int(declined_mask.sum())
-
-                    # Inprogress: when FINAL_DECISION is "IPA APPROVED DROPOFF CASE" or "Inprocess"
-                    inprogress_mask = (
-                        (df_filtered['final_decision_upper'] == "IPA APPROVED DROPOFF CASE") |
-                        (df_filtered['final_decision_upper'] == "INPROCESS")
-                    )
-                    status_counts["Inprogress"] = int(inprogress_mask.sum())
-
-                    # Other: everything else
-                    categorized_mask = (
-                        (df_filtered['final_decision_upper'] == "APPROVE") |
-                        declined_mask |
-                        inprogress_mask
-                    )
-                    status_counts["Other"] = int((~categorized_mask).sum())
-
-                    # Create mapped status for display
-                    df_filtered['mapped_status'] = "Other"
-                    df_filtered.loc[df_filtered['final_decision_upper'] == "APPROVE", 'mapped_status'] = "Card Out"
-                    df_filtered.loc[declined_mask, 'mapped_status'] = "Declined"
-                    df_filtered.loc[inprogress_mask, 'mapped_status'] = "Inprogress"
-                else:
+                if not final_status_col:
                     status_counts.update({"Card Out": 0, "Declined": 0, "Inprogress": 0, "Other": 0})
 
-                status_counts["Total Applications"] = len(df_filtered)
+                # IPA Approved: Use IPA_STATUS column ONLY
+                status_counts = {
+                    "IPA Approved": status_counts["IPA Approved"],
+                    "Card Out": status_counts["Card Out"],
+                    "Declined": status_counts["Declined"],
+                    "Inprogress": status_counts["Inprogress"],
+                    "Other": status_counts["Other"],
+                    "Total Applications": status_counts["Total Applications"]
+                }
+
+                # Matching row positions; raw rows are only copied for the drill-down and downloads
+                positions = get_filtered_positions(df_mis, date_ranges)
 
                 # Display metrics
                 col1, col2, col3, col4, col5 = st.columns(5)
@@ -354,412 +870,33 @@ def render_status_analysis_module(df_mis=None, db_engine=None):
                 with col5:
                     st.metric("⏳ Inprogress", f"{status_counts['Inprogress']:,}")
 
-                # Tabs for visualizations and data
-                tab1, tab2, tab3 = st.tabs(["📊 Visualizations", "📋 Detailed Data", "📥 Download"])
+                # Tabs for visualizations and data; only the selected tab runs
+                tab1, tab2, tab3 = st.tabs(
+                    ["📊 Visualizations", "📋 Detailed Data", "📥 Download"], key="status_tabs", on_change="rerun"
+                )
 
                 with tab1:
-                    st.markdown("### 📊 Visualizations")
-
-                    # Get categorical columns
-                    categorical_cols = df_filtered.select_dtypes(include=['object']).columns.tolist()
-
-                    st.markdown("---")
-
-                    # Chart 1: Pie Chart
-                    st.markdown("#### 📊 Chart 1: Status Distribution Pie Chart")
-                    with st.expander("⚙️ Customize Pie Chart", expanded=True):
-                        pie_col1, pie_col2 = st.columns(2)
-
-                        with pie_col1:
-                            pie_status_filter = st.multiselect(
-                                "Select statuses:",
-                                options=['Card Out', 'Declined', 'Inprogress', 'Other'],
-                                default=['Card Out', 'Declined', 'Inprogress', 'Other'],
-                                
-                                key="pie_status_filter"
-                            )
-
-                        with pie_col2:
-                            pie_chart_type = st.selectbox(
-                                "Chart Style:",
-                                options=["Donut (Hole)", "Full Pie"],
-                                key="pie_chart_type"
-                            )
-
-                    status_df_pie = pd.DataFrame({
-                        'Status': ['Card Out', 'Declined', 'Inprogress', 'Other'],
-                        'Count': [
-                            status_counts['Card Out'],
-                            status_counts['Declined'],
-                            status_counts['Inprogress'],
-                            status_counts['Other']
-                        ]
-                    })
-                    status_df_pie = status_df_pie[status_df_pie['Status'].isin(pie_status_filter)]
-                    status_df_pie = status_df_pie[status_df_pie['Count'] > 0]
-
-                    viz_col1, viz_col2 = st.columns(2)
-
-                    with viz_col1:
-                        if not status_df_pie.empty:
-                            fig1 = px.pie(
-                                status_df_pie,
-                                values='Count',
-                                names='Status',
-                                title='Final Decision Distribution',
-                                hole=0.4 if pie_chart_type == "Donut (Hole)" else 0,
-                                color='Status',
-                                color_discrete_map={
-                                    'Card Out': '#10B981',
-                                    'Declined': '#EF4444',
-                                    'Inprogress': '#3B82F6',
-                                    'Other': '#6B7280'
-                                }
-                            )
-                            fig1.update_traces(textposition='inside', textinfo='percent+label+value')
-                            st.plotly_chart(fig1, use_container_width=True)
-                        else:
-                            st.info("No data to display - select at least one status")
-
-                    with viz_col2:
-                        # Chart 2: Bar Chart
-                        st.markdown("#### 📊 Chart 2: Status Count Bar Chart")
-                        with st.expander("⚙️ Customize Bar Chart", expanded=False):
-                            bar_col1, bar_col2 = st.columns(2)
-
-                            with bar_col1:
-                                bar_status_filter = st.multiselect(
-                                    "Select statuses:",
-                                    options=['Card Out', 'Declined', 'Inprogress', 'Other'],
-                                    default=['Card Out', 'Declined', 'Inprogress', 'Other'],
-                                    key="bar_status_filter"
-                                )
-
-                            with bar_col2:
-                                bar_orientation = st.selectbox(
-                                    "Orientation:",
-                                    options=["Vertical", "Horizontal"],
-                                    key="bar_orientation"
-                                )
-
-                        status_df_bar = pd.DataFrame({
-                            'Status': ['Card Out', 'Declined', 'Inprogress', 'Other'],
-                            'Count': [
-                                status_counts['Card Out'],
-                                status_counts['Declined'],
-                                status_counts['Inprogress'],
-                                status_counts['Other']
-                            ]
-                        })
-                        status_df_bar = status_df_bar[status_df_bar['Status'].isin(bar_status_filter)]
-                        status_df_bar = status_df_bar[status_df_bar['Count'] > 0]
-
-                        if not status_df_bar.empty:
-                            if bar_orientation == "Vertical":
-                                fig2 = px.bar(
-                                    status_df_bar,
-                                    x='Status',
-                                    y='Count',
-                                    title='Status Counts',
-                                    color='Status',
-                                    color_discrete_map={
-                                        'Card Out': '#10B981',
-                                        'Declined': '#EF4444',
-                                        'Inprogress': '#3B82F6',
-                                        'Other': '#6B7280'
-                                    },
-                                    text='Count'
-                                )
-                                fig2.update_traces(textposition='outside')
-                            else:
-                                fig2 = px.bar(
-                                    status_df_bar,
-                                    y='Status',
-                                    x='Count',
-                                    title='Status Counts',
-                                    orientation='h',
-                                    color='Status',
-                                    color_discrete_map={
-                                        'Card Out': '#10B981',
-                                        'Declined': '#EF4444',
-                                        'Inprogress': '#3B82F6',
-                                        'Other': '#6B7280'
-                                    },
-                                    text='Count'
-                                )
-                                fig2.update_traces(textposition='outside')
-
-                            fig2.update_layout(showlegend=False)
-                            st.plotly_chart(fig2, use_container_width=True)
-
-                    # Chart 3: Conversion Funnel
-                    st.markdown("#### 📊 Chart 3: Conversion Funnel")
-                    with st.expander("⚙️ Customize Funnel", expanded=False):
-                        funnel_col1, funnel_col2 = st.columns(2)
-
-                        with funnel_col1:
-                            funnel_stages = st.multiselect(
-                                "Funnel stages:",
-                                options=["Total Applications", "IPA Approved", "Card Out"],
-                                default=["Total Applications", "IPA Approved", "Card Out"],
-                                
-                                key="funnel_stages"
-                            )
-
-                        with funnel_col2:
-                            funnel_show_percentages = st.checkbox(
-                                "Show percentages",
-                                value=True,
-                                key="funnel_show_percentages"
-                            )
-
-                    funnel_y = []
-                    funnel_x = []
-
-                    if "Total Applications" in funnel_stages:
-                        funnel_y.append("Total Applications")
-                        funnel_x.append(status_counts['Total Applications'])
-                    if "IPA Approved" in funnel_stages:
-                        funnel_y.append("IPA Approved")
-                        funnel_x.append(status_counts['IPA Approved'])
-                    if "Card Out" in funnel_stages:
-                        funnel_y.append("Card Out")
-                        funnel_x.append(status_counts['Card Out'])
-
-                    if funnel_y:
-                        fig3 = go.Figure(go.Funnel(
-                            y=funnel_y,
-                            x=funnel_x,
-                            textposition="inside",
-                            textinfo="value+percent initial" if funnel_show_percentages else "value",
-                            marker={
-                                "color": ["#3B82F6", "#764ba2", "#10B981"][:len(funnel_y)],
-                                "line": {"width": 1, "color": "white"}
-                            }
-                        ))
-                        fig3.update_layout(title="Conversion Funnel", height=400)
-                        st.plotly_chart(fig3, use_container_width=True)
-
-                    # Chart 4: Custom Breakdown
-                    st.markdown("#### 📊 Chart 4: Custom Category Breakdown")
-                    with st.expander("⚙️ Customize Breakdown Chart", expanded=False):
-                        custom_col1, custom_col2, custom_col3 = st.columns(3)
-
-                        with custom_col1:
-                            if categorical_cols:
-                                custom_category_col = st.selectbox(
-                                    "Select column:",
-                                    options=['None'] + categorical_cols,
-                                    
-                                    key="custom_category_col"
-                                )
-                            else:
-                                custom_category_col = 'None'
-
-                        with custom_col2:
-                            custom_top_n = st.number_input(
-                                "Show Top N:",
-                                min_value=5,
-                                max_value=50,
-                                value=10,
-                                key="custom_top_n"
-                            )
-
-                        with custom_col3:
-                            custom_chart_type = st.selectbox(
-                                "Chart Type:",
-                                options=["Bar Chart", "Pie Chart"],
-                                key="custom_chart_type"
-                            )
-
-                    if custom_category_col != 'None' and custom_category_col in df_filtered.columns:
-                        category_counts = df_filtered[custom_category_col].value_counts().head(custom_top_n)
-
-                        if custom_chart_type == "Bar Chart":
-                            fig_custom = px.bar(
-                                x=category_counts.index,
-                                y=category_counts.values,
-                                title=f"Top {custom_top_n} - Distribution by {custom_category_col}",
-                                labels={'x': custom_category_col, 'y': 'Count'},
-                                color=category_counts.values,
-                                color_continuous_scale="Viridis",
-                                text=category_counts.values
-                            )
-                            fig_custom.update_traces(textposition='outside')
-                            fig_custom.update_layout(showlegend=False, height=400)
-                        else:
-                            fig_custom = px.pie(
-                                values=category_counts.values,
-                                names=category_counts.index,
-                                title=f"Top {custom_top_n} - Distribution by {custom_category_col}",
-                                hole=0.4
-                            )
-                            fig_custom.update_traces(textposition='inside', textinfo='percent+label+value')
-                            fig_custom.update_layout(height=400)
-
-                        st.plotly_chart(fig_custom, use_container_width=True)
-
-                    # Conversion rates
-                    st.markdown("#### 📈 Conversion Rates")
-                    conv_col1, conv_col2, conv_col3 = st.columns(3)
-
-                    with conv_col1:
-                        ipa_rate = (status_counts['IPA Approved'] / status_counts['Total Applications'] * 100) if status_counts['Total Applications'] > 0 else 0
-                        st.metric("IPA Approval Rate", f"{ipa_rate:.2f}%")
-
-                    with conv_col2:
-                        card_out_rate = (status_counts['Card Out'] / status_counts['Total Applications'] * 100) if status_counts['Total Applications'] > 0 else 0
-                        st.metric("Card Out Rate", f"{card_out_rate:.2f}%")
-
-                    with conv_col3:
-                        decline_rate = (status_counts['Declined'] / status_counts['Total Applications'] * 100) if status_counts['Total Applications'] > 0 else 0
-                        st.metric("Decline Rate", f"{decline_rate:.2f}%")
+                    if tab1.open:
+                        render_status_visualizations(
+                            df_mis, positions, status_counts, rollup_filtered, filter_type,
+                            creation_col, final_decision_col, final_status_col
+                        )
 
                 with tab2:
-                    # Default important columns
-                    default_cols = [creation_col, final_decision_col, ipa_status_col, final_status_col]
-                    default_cols = [col for col in default_cols if col is not None]
-
-                    # Add mapped_status to default
-                    if 'mapped_status' in df_filtered.columns:
-                        default_cols.append('mapped_status')
-
-                    # Column selector
-                    col_select1, col_select2 = st.columns([3, 1])
-
-                    with col_select1:
-                        # Get all available columns
-                        all_cols = df_filtered.columns.tolist()
-
-                        # Multiselect for columns
-                        selected_cols = st.multiselect(
-                            "Select columns to display:",
-                            options=all_cols,
-                            default=[col for col in default_cols if col in all_cols],
-                            
+                    if tab2.open:
+                        render_status_detail(
+                            get_filtered_rows(df_mis, date_ranges, creation_col, final_decision_col, final_status_col),
+                            df_mis, positions, status_counts,
+                            creation_col, final_decision_col, final_status_col, ipa_status_col
                         )
 
-                    with col_select2:
-                        if st.button("Reset Columns", use_container_width=True):
-                            selected_cols = default_cols
-
-                    # Use selected columns or default
-                    display_cols = selected_cols if selected_cols else default_cols
-
-                    # Column value filters
-                    filter_col1, filter_col2, filter_col3 = st.columns(3)
-
-                    # Initialize filtered dataframe
-                    display_df = df_filtered.copy()
-
-                    # Add filters for each displayed column
-                    with filter_col1:
-                        if final_status_col and final_status_col in display_cols:
-                            unique_values = sorted(df_filtered[final_status_col].dropna().unique().tolist())
-                            selected_status = st.multiselect(
-                                f"Filter {final_status_col}:",
-                                options=unique_values,
-                                
-                            )
-                            if selected_status:
-                                display_df = display_df[display_df[final_status_col].isin(selected_status)]
-
-                    with filter_col2:
-                        if ipa_status_col and ipa_status_col in display_cols:
-                            unique_values = sorted(df_filtered[ipa_status_col].dropna().unique().tolist())
-                            selected_ipa = st.multiselect(
-                                f"Filter {ipa_status_col}:",
-                                options=unique_values,
-                                
-                            )
-                            if selected_ipa:
-                                display_df = display_df[display_df[ipa_status_col].isin(selected_ipa)]
-
-                    with filter_col3:
-                        if 'mapped_status' in df_filtered.columns and 'mapped_status' in display_cols:
-                            unique_values = sorted(df_filtered['mapped_status'].dropna().unique().tolist())
-                            selected_mapped = st.multiselect(
-                                "Filter Status Category:",
-                                options=unique_values,
-                                
-                            )
-                            if selected_mapped:
-                                display_df = display_df[display_df['mapped_status'].isin(selected_mapped)]
-
-                    # Additional column filters (expandable)
-                    with st.expander("➕ More Column Filters", expanded=False):
-                        other_cols = [col for col in display_cols if col not in [final_status_col, ipa_status_col, 'mapped_status', creation_col, final_decision_col]]
-
-                        if other_cols:
-                            filter_cols = st.columns(min(3, len(other_cols)))
-                            for idx, col in enumerate(other_cols):
-                                with filter_cols[idx % 3]:
-                                    if df_filtered[col].dtype == 'object':
-                                        unique_values = sorted(df_filtered[col].dropna().unique().tolist())
-                                        if len(unique_values) <= 50:  # Only show filter if reasonable number of unique values
-                                            selected_vals = st.multiselect(
-                                                f"Filter {col}:",
-                                                options=unique_values,
-                                                key=f"filter_{col}"
-                                            )
-                                            if selected_vals:
-                                                display_df = display_df[display_df[col].isin(selected_vals)]
-
-                    # Select only chosen columns
-                    display_df = display_df[display_cols].copy()
-
-                    # Sort by creation date in ascending order if available
-                    if creation_col and creation_col in display_df.columns:
-                        display_df = display_df.sort_values(by=creation_col, ascending=True)
-
-                    # Rename columns for better readability
-                    rename_map = {}
-                    if final_status_col and final_status_col in display_df.columns:
-                        rename_map[final_status_col] = 'FINAL_DECISION'
-                    if 'mapped_status' in display_df.columns:
-                        rename_map['mapped_status'] = 'STATUS_CATEGORY'
-
-                    if rename_map:
-                        display_df = display_df.rename(columns=rename_map)
-
-                    st.dataframe(
-                        display_df,
-                        use_container_width=True,
-                        height=500
-                    )
-
-                    st.caption(f"Showing {len(display_df):,} of {len(df_filtered):,} filtered records ({len(df_mis):,} total)")
-
                 with tab3:
-                    col1, col2 = st.columns(2)
-
-                    with col1:
-                        # Summary CSV
-                        summary_df = pd.DataFrame([status_counts])
-                        csv_summary = summary_df.to_csv(index=False)
-
-                        st.download_button(
-                            label="📊 Download Status Summary (CSV)",
-                            data=csv_summary,
-                            file_name=f"Status_Summary_{datetime.now().strftime('%Y%m%d')}.csv",
-                            mime="text/csv",
-                            use_container_width=True
-                        )
-
-                    with col2:
-                        # Filtered data Excel
-                        output = BytesIO()
-                        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                            df_filtered.to_excel(writer, sheet_name="Filtered Data", index=False)
-                            summary_df.to_excel(writer, sheet_name="Summary", index=False)
-                        output.seek(0)
-
-                        st.download_button(
-                            label="📥 Download Filtered Data (Excel)",
-                            data=output,
-                            file_name=f"Status_Analysis_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True
+                    if tab3.open:
+                        render_status_downloads(
+                            lambda: get_filtered_rows(
+                                df_mis, date_ranges, creation_col, final_decision_col, final_status_col
+                            ),
+                            status_counts
                         )
 
         except Exception as e:
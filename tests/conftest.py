@@ -0,0 +1,8 @@
+"""
+Shared pytest setup: make the project packages importable from the tests
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+"""
+Tests for database.daily_rollup
+"""
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from database.daily_rollup import ROLLUP_TABLE, load_daily_rollup, load_mis_version
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollup.db'}")
+    pd.DataFrame({
+        "id": [1, 2, 3], "table_name": ["HDFC_MIS_Data", "Campaign_Data", "HDFC_MIS_Data"],
+        "record_count": [10, 5, 12], "updated_at": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"])
+    }).to_sql("MIS_Update_Log", engine, index=False)
+    pd.DataFrame({
+        "creation_date": ["2024-01-02"], "decision_date": [None], "ipa_status": ["APPROVE"],
+        "mapped_status": ["Card Out"], "application_count": [12], "source_version": [3]
+    }).to_sql(ROLLUP_TABLE, engine, index=False)
+    yield engine
+    engine.dispose()
+
+
+def test_load_mis_version_is_the_latest_log_id(engine):
+    assert load_mis_version(engine) == (3, None)
+    assert load_mis_version(engine, "Campaign_Data") == (2, None)
+    assert load_mis_version(engine, "Never_Logged") == (None, None)
+
+
+def test_load_daily_rollup_only_for_its_source_version(engine):
+    rollup, error = load_daily_rollup(engine, source_version=3)
+    assert error is None
+    assert rollup["application_count"].tolist() == [12]
+    assert rollup["creation_date"].iloc[0] == pd.Timestamp("2024-01-02")
+
+    stale, error = load_daily_rollup(engine, source_version=2)
+    assert error is None and stale.empty
+    assert len(load_daily_rollup(engine)[0]) == 1
@@ -0,0 +1,71 @@
+import re
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from database import lc2_phone_map
+from database.lc2_phone_map import _seq_id_sql, ensure_seq_id_index, resolve_lc2_column, table_lc2_column
+
+MIS_COLUMNS = [f"COL_{i}" for i in range(12)]
+
+
+@pytest.mark.parametrize("columns, expected", [
+    (["APPLICATION_REFERENCE_NUMBER", "LC2_CODE", "LG_CODE"], "LC2_CODE"),
+    (["application_reference_number", " lc2_code "], " lc2_code "),
+    (["APP", "MIS_LC2_CODE_RAW"] + MIS_COLUMNS[2:], "COL_10"),
+    (MIS_COLUMNS, "COL_10"),
+])
+def test_resolve_lc2_column_matches_find_col_rules(columns, expected):
+    assert resolve_lc2_column(columns) == expected
+
+
+def test_resolve_lc2_column_without_match_or_fallback():
+    with pytest.raises(KeyError):
+        resolve_lc2_column(MIS_COLUMNS[:5])
+
+
+def sqlite_engine(path):
+    """SQLite engine with the Postgres REGEXP_REPLACE used by the index expression"""
+    engine = create_engine(f"sqlite:///{path}")
+
+    def regexp_replace(value, pattern, replacement, flags):
+        return re.sub(pattern, replacement, value, count=0 if "g" in flags else 1)
+
+    event.listen(engine, "connect", lambda conn, _: conn.create_function(
+        "REGEXP_REPLACE", 4, regexp_replace, deterministic=True
+    ))
+    return engine
+
+
+def test_table_lc2_column_reads_only_the_header(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'mis.sqlite3'}")
+    pd.DataFrame([list(range(12))], columns=MIS_COLUMNS).to_sql("HDFC_MIS_Data", engine, index=False)
+    with engine.connect() as conn:
+        assert table_lc2_column(conn, "HDFC_MIS_Data") == "COL_10"
+
+
+def test_seq_id_index_created_once_per_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(lc2_phone_map, "_seq_id_indexed", set())
+    engine = sqlite_engine(tmp_path / "campaign.sqlite3")
+    pd.DataFrame({"seqId": [" a1\t"], "phoneNo": ["9876543210"]}).to_sql("Campaign_Data", engine, index=False)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert ensure_seq_id_index(engine) == (True, None)
+    assert ensure_seq_id_index(engine) == (True, None)
+    assert sum("CREATE INDEX" in s for s in statements) == 1
+
+    # The indexed expression strips all whitespace like process_phone_numbers()
+    with engine.connect() as conn:
+        seq_id = conn.execute(text("SELECT " + _seq_id_sql('"seqId"') + ' FROM "Campaign_Data"')).scalar()
+    assert seq_id == "A1"
+
+
+def test_seq_id_index_error_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(lc2_phone_map, "_seq_id_indexed", set())
+    engine = sqlite_engine(tmp_path / "empty.sqlite3")
+
+    indexed, error = ensure_seq_id_index(engine)
+    assert not indexed and "Campaign_Data" in error
+    assert str(engine.url) not in lc2_phone_map._seq_id_indexed
@@ -0,0 +1,112 @@
+"""
+Tests for database.local_query
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from database import local_query
+from database.local_query import iter_table_rows, local_frame, run_local_query
+from database.query_pager import fetch_query_page, open_local_pager
+
+
+@pytest.fixture
+def frames():
+    return {
+        "HDFC_MIS_Data": pd.DataFrame({
+            "APPLICATION_REFERENCE_NUMBER": [f"A{i}" for i in range(250)],
+            "FINAL_DECISION": ["Approve", "Decline", None, "Inprocess", "Approve"] * 50,
+            "MIXED": pd.Series([1, "x", None, 2.5, "y"] * 50, dtype=object)
+        }),
+        "Campaign_Late_Text": pd.DataFrame({"code": pd.Series([7] * 5000 + ["CG12"], dtype=object)}),
+        "Campaign_Data": pd.DataFrame({"seqId": ["A1", "A2"], "phoneNo": ["9876543210", None]})
+    }
+
+
+def test_iter_table_rows_batches():
+    table = pa.table({"a": list(range(5)), "b": list("abcde")})
+    batches = list(iter_table_rows(table, 2))
+    assert [len(rows) for _, rows in batches] == [2, 2, 1]
+    assert batches[0] == (["a", "b"], [(0, "a"), (1, "b")])
+
+
+def test_iter_table_rows_empty_result_keeps_columns():
+    table = pa.table({"a": pa.array([], type=pa.int64())})
+    assert list(iter_table_rows(table, 10)) == [(["a"], [])]
+
+
+def test_local_frame_normalizes_mixed_columns_once(frames, monkeypatch):
+    calls = []
+    normalize = local_query._normalize_object_columns
+    monkeypatch.setattr(local_query, "_normalize_object_columns", lambda df: calls.append(1) or normalize(df))
+    df = frames["HDFC_MIS_Data"].assign(NUMS=pd.Series([1, 2.5, None, 4, 5] * 50, dtype=object))
+
+    normalized = local_frame(df)
+    assert local_frame(df) is normalized
+    assert len(calls) == 1
+    assert normalized["MIXED"].tolist()[:3] == ["1", "x", pd.NA]
+    assert normalized["NUMS"].dtype == "float64"
+    assert df["MIXED"].dtype == object
+
+
+def test_local_frame_keeps_uniform_frames(frames):
+    df = frames["Campaign_Data"]
+    assert local_frame(df) is df
+
+
+def test_run_local_query_without_duckdb(monkeypatch, frames):
+    monkeypatch.setattr(local_query, "duckdb", None)
+    assert not local_query.local_query_available()
+    table, error = run_local_query(frames, "SELECT 1")
+    assert table is None and "DuckDB is not installed" in error
+
+
+def test_run_local_query_aggregates_registered_frames(frames):
+    pytest.importorskip("duckdb")
+    table, error = run_local_query(
+        frames,
+        'SELECT "FINAL_DECISION", COUNT(*) AS n FROM "HDFC_MIS_Data" GROUP BY 1 ORDER BY n DESC, 1 NULLS LAST'
+    )
+    assert error is None
+    assert table.to_pydict() == {
+        "FINAL_DECISION": ["Approve", "Decline", "Inprocess", None], "n": [100, 50, 50, 50]
+    }
+
+
+def test_run_local_query_joins_and_reads_mixed_columns(frames):
+    pytest.importorskip("duckdb")
+    table, error = run_local_query(
+        frames,
+        'SELECT m."APPLICATION_REFERENCE_NUMBER", c."phoneNo", m."MIXED" FROM "HDFC_MIS_Data" m '
+        'JOIN "Campaign_Data" c ON c."seqId" = m."APPLICATION_REFERENCE_NUMBER" ORDER BY 1'
+    )
+    assert error is None
+    assert table.to_pydict()["phoneNo"] == ["9876543210", None]
+    assert table.num_rows == 2
+
+
+def test_run_local_query_reads_text_past_the_type_sample(frames):
+    pytest.importorskip("duckdb")
+    table, error = run_local_query(frames, 'SELECT COUNT(*) AS n, MAX(code) AS top FROM "Campaign_Late_Text"')
+    assert error is None
+    assert table.to_pydict() == {"n": [5001], "top": ["CG12"]}
+
+
+def test_run_local_query_blocks_file_access(frames, tmp_path):
+    pytest.importorskip("duckdb")
+    path = tmp_path / "secret.csv"
+    path.write_text("a\n1\n")
+    table, error = run_local_query(frames, f"SELECT * FROM read_csv_auto('{path}')")
+    assert table is None and error
+
+
+def test_local_pager_pages_through_result(frames):
+    pytest.importorskip("duckdb")
+    pager, error = open_local_pager(
+        frames, 'SELECT "APPLICATION_REFERENCE_NUMBER" FROM "HDFC_MIS_Data"', page_size=100
+    )
+    assert error is None
+    df, error = fetch_query_page(pager, 2)
+    assert error is None
+    assert len(df) == 50 and pager["count"] == 250
@@ -0,0 +1,49 @@
+"""
+Tests for database.query_cache
+"""
+
+import pytest
+
+from database.query_cache import is_volatile_query, normalize_sql, referenced_tables
+
+
+def test_normalize_sql_drops_comments_and_whitespace():
+    query = "SELECT  a, -- first\n b /* both */ FROM t ;\n"
+    assert normalize_sql(query) == "SELECT a, b FROM t"
+
+
+def test_normalize_sql_keeps_quoted_text():
+    assert normalize_sql("SELECT '--  not  a comment' FROM t") == "SELECT '--  not  a comment' FROM t"
+
+
+@pytest.mark.parametrize("query, tables", [
+    ('SELECT * FROM "HDFC_MIS_Data"', {"HDFC_MIS_Data"}),
+    ("SELECT * FROM Campaign_Data c JOIN public.lc2 m ON c.id = m.id", {"campaign_data", "lc2"}),
+    ('SELECT * FROM "A", b WHERE x IN (SELECT y FROM "C")', {"A", "b", "C"}),
+    ("SELECT 'FROM fake' AS label", set()),
+    ("SELECT 1 -- FROM commented\n", set()),
+])
+def test_referenced_tables(query, tables):
+    assert referenced_tables(query) == tables
+
+
+@pytest.mark.parametrize("query", [
+    """SELECT * FROM "HDFC_MIS_Data" WHERE "CREATION_DATE_TIME" >= CURRENT_DATE - INTERVAL '30 days'""",
+    "SELECT now()",
+    "SELECT * FROM t ORDER BY RANDOM() LIMIT 10",
+    "SELECT current_timestamp",
+    "SELECT nextval('seq')",
+])
+def test_volatile_queries(query):
+    assert is_volatile_query(query)
+
+
+@pytest.mark.parametrize("query", [
+    'SELECT * FROM "HDFC_MIS_Data"',
+    "SELECT 'now()' AS label",
+    'SELECT "current_date" FROM t',
+    "SELECT known_random_column FROM t",
+    "SELECT 1 -- now()",
+])
+def test_deterministic_queries(query):
+    assert not is_volatile_query(query)
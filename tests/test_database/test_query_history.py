@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from database.query_history import (
+    HISTORY_SUMMARY_COLUMNS, SLOWDOWN_MIN_RUNS, load_query_history, query_hash, record_query, set_query_rows,
+    summarize_query_history
+)
+
+
+def _history(runs):
+    """History frame like load_query_history() from (query, duration_ms, cache_hit, error, target) tuples"""
+    rows = []
+    for i, (query, duration_ms, cache_hit, error, target) in enumerate(runs, start=1):
+        rows.append({
+            "id": i, "executed_at": pd.Timestamp("2024-01-01") + pd.Timedelta(minutes=i),
+            "query_hash": query_hash(query), "query": query, "duration_ms": float(duration_ms), "rows": 10,
+            "bytes": 100, "cache_hit": cache_hit, "error": error, "target": target
+        })
+    return pd.DataFrame(rows)
+
+
+def _row(summary, query, target="database"):
+    match = summary[(summary["query_hash"] == query_hash(query)) & (summary["target"] == target)]
+    assert len(match) == 1
+    return match.iloc[0]
+
+
+def test_summary_of_empty_history():
+    summary = summarize_query_history(_history([]).reindex(columns=["id", "query_hash", "target"]))
+    assert list(summary.columns) == HISTORY_SUMMARY_COLUMNS
+    assert summary.empty
+
+
+def test_timings_skip_cache_hits_and_errors():
+    summary = summarize_query_history(_history([
+        ("SELECT 1", 100, False, None, "database"),
+        ("SELECT  1;", 300, False, None, "database"),
+        ("SELECT 1", 5, True, None, "database"),
+        ("SELECT 1", 900, False, "boom", "database"),
+    ]))
+    row = _row(summary, "SELECT 1")
+    assert (row["runs"], row["errors"], row["cache_hits"]) == (4, 1, 1)
+    assert (row["avg_ms"], row["max_ms"], row["last_ms"]) == (200, 300, 300)
+    assert row["query"] == "SELECT 1"
+
+
+def test_targets_are_summarized_separately():
+    summary = summarize_query_history(_history([
+        ("SELECT 1", 100, False, None, "database"),
+        ("SELECT 1", 10, False, None, "local"),
+    ]))
+    assert len(summary) == 2
+    assert _row(summary, "SELECT 1", "local")["avg_ms"] == 10
+
+
+@pytest.mark.parametrize("durations, slowing", [
+    ([100, 100, 100, 200, 200, 200], True),
+    ([100, 100, 100, 120, 120, 120], False),
+    ([100, 100, 200, 200, 200], False),  # Fewer than SLOWDOWN_MIN_RUNS
+])
+def test_slowing_queries(durations, slowing):
+    summary = summarize_query_history(_history([("SELECT 2", d, False, None, "database") for d in durations]))
+    row = _row(summary, "SELECT 2")
+    assert bool(row["slowing"]) is slowing
+    if len(durations) >= SLOWDOWN_MIN_RUNS:
+        assert row["slowdown"] == pytest.approx(durations[-1] / durations[0])
+
+
+def test_record_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    entry_id, error = record_query("SELECT * FROM t", 12.5, bytes_returned=2048, path=path)
+    assert error is None
+    record_query("SELECT oops", 3, error="syntax error", target="local", path=path)
+    assert set_query_rows(entry_id, 42, path=path) == (True, None)
+
+    history, error = load_query_history(path)
+    assert error is None
+    assert history["query"].tolist() == ["SELECT oops", "SELECT * FROM t"]
+    assert history.iloc[1][["duration_ms", "rows", "bytes"]].tolist() == [12.5, 42, 2048]
+    assert history.iloc[0]["target"] == "local"
+    assert history["cache_hit"].dtype == bool
@@ -0,0 +1,154 @@
+"""
+Tests for database.query_pager
+"""
+
+import time
+from collections import OrderedDict
+
+import pytest
+from sqlalchemy import create_engine
+
+from database import query_pager
+from database.query_pager import (
+    close_query_pager, fetch_query_page, open_query_pager, release_idle_cursor, split_statements
+)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(query_pager, "_idle_cursors", OrderedDict())
+    engine = create_engine(f"sqlite:///{tmp_path / 'console.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE numbers (n INTEGER)")
+        conn.exec_driver_sql("INSERT INTO numbers VALUES " + ", ".join(f"({n})" for n in range(250)))
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("query, statements", [
+    ("SELECT 1", ["SELECT 1"]),
+    ("SELECT 1; SELECT 2;", ["SELECT 1", "SELECT 2"]),
+    ("SELECT ';' AS a, 'it''s;' AS b; SELECT 2", ["SELECT ';' AS a, 'it''s;' AS b", "SELECT 2"]),
+    ('SELECT "odd;name" FROM t; SELECT 2', ['SELECT "odd;name" FROM t', "SELECT 2"]),
+    ("SELECT 1 -- done; really\n; SELECT 2", ["SELECT 1 -- done; really", "SELECT 2"]),
+    ("SELECT 1 /* a; b */; SELECT 2", ["SELECT 1 /* a; b */", "SELECT 2"]),
+    ("SELECT $$a;b$$; SELECT $fn$ x; $$ y $fn$", ["SELECT $$a;b$$", "SELECT $fn$ x; $$ y $fn$"]),
+    ("SELECT 1;; -- trailing note\n ; /* only a comment */ ;", ["SELECT 1"]),
+    (" ; -- nothing here\n", []),
+])
+def test_split_statements(query, statements):
+    assert split_statements(query) == statements
+
+
+def test_pages_release_their_connection(engine):
+    pager, error = open_query_pager(engine, "SELECT n FROM numbers ORDER BY n", page_size=100, use_cache=False)
+    assert error is None
+    df, error = fetch_query_page(pager, 1)
+    assert error is None
+    assert df["n"].tolist() == list(range(100, 200))
+    # Drivers without scrollable cursors page with LIMIT/OFFSET and keep no connection between pages
+    assert pager["connection"] is None
+    assert pager["id"] not in query_pager._idle_cursors
+    df, _ = fetch_query_page(pager, 2)
+    assert len(df) == 50
+    assert pager["count"] == 250
+    close_query_pager(pager)
+
+
+class _FakeCursor:
+    def close(self):
+        pass
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def _pager_with_cursor(engine):
+    """Pager holding an idle cursor connection and its statement slot"""
+    pager = query_pager._new_pager(engine, "SELECT n FROM numbers", 100, 0, time.monotonic())
+    assert query_pager._hold_slot(pager, "cursor") is None
+    pager["connection"], pager["cursor"] = _FakeConnection(), _FakeCursor()
+    query_pager._mark_idle(pager)
+    return pager
+
+
+def test_release_idle_cursor_waits_for_idle_time(engine):
+    pager = _pager_with_cursor(engine)
+    connection = pager["connection"]
+    assert not release_idle_cursor(pager, idle_seconds=3600)
+    assert pager["connection"] is connection
+
+    assert release_idle_cursor(pager)
+    assert connection.closed
+    assert pager["connection"] is None and pager["cursor"] is None
+    assert pager["id"] not in query_pager._idle_cursors
+
+
+def test_release_idle_cursor_skips_running_fetch(engine):
+    pager = _pager_with_cursor(engine)
+    with pager["lock"]:
+        assert not release_idle_cursor(pager)
+    assert not pager["connection"].closed
+    close_query_pager(pager)
+    assert pager["connection"] is None
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT n FROM numbers ORDER BY n -- newest last",
+    "SELECT n FROM numbers ORDER BY n -- ends with a semicolon;",
+    "SELECT n FROM numbers ORDER BY n /* block */",
+])
+def test_trailing_comments_do_not_swallow_wrappers(engine, query):
+    pager, error = open_query_pager(engine, query, page_size=100, use_cache=False)
+    assert error is None
+    df, error = fetch_query_page(pager, 1)
+    assert error is None
+    assert df["n"].iloc[0] == 100
+    pager["count_thread"].join(timeout=10)
+    assert pager["count_error"] is None
+    assert pager["count"] == 250
+    close_query_pager(pager)
+
+
+@pytest.fixture
+def one_slot(monkeypatch):
+    monkeypatch.setattr(query_pager, "_slots", query_pager.threading.BoundedSemaphore(1))
+    monkeypatch.setattr(query_pager, "SLOT_WAIT_SECONDS", 0.2)
+
+
+def test_holders_of_one_pager_share_a_slot(engine, one_slot):
+    pager = query_pager._new_pager(engine, "SELECT n FROM numbers", 100, 0, time.monotonic())
+    assert query_pager._hold_slot(pager, "cursor") is None
+    assert query_pager._hold_slot(pager, "count") is None
+    query_pager._drop_slot(pager, "count")
+    assert not query_pager._slots.acquire(blocking=False)
+    query_pager._drop_slot(pager, "cursor")
+    assert query_pager._slots.acquire(blocking=False)
+    query_pager._slots.release()
+
+
+def test_waiting_statement_releases_idle_cursor(engine, one_slot):
+    idle = _pager_with_cursor(engine)
+    connection = idle["connection"]
+    waiting = query_pager._new_pager(engine, "SELECT n FROM numbers", 100, 0, time.monotonic())
+    assert query_pager._hold_slot(waiting, "cursor") is None
+    assert connection.closed and idle["connection"] is None
+    query_pager._drop_slot(waiting, "cursor")
+
+
+def test_busy_slots_time_out_with_an_error(engine, one_slot):
+    busy = _pager_with_cursor(engine)
+    waiting = query_pager._new_pager(engine, "SELECT n FROM numbers", 100, 0, time.monotonic())
+    with busy["lock"]:
+        assert "busy" in query_pager._hold_slot(waiting, "cursor")
+    close_query_pager(busy)
+    assert query_pager._hold_slot(waiting, "cursor") is None
+    query_pager._drop_slot(waiting, "cursor")
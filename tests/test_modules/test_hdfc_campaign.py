@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import HDFC_campaign
+from modules.HDFC_campaign import _build_lg_index, match_campaigns
+
+
+@pytest.fixture
+def df_mis():
+    rng = np.random.default_rng(7)
+    n = 3000
+    return pd.DataFrame({
+        "lc1_code": rng.choice(["LC1A", "lc1b", "LC2A", "XLC1A"], n),
+        "lg_code": rng.choice(["LG1", "LG2", "LG3", ""], n),
+        "ipa_status": rng.choice(["Approve", " approve ", "Reject", None], n),
+        "final_decision": rng.choice(["Approve", "Decline", "Inprocess", "IPA REJECT", "Other"], n),
+    })
+
+
+def _brute_force(df_mis, lc_code, lg_code):
+    rows = df_mis[(df_mis["lg_code"] == lg_code) & df_mis["lc1_code"].str.contains(lc_code, case=False)]
+    decision = rows["final_decision"]
+    return (
+        len(rows),
+        int((rows["ipa_status"].fillna("").str.strip().str.upper() == "APPROVE").sum()),
+        int(decision.isin(["Decline", "IPA REJECT"]).sum()),
+        int((decision == "Inprocess").sum()),
+        int((decision == "Approve").sum()),
+    )
+
+
+def test_lg_index_groups_row_positions():
+    order, bounds = _build_lg_index(np.array(["b", "a", "b", "c", "a"]))
+    groups = {code: order[start:stop].tolist() for code, (start, stop) in bounds.items()}
+    assert groups == {"a": [1, 4], "b": [0, 2], "c": [3]}
+
+
+CODES = [("lc1", "LG1"), ("LC1A", "LG2"), ("lc2", "LG3"), ("LC1", ""), ("LC1", "LG9"), ("", "LG1")]
+
+
+def test_serial_matching_counts(df_mis):
+    assert match_campaigns(df_mis, CODES, parallel=False) == [_brute_force(df_mis, *code) for code in CODES]
+
+
+def test_parallel_matching_matches_serial(df_mis, monkeypatch):
+    def no_fallback(message):
+        raise AssertionError(message)
+
+    monkeypatch.setattr(HDFC_campaign.st, "warning", no_fallback)
+    codes = CODES * 50
+    serial = match_campaigns(df_mis, codes, parallel=False)
+    assert match_campaigns(df_mis, codes, parallel=True, max_workers=2) == serial
+    channels = [f"channel {i % 3}" for i in range(len(codes))]
+    assert match_campaigns(df_mis, codes, channels, parallel=True, max_workers=3) == serial
+
+
+def test_match_pool_does_not_fork_the_server():
+    assert HDFC_campaign.MATCH_MP_CONTEXT.get_start_method() in ("forkserver", "spawn")
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from database.daily_rollup import ROLLUP_SOURCE_COLUMNS, build_daily_rollup
+from modules import status_analysis
+from modules.status_analysis import get_status_rollup
+from utils.mis_store import set_source_version
+
+COLUMNS = [ROLLUP_SOURCE_COLUMNS[key] for key in ("creation", "decision", "ipa", "status")]
+
+
+@pytest.fixture
+def df_mis():
+    return pd.DataFrame({
+        "CREATION_DATE_TIME": ["01-01-2024 10:00:00", "02-01-2024 11:00:00"],
+        "FINAL_DECISION_DATE": ["03-01-2024 10:00:00", None],
+        "IPA_STATUS": ["APPROVE", "REJECT"],
+        "FINAL_DECISION": ["Approve", "Decline"]
+    })
+
+
+@pytest.fixture
+def db_rollups(monkeypatch):
+    """Rollup table stub: {version: rollup}; records the versions asked for"""
+    rollups, requested = {}, []
+
+    def load(engine, source_version=None):
+        requested.append(source_version)
+        empty = pd.DataFrame(columns=["creation_date", "application_count"])
+        return rollups.get(source_version, empty), None
+
+    monkeypatch.setattr(status_analysis, "load_daily_rollup", load)
+    return rollups, requested
+
+
+def _db_rollup(count):
+    return pd.DataFrame({"creation_date": [pd.Timestamp("2024-01-01")], "application_count": [count]})
+
+
+def test_rollup_table_used_for_the_version_it_was_built_from(df_mis, db_rollups):
+    rollups, requested = db_rollups
+    rollups[7] = _db_rollup(2)
+    set_source_version(df_mis, 7)
+    assert get_status_rollup(df_mis, object(), *COLUMNS) is rollups[7]
+    assert requested == [7]
+
+
+def test_rollup_built_from_frame_for_other_versions(df_mis, db_rollups):
+    rollups, requested = db_rollups
+    rollups[8] = _db_rollup(2)  # Same row count, newer statuses
+    set_source_version(df_mis, 7)
+    rollup = get_status_rollup(df_mis, object(), *COLUMNS)
+    assert rollup is build_daily_rollup(df_mis, *COLUMNS)
+    assert requested == [7]
+
+
+def test_uploaded_frames_never_read_the_rollup_table(df_mis, db_rollups):
+    _, requested = db_rollups
+    assert get_status_rollup(df_mis, object(), *COLUMNS) is build_daily_rollup(df_mis, *COLUMNS)
+    assert requested == []
@@ -0,0 +1,53 @@
+"""
+Tests for utils.date_utils
+"""
+
+import pandas as pd
+import pytest
+
+from utils.date_utils import _parse_date_value, parse_dates_safely
+
+
+def baseline_parse(values):
+    """Per-value day-first parse the vectorized version must reproduce"""
+    return pd.Series([pd.NaT if pd.isna(val) else _parse_date_value(val) for val in values], dtype="datetime64[ns]")
+
+
+@pytest.mark.parametrize("values", [
+    ["05/01/2024", "13/01/2024", "31/12/2023"] * 50,
+    ["05-01-2024 10:15", "2024-01-31", "1 Feb 2024", "31/01/2024"],
+    ["05/01/2024", None, "not a date", "", "13/01/2024"],
+    ["2024-01-31 10:00:00", "2024-02-29 23:59:59"] * 20 + ["07/03/2024"],
+])
+def test_parse_dates_safely_matches_per_value_parse(values):
+    series = pd.Series(values)
+    result = parse_dates_safely(series, sample_size=20)
+    pd.testing.assert_series_equal(result, baseline_parse(values), check_names=False)
+
+
+def test_parse_dates_safely_keeps_index():
+    series = pd.Series(["05/01/2024", None, "13/01/2024"], index=[10, 20, 30])
+    result = parse_dates_safely(series)
+    assert result.index.tolist() == [10, 20, 30]
+    assert result.loc[10] == pd.Timestamp("2024-01-05")
+    assert pd.isna(result.loc[20])
+
+
+def test_parse_dates_safely_converts_utc_offsets_to_naive_utc():
+    series = pd.Series(["2024-01-15 10:00:00+05:30", "2024-01-15 10:00:00Z", "16/01/2024"])
+    result = parse_dates_safely(series)
+    assert result.dtype == "datetime64[ns]"
+    assert result.tolist() == [
+        pd.Timestamp("2024-01-15 04:30:00"), pd.Timestamp("2024-01-15 10:00:00"), pd.Timestamp("2024-01-16")
+    ]
+
+
+def test_parse_dates_safely_mixed_offsets_use_one_clock():
+    series = pd.Series(["2024-01-15T10:00:00+05:30", "2024-01-15T00:30:00-04:00"] * 10)
+    result = parse_dates_safely(series, sample_size=5)
+    assert set(result) == {pd.Timestamp("2024-01-15 04:30:00")}
+
+
+def test_parse_dates_safely_passes_datetimes_through():
+    series = pd.Series(pd.to_datetime(["2024-01-05", None]))
+    pd.testing.assert_series_equal(parse_dates_safely(series), series)
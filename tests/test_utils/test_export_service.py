@@ -0,0 +1,45 @@
+"""
+Tests for utils.export_service
+"""
+
+import pandas as pd
+import pytest
+
+from utils import export_service
+from utils.export_service import read_export_file, write_excel_file
+
+SHEETS = [
+    ("Detailed Analysis", pd.DataFrame({
+        "Channel": ["Google", "Meta", None],
+        "Applications": [10, 0, 3],
+        "Cost": [1.5, None, 2.25],
+        "Created": pd.to_datetime(["2024-01-02 10:00:00", None, "2024-03-04 00:00:00"]),
+        "Formula-like": ["=1+1", "http://example.com", "x"]
+    })),
+    ("Summary", pd.DataFrame({"Metric": ["Total"], "Value": [13]}))
+]
+
+
+@pytest.mark.parametrize("writer", ["xlsxwriter", "openpyxl"])
+def test_write_excel_file_round_trip(tmp_path, monkeypatch, writer):
+    if writer == "xlsxwriter":
+        pytest.importorskip("xlsxwriter")
+    else:
+        monkeypatch.setattr(export_service, "xlsxwriter", None)
+    path = write_excel_file(SHEETS, str(tmp_path / "report.xlsx"), chunk_rows=2)
+
+    workbook = pd.read_excel(path, sheet_name=None)
+    assert list(workbook) == ["Detailed Analysis", "Summary"]
+    detailed = workbook["Detailed Analysis"]
+    assert detailed["Channel"].tolist()[:2] == ["Google", "Meta"]
+    assert detailed["Applications"].tolist() == [10, 0, 3]
+    if writer == "xlsxwriter":  # openpyxl writes "=..." strings as formulas
+        assert detailed["Formula-like"].tolist() == ["=1+1", "http://example.com", "x"]
+    assert pd.Timestamp(detailed["Created"].iloc[0]) == pd.Timestamp("2024-01-02 10:00")
+    assert workbook["Summary"].to_dict("list") == {"Metric": ["Total"], "Value": [13]}
+
+
+def test_read_export_file_returns_bytes(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_bytes(b"a,b\n1,2\n")
+    assert read_export_file(str(path)) == b"a,b\n1,2\n"
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from utils.benchmark_lc2_decoder import make_lc2_codes
+from utils.lc2_utils import decode_lc2_phones, derive_phone_from_lc2, lc2_seq_ids, normalize_lc2
+
+EDGE_CODES = [
+    None, "", "   ", "IV", "iv", "IVZZ", " ivabc ", "IV" + "Z" * 12, "IV" + "Z" * 13, "IV-12", "IV1_2",
+    "MNOPQRSTUV", " cgvutsrqpo ", "CGMNOPQRSTUV", "CGCGMNOPQRSTUV", "MNOPQRSTU", "MNOPQRSTUVM", "CG12345",
+    "ABCDEFGHIJ", "cg", 12345,
+]
+
+
+def _row_by_row(lc2):
+    return lc2.fillna("").astype(str).apply(derive_phone_from_lc2)
+
+
+def test_decoder_matches_row_by_row_on_edge_cases():
+    lc2 = pd.Series(EDGE_CODES, dtype=object, index=range(100, 100 + len(EDGE_CODES)))
+    decoded = decode_lc2_phones(lc2)
+    assert decoded.index.equals(lc2.index)
+    assert decoded.tolist() == _row_by_row(lc2).tolist()
+
+
+def test_decoder_matches_row_by_row_on_synthetic_codes():
+    lc2 = make_lc2_codes(20_000, seed=3)
+    pd.testing.assert_series_equal(decode_lc2_phones(lc2), _row_by_row(lc2), check_names=False)
+
+
+@pytest.mark.parametrize("code, phone", [
+    ("IV4IUQ6MI", str(int("4IUQ6MI", 36))),
+    ("CGVUTSRQPONM", "9876543210"),
+    ("CG12345", None),
+])
+def test_decoded_values(code, phone):
+    assert decode_lc2_phones(pd.Series([code])).iloc[0] == phone
+
+
+def test_seq_ids_only_for_codes_without_a_phone():
+    lc2 = normalize_lc2(pd.Series([" cg12345 ", "CGVUTSRQPONM", None, "ab9"], dtype=object))
+    seq_ids = lc2_seq_ids(lc2, decode_lc2_phones(lc2))
+    assert seq_ids.isna().tolist() == [False, True, False, False]
+    assert seq_ids.dropna().tolist() == ["12345", "", "AB9"]
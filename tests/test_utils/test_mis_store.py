@@ -0,0 +1,153 @@
+"""
+Tests for utils.mis_store
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.app_config import STATUS_CATEGORIES
+from utils.mis_store import (
+    cached_latest, count_status, encode_status, encode_values, filter_date_ranges, get_date_range,
+    get_source_version, set_source_version
+)
+
+STATUS_MAP = {"Decline": "Declined", "IPA REJECT": "Declined", "Inprocess": "Inprogress", "Approve": "Card Out"}
+
+
+def test_cached_latest_reuses_value_for_same_key():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return object()
+
+    first = cached_latest(df, "rows", ("2024-01-01", None), compute)
+    assert cached_latest(df, "rows", ("2024-01-01", None), compute) is first
+    assert len(calls) == 1
+
+
+def test_cached_latest_keeps_only_the_latest_key():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return object()
+
+    first = cached_latest(df, "rows", 1, compute)
+    second = cached_latest(df, "rows", 2, compute)
+    assert second is not first
+    assert cached_latest(df, "rows", 1, compute) is not first
+    assert len(calls) == 3
+
+
+def test_cached_latest_tracks_dependencies():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    other = pd.DataFrame({"b": [1]})
+    value = cached_latest(df, "joined", "key", object, depends_on=(other,))
+    assert cached_latest(df, "joined", "key", object, depends_on=(other,)) is value
+    assert cached_latest(df, "joined", "key", object, depends_on=(pd.DataFrame({"b": [1]}),)) is not value
+
+
+@pytest.fixture
+def df_dates():
+    rng = np.random.default_rng(5)
+    n = 2000
+    created = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit="h")
+    decided = created + pd.to_timedelta(rng.integers(0, 30 * 24, n), unit="h")
+    created_text = created.strftime("%d-%m-%Y %H:%M:%S").to_numpy(dtype=object)
+    created_text[rng.random(n) < 0.05] = None
+    created_text[rng.random(n) < 0.02] = "not a date"
+    return pd.DataFrame({"CREATED": created_text, "DECIDED": decided})
+
+
+def _mask_positions(df, ranges):
+    mask = np.ones(len(df), dtype=bool)
+    for col, start, end in ranges:
+        dates = pd.to_datetime(df[col], format="%d-%m-%Y %H:%M:%S", errors="coerce")
+        mask &= dates.notna().to_numpy()
+        if start is not None:
+            mask &= (dates >= start).to_numpy()
+        if end is not None:
+            mask &= (dates <= end).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize("ranges", [
+    [("CREATED", pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-29 23:59:59"))],
+    [("CREATED", pd.Timestamp("2024-01-15 06:00:00"), None)],
+    [("CREATED", None, pd.Timestamp("2024-01-15 06:00:00"))],
+    [("CREATED", None, None)],
+    [("CREATED", pd.Timestamp("2024-01-10"), pd.Timestamp("2024-03-01")),
+     ("DECIDED", pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-15"))],
+    [("CREATED", pd.Timestamp("2024-03-01"), pd.Timestamp("2024-02-01"))],
+    [("DECIDED", pd.Timestamp("2030-01-01"), None)],
+])
+def test_filter_date_ranges_matches_boolean_masks(df_dates, ranges):
+    positions = filter_date_ranges(df_dates, ranges)
+    np.testing.assert_array_equal(positions, _mask_positions(df_dates, ranges))
+
+
+def test_filter_date_ranges_without_ranges_keeps_every_row(df_dates):
+    np.testing.assert_array_equal(filter_date_ranges(df_dates, []), np.arange(len(df_dates)))
+
+
+def test_filter_date_ranges_bounds_are_inclusive():
+    df = pd.DataFrame({"D": ["01-01-2024", "02-01-2024", "02-01-2024", "03-01-2024", None]})
+    day = pd.Timestamp("2024-01-02")
+    assert filter_date_ranges(df, [("D", day, day)]).tolist() == [1, 2]
+    assert filter_date_ranges(df, [("D", None, day)]).tolist() == [0, 1, 2]
+
+
+def test_get_date_range_skips_placeholder_dates():
+    df = pd.DataFrame({"D": ["01/01/1970", "05/03/2024", None, "02/01/2024"]})
+    assert get_date_range(df, "D") == (pd.Timestamp("2024-01-02"), pd.Timestamp("2024-03-05"))
+    assert get_date_range(df, "D", after=None)[0] == pd.Timestamp("1970-01-01")
+
+
+def test_encode_status_uses_category_positions():
+    decisions = pd.Series(["Approve", "Decline", "IPA REJECT", "Inprocess", "Other", None, " approve "])
+    codes = encode_status(decisions, STATUS_MAP)
+    assert codes.dtype == np.int8
+    assert [STATUS_CATEGORIES[c] for c in codes] == [
+        "Card Out", "Declined", "Declined", "Inprogress", "Other", "Other", "Other"
+    ]
+    assert STATUS_CATEGORIES[encode_status(decisions, STATUS_MAP, normalize=True)[-1]] == "Card Out"
+
+
+def test_encode_values_of_empty_series():
+    codes = encode_values(pd.Series([], dtype=object), {"APPROVE": 1}, normalize=True)
+    assert codes.dtype == np.int8 and len(codes) == 0
+
+
+def test_count_status_matches_value_counts():
+    rng = np.random.default_rng(11)
+    decisions = pd.Series(rng.choice(list(STATUS_MAP) + ["Other", None], 5000), dtype=object)
+    ipa = pd.Series(rng.choice(["Approve", "APPROVE ", "Reject", None], 5000), dtype=object)
+    codes = encode_status(decisions, STATUS_MAP)
+    flags = encode_values(ipa, {"APPROVE": 1}, normalize=True)
+
+    counts, flagged = count_status(codes, flags)
+
+    expected = decisions.map(STATUS_MAP).fillna("Other").value_counts()
+    assert counts == {category: int(expected.get(category, 0)) for category in STATUS_CATEGORIES}
+    assert flagged == int((ipa.fillna("").str.strip().str.upper() == "APPROVE").sum())
+
+
+def test_count_status_without_flags_or_rows():
+    counts, flagged = count_status(np.array([3, 3, 1], dtype=np.int8))
+    assert counts == {"Other": 0, "Declined": 1, "Inprogress": 0, "Card Out": 2}
+    assert flagged == 0
+    counts, flagged = count_status(np.array([], dtype=np.int8), np.array([], dtype=np.int8))
+    assert counts == dict.fromkeys(STATUS_CATEGORIES, 0) and flagged == 0
+
+
+def test_source_version_is_kept_per_frame():
+    loaded = pd.DataFrame({"a": [1, 2]})
+    uploaded = pd.DataFrame({"a": [1, 2]})
+    set_source_version(loaded, 42)
+    assert get_source_version(loaded) == 42
+    assert get_source_version(uploaded) is None
+    assert get_source_version(loaded.copy()) is None
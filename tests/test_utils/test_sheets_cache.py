@@ -0,0 +1,103 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import sheets_cache
+from utils.sheets_cache import fetch_sheet_csv
+
+SHEET_CSV = b"Campaign ID , LC Code\n101,CG1\n102,CG2\n"
+
+
+class _SheetHandler(BaseHTTPRequestHandler):
+    """Serves server.sheet as a CSV export with an ETag, like the Sheets endpoint"""
+
+    def do_GET(self):
+        sheet = self.server.sheet
+        self.server.requests.append(dict(self.headers))
+        if sheet["status"] != 200:
+            self.send_response(sheet["status"])
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == sheet["etag"]:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", sheet["content_type"])
+        self.send_header("ETag", sheet["etag"])
+        self.send_header("Content-Length", str(len(sheet["body"])))
+        self.end_headers()
+        self.wfile.write(sheet["body"])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SheetHandler)
+    httpd.sheet = {"status": 200, "body": SHEET_CSV, "etag": '"v1"', "content_type": "text/csv"}
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/export?format=csv"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def frame_cache(monkeypatch):
+    monkeypatch.setattr(sheets_cache, "_frame_cache", {})
+
+
+def test_download_then_cached_then_not_modified(server, tmp_path):
+    df, status = fetch_sheet_csv(server.url, cache_dir=tmp_path)
+    assert status == "downloaded"
+    assert list(df.columns) == ["Campaign ID", "LC Code"]
+    assert df["LC Code"].tolist() == ["CG1", "CG2"]
+
+    df, status = fetch_sheet_csv(server.url, cache_dir=tmp_path)
+    assert status == "cached"
+    assert len(server.requests) == 1
+
+    df, status = fetch_sheet_csv(server.url, cache_dir=tmp_path, force_refresh=True)
+    assert status == "not modified"
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+    assert df["Campaign ID"].tolist() == [101, 102]
+
+
+def test_changed_sheet_is_downloaded_again(server, tmp_path):
+    fetch_sheet_csv(server.url, cache_dir=tmp_path)
+    server.sheet.update(body=b"Campaign ID,LC Code\n103,CG3\n", etag='"v2"')
+
+    df, status = fetch_sheet_csv(server.url, cache_dir=tmp_path, ttl=0)
+    assert status == "downloaded"
+    assert df["LC Code"].tolist() == ["CG3"]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+@pytest.mark.parametrize("sheet", [
+    {"status": 500},
+    {"body": b"Campaign ID,LC Code\n101,CG1\n102,CG2,extra,fields\n", "etag": '"v2"'},
+    {"body": b"<html><body>Sign in</body></html>", "etag": '"v2"', "content_type": "text/html"},
+])
+def test_failed_or_corrupt_download_serves_last_good_copy(server, tmp_path, sheet):
+    fetch_sheet_csv(server.url, cache_dir=tmp_path)
+    csv_path, _ = sheets_cache._cache_paths(server.url, str(tmp_path))
+    server.sheet.update(sheet)
+
+    df, status = fetch_sheet_csv(server.url, cache_dir=tmp_path, force_refresh=True)
+    assert status == "offline"
+    assert df["LC Code"].tolist() == ["CG1", "CG2"]
+    with open(csv_path, "rb") as f:
+        assert f.read() == SHEET_CSV
+
+
+def test_corrupt_download_without_cached_copy_raises(server, tmp_path):
+    server.sheet.update(body=b"<html></html>", content_type="text/html")
+    with pytest.raises(ValueError):
+        fetch_sheet_csv(server.url, cache_dir=tmp_path)
+    assert os.listdir(tmp_path) == []
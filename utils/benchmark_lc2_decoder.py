@@ -0,0 +1,75 @@
+"""
+Benchmark the LC2 phone decoder
+Compares the row-by-row derive_phone_from_lc2() with the vectorized
+decode_lc2_phones() on synthetic MIS LC2 codes
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.lc2_utils import LC2_DIGIT_LETTERS, decode_lc2_phones, derive_phone_from_lc2
+
+
+def make_lc2_codes(n_rows, seed=0):
+    """
+    Synthetic LC2 column mixing every code shape seen in the MIS
+
+    Returns:
+        pd.Series: LC2 codes (base36 "IV" codes, M..V letter codes with and
+        without a CG prefix, CG seqIds, blanks and lower-case variants)
+    """
+    rng = np.random.default_rng(seed)
+    phones = rng.integers(6_000_000_000, 9_999_999_999, n_rows)
+    letters = np.array(list(LC2_DIGIT_LETTERS))
+
+    def as_letters(numbers):
+        return ["".join(letters[int(d)] for d in str(number)) for number in numbers]
+
+    shapes = rng.choice(["iv", "letters", "cg_letters", "seq_id", "blank", "lower"], n_rows,
+                        p=[0.3, 0.15, 0.15, 0.3, 0.05, 0.05])
+    codes = np.empty(n_rows, dtype=object)
+    for shape, fmt in [
+        ("iv", lambda numbers: ["IV" + np.base_repr(int(n), 36) for n in numbers]),
+        ("letters", as_letters),
+        ("cg_letters", lambda numbers: ["CG" + code for code in as_letters(numbers)]),
+        ("seq_id", lambda numbers: [f"CG{int(n) % 10_000_000}" for n in numbers]),
+        ("blank", lambda numbers: [""] * len(numbers)),
+        ("lower", lambda numbers: ["iv" + np.base_repr(int(n), 36).lower() for n in numbers]),
+    ]:
+        rows = np.flatnonzero(shapes == shape)
+        codes[rows] = fmt(phones[rows])
+    return pd.Series(codes, name="LC2_raw")
+
+
+def run_benchmark(n_rows=1_000_000):
+    """Time both decoders on n_rows codes and check they agree"""
+    print(f"🔧 Generating {n_rows:,} LC2 codes...")
+    lc2 = make_lc2_codes(n_rows)
+
+    start = time.perf_counter()
+    expected = lc2.apply(derive_phone_from_lc2)
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = decode_lc2_phones(lc2)
+    vectorized_seconds = time.perf_counter() - start
+
+    mismatches = int((expected.fillna("<none>") != decoded.fillna("<none>")).sum())
+
+    print(f"⏱️ Row-by-row apply: {row_seconds:.2f}s")
+    print(f"⚡ Vectorized:       {vectorized_seconds:.2f}s")
+    print(f"📈 Speedup:          {row_seconds / vectorized_seconds:.1f}x")
+    print(f"{'✅' if mismatches == 0 else '❌'} Mismatched rows: {mismatches:,}")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sys.exit(0 if run_benchmark(rows) else 1)
@@ -0,0 +1,168 @@
+"""
+Data Grid Component
+Paginated table that sorts and searches on the server and sends only the visible page
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.mis_store import cached
+
+PAGE_SIZE_OPTIONS = [50, 100, 250, 500, 1000]
+NO_SORT = "(no sorting)"
+
+
+def _sort_order(df, col, ascending):
+    """Row positions of df ordered by col (missing values last), cached per frame"""
+    def compute():
+        values = df[col].reset_index(drop=True)
+        try:
+            ordered = values.sort_values(ascending=ascending, na_position='last', kind='stable')
+        except TypeError:
+            # Mixed types (e.g. numbers and strings in one object column) sort as text
+            ordered = values.astype(str).where(values.notna()).sort_values(
+                ascending=ascending, na_position='last', kind='stable'
+            )
+        return ordered.index.to_numpy()
+
+    return cached(df, ("grid_order", col, ascending), compute)
+
+
+def _search_mask(df, term):
+    """Boolean mask of rows where any column contains term (case insensitive), cached per frame"""
+    def compute():
+        mask = np.zeros(len(df), dtype=bool)
+        for col in df.columns:
+            # Match against the distinct values only, then spread back to rows
+            codes, uniques = pd.factorize(df[col])
+            if len(uniques) == 0:
+                continue
+            hits = pd.Index(uniques).astype(str).str.contains(term, case=False, regex=False)
+            hits = np.append(np.asarray(hits, dtype=bool), False)  # code -1 (missing) never matches
+            mask |= hits[codes]
+        return mask
+
+    return cached(df, ("grid_search", term.lower()), compute)
+
+
+def _step_page(page_key, delta, total_pages):
+    """Move the grid page by delta, staying within 1..total_pages"""
+    page = st.session_state.get(page_key, 1) + delta
+    st.session_state[page_key] = min(max(page, 1), total_pages)
+
+
+def render_data_grid(df, key, default_sort=None, ascending=True, page_size=100,
+                     height=500, searchable=True, hide_index=False):
+    """
+    Render a paginated, sortable and searchable view of a DataFrame
+
+    Sorting and searching run here against df (cached per frame object);
+    only the rows of the current page are sent to the browser.
+
+    Args:
+        df: DataFrame to display
+        key: Unique widget key prefix for this grid
+        default_sort: Column to sort by initially (None for row order)
+        ascending: Initial sort direction
+        page_size: Initial rows per page (one of PAGE_SIZE_OPTIONS)
+        height: Table height in pixels
+        searchable: Show the search-all-columns box
+        hide_index: Hide the DataFrame index
+
+    Returns:
+        int: Number of rows matching the search (all rows if none)
+    """
+    total_rows = len(df)
+    columns = df.columns.tolist()
+    sort_options = [NO_SORT] + columns
+
+    ctrl_col1, ctrl_col2, ctrl_col3, ctrl_col4 = st.columns([3, 2, 1, 1])
+
+    with ctrl_col1:
+        search = ""
+        if searchable:
+            search = st.text_input("🔍 Search all columns:", key=f"{key}_search").strip()
+
+    with ctrl_col2:
+        sort_index = sort_options.index(default_sort) if default_sort in columns else 0
+        sort_col = st.selectbox("Sort by:", sort_options, index=sort_index, key=f"{key}_sort")
+
+    with ctrl_col3:
+        sort_dir = st.selectbox(
+            "Order:", ["Ascending", "Descending"],
+            index=0 if ascending else 1, key=f"{key}_order"
+        )
+
+    with ctrl_col4:
+        size_index = PAGE_SIZE_OPTIONS.index(page_size) if page_size in PAGE_SIZE_OPTIONS else 1
+        rows_per_page = st.selectbox("Rows per page:", PAGE_SIZE_OPTIONS, index=size_index, key=f"{key}_page_size")
+
+    # Resolve the visible row positions (None means all rows in their current order)
+    positions = None
+    if search:
+        mask = _search_mask(df, search)
+    if sort_col != NO_SORT and sort_col in columns:
+        positions = _sort_order(df, sort_col, sort_dir == "Ascending")
+        if search:
+            positions = positions[mask[positions]]
+    elif search:
+        positions = np.flatnonzero(mask)
+
+    matched_rows = total_rows if positions is None else len(positions)
+    total_pages = max(1, math.ceil(matched_rows / rows_per_page))
+
+    # Go back to page 1 whenever the view changes
+    page_key = f"{key}_page"
+    signature = (search, sort_col, sort_dir, rows_per_page, matched_rows, total_rows, tuple(map(str, columns)))
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[page_key] = 1
+    if st.session_state.get(page_key, 1) > total_pages:
+        st.session_state[page_key] = total_pages
+
+    page = st.session_state.get(page_key, 1)
+    start = (page - 1) * rows_per_page
+    end = min(start + rows_per_page, matched_rows)
+
+    if positions is None:
+        page_df = df.iloc[start:end]
+    else:
+        page_df = df.iloc[positions[start:end]]
+
+    if matched_rows == 0:
+        st.info("ℹ️ No rows match the search")
+    else:
+        st.dataframe(page_df, use_container_width=True, height=height, hide_index=hide_index)
+
+    nav_col1, nav_col2, nav_col3, nav_col4 = st.columns([1, 2, 3, 1])
+
+    with nav_col1:
+        st.button(
+            "◀ Prev", key=f"{key}_prev", use_container_width=True, disabled=page <= 1,
+            on_click=_step_page, args=(page_key, -1, total_pages)
+        )
+
+    with nav_col2:
+        st.number_input(
+            f"Page (of {total_pages:,}):", min_value=1, max_value=total_pages,
+            step=1, key=page_key
+        )
+
+    with nav_col3:
+        if matched_rows:
+            search_text = f" matching '{search}'" if search else ""
+            st.caption(
+                f"Showing rows {start + 1:,}–{end:,} of {matched_rows:,}{search_text} "
+                f"({total_rows:,} total) · page {page:,} of {total_pages:,}"
+            )
+
+    with nav_col4:
+        st.button(
+            "Next ▶", key=f"{key}_next", use_container_width=True, disabled=page >= total_pages,
+            on_click=_step_page, args=(page_key, 1, total_pages)
+        )
+
+    return matched_rows
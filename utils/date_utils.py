@@ -3,34 +3,136 @@ Date Utility Functions
 Helper functions for date parsing and manipulation
 """
 
+import warnings
+
+import numpy as np
 import pandas as pd
 
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+# Formats inferred and parsed vectorized before falling back to per-value parsing
+MAX_INFERRED_FORMATS = 3
+
+
+def _naive_utc(value):
+    """Timestamp with a UTC offset converted to naive UTC; naive values unchanged"""
+    if getattr(value, "tzinfo", None) is not None:
+        return value.tz_convert("UTC").tz_localize(None)
+    return value
+
+
+def _parse_date_value(date_val):
+    """Parse a single date value, day-first, falling back to NaT"""
+    try:
+        return _naive_utc(pd.to_datetime(date_val, dayfirst=True, format='mixed'))
+    except:
+        try:
+            return _naive_utc(pd.to_datetime(date_val, dayfirst=True))
+        except:
+            return pd.NaT
+
+
+def _parse_with_format(text, fmt):
+    """
+    Vectorized parse of a string Series with one format, NaT where it does not match
+
+    Values with a UTC offset (%z) are converted to UTC; naive values are
+    kept as they are.
+    """
+    return pd.to_datetime(text, format=fmt, errors='coerce', utc=True).dt.tz_localize(None)
+
+
+def _infer_date_format(text, sample_size):
+    """
+    Infer the dominant strftime format of a string Series from a sample
+
+    Candidate formats are tried most common first and only accepted if
+    they reproduce the per-value day-first parse on the whole sample.
+
+    Returns:
+        Format string or None
+    """
+    step = max(1, len(text) // sample_size)
+    sample = text.iloc[::step].head(sample_size)
+
+    # ISO-style values warn that dayfirst is ignored; that is expected here
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        guesses = sample.map(lambda val: guess_datetime_format(val, dayfirst=True))
+    candidates = guesses.dropna().value_counts().index.tolist()
+    if not candidates:
+        return None
+
+    expected = pd.to_datetime(sample.map(_parse_date_value))
+    for fmt in candidates:
+        fast = _parse_with_format(sample, fmt)
+        parsed = fast.notna()
+        if parsed.any() and (fast[parsed] == expected[parsed]).all():
+            return fmt
+    return None
 
-def parse_dates_safely(date_series):
+
+def parse_dates_safely(date_series, sample_size=500):
     """
     Parse dates with multiple format handling
 
+    The dominant format is inferred from a sample and the whole column is
+    parsed in one vectorized call; only values that do not match it go
+    through the slower per-value day-first parse (once per distinct value).
+    Values with a UTC offset are converted to UTC, so the result is always
+    a naive datetime64 Series.
+
     Args:
         date_series: Pandas Series containing date values
+        sample_size: Number of values used to infer the dominant format
 
     Returns:
-        Pandas Series with parsed dates
+        Pandas Series with parsed dates (same index as the input)
     """
-    parsed_dates = []
-    for date_val in date_series:
-        if pd.isna(date_val):
-            parsed_dates.append(pd.NaT)
-            continue
-        try:
-            parsed = pd.to_datetime(date_val, dayfirst=True, format='mixed')
-            parsed_dates.append(parsed)
-        except:
-            try:
-                parsed = pd.to_datetime(date_val, dayfirst=True)
-                parsed_dates.append(parsed)
-            except:
-                parsed_dates.append(pd.NaT)
-    return pd.Series(parsed_dates)
+    date_series = pd.Series(date_series)
+    if pd.api.types.is_datetime64_any_dtype(date_series):
+        return date_series.copy()
+
+    parsed = pd.Series(pd.NaT, index=date_series.index, dtype='datetime64[ns]')
+    present = date_series.notna().to_numpy()
+    if not present.any():
+        return parsed
+
+    if pd.api.types.is_string_dtype(date_series):
+        is_text = present
+    else:
+        is_text = present & date_series.map(lambda val: isinstance(val, str)).to_numpy(dtype=bool)
+    text_positions = np.flatnonzero(is_text)
+
+    if len(text_positions):
+        # Parse each distinct string once
+        codes, uniques = pd.factorize(date_series.iloc[text_positions].astype(object).str.strip())
+        text = pd.Series(uniques, dtype=object)
+        unique_parsed = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+
+        # Fast path: vectorized parses with the dominant formats, most common first
+        for _ in range(MAX_INFERRED_FORMATS):
+            fmt = _infer_date_format(text, sample_size) if len(text) else None
+            if not fmt:
+                break
+            fast = _parse_with_format(text, fmt)
+            matched = fast.notna()
+            unique_parsed[fast.index[matched]] = fast[matched]
+            text = text[~matched]
+
+        parsed.iloc[text_positions] = unique_parsed.to_numpy()[codes]
+
+    # Slow path: per-value parse of whatever the fast path left unparsed
+    remaining = np.flatnonzero(present & parsed.isna().to_numpy())
+    if len(remaining):
+        leftovers = date_series.iloc[remaining]
+        lookup = {val: _parse_date_value(val) for val in leftovers.unique()}
+        parsed.iloc[remaining] = pd.to_datetime(leftovers.map(lookup)).to_numpy()
+
+    return parsed
 
 
 def find_date_column(df):
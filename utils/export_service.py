@@ -0,0 +1,467 @@
+"""
+Export Service
+Chunked CSV/Excel/JSON/Parquet/Arrow exports written to temporary files, so
+building a download never holds a second in-memory copy of the data
+"""
+
+import atexit
+import os
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.mis_store import cached
+
+try:
+    import xlsxwriter
+except ImportError:  # Fall back to openpyxl's write-only mode
+    xlsxwriter = None
+
+EXPORT_CHUNK_ROWS = 50000
+
+# Excel sheet limit, header row included
+EXCEL_MAX_ROWS = 1048576
+
+CSV_MIME = "text/csv"
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+JSON_MIME = "application/json"
+PARQUET_MIME = "application/vnd.apache.parquet"
+ARROW_STREAM_MIME = "application/vnd.apache.arrow.stream"
+
+PARQUET_COMPRESSION = "zstd"
+
+# Query result export files kept for repeat downloads (older ones are deleted)
+QUERY_EXPORT_MAX_FILES = 16
+
+# Exports are written in chunks, but st.download_button serves them from memory
+EXPORT_MEMORY_NOTE = (
+    "Files are built in chunks when you click a format, then held in memory while they download, "
+    "so very large exports need memory for the whole file."
+)
+
+_query_exports = OrderedDict()
+_query_exports_lock = threading.Lock()
+
+
+def _temp_path(suffix):
+    """Path of a new empty temporary file"""
+    fd, path = tempfile.mkstemp(prefix="hdfc_export_", suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def _remove_file(path):
+    """Delete a temporary export file if it still exists"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _chunks(df, chunk_rows):
+    """Consecutive row slices of df with at most chunk_rows rows (df itself when empty)"""
+    if df.empty:
+        yield df
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _excel_rows(chunk):
+    """Rows of a chunk as tuples of Python values, missing values as None"""
+    values = chunk.astype(object)
+    return values.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def _content_key(df):
+    """Hash identifying the contents of a (small) DataFrame"""
+    return int(pd.util.hash_pandas_object(df, index=True).sum()), tuple(map(str, df.columns))
+
+
+def _excel_row_limit_error(name, rows):
+    """ValueError for a sheet with more rows than Excel allows"""
+    return ValueError(
+        f"Sheet '{name}' has {rows:,} rows; Excel allows at most {EXCEL_MAX_ROWS - 1:,}. "
+        "Use the CSV export instead."
+    )
+
+
+def frames_from_rows(row_batches):
+    """DataFrame per (column names, row tuples) batch, as pd.read_sql would build it"""
+    for columns, rows in row_batches:
+        yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+
+def _arrow_column(values, field):
+    """Arrow array of raw values with the type fixed by the first batch"""
+    try:
+        return pa.array(values, type=field.type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # e.g. a column that was all NULL in the first batch (typed string)
+        return pa.array(values).cast(field.type)
+
+
+def record_batches_from_rows(row_batches):
+    """
+    Arrow record batches straight from DBAPI row batches, without pandas
+
+    The schema is inferred from the first batch (all-NULL columns become
+    strings); later batches are converted to it.
+
+    Yields:
+        pa.RecordBatch
+    """
+    schema = None
+    for columns, rows in row_batches:
+        values = list(zip(*rows)) if rows else [[] for _ in columns]
+        if schema is None:
+            inferred = [pa.array(column_values) for column_values in values]
+            schema = pa.schema([
+                pa.field(name, pa.string() if array.type == pa.null() else array.type)
+                for name, array in zip(columns, inferred)
+            ])
+        yield pa.RecordBatch.from_arrays(
+            [_arrow_column(column_values, field) for column_values, field in zip(values, schema)],
+            schema=schema
+        )
+
+
+def _arrow_safe_frame(df):
+    """df with object columns Arrow cannot type (mixed values) converted to text"""
+    mixed = []
+    for col in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            mixed.append(col)
+    if not mixed:
+        return df
+    safe = df.copy(deep=False)
+    for col in mixed:
+        safe[col] = df[col].astype(str).where(df[col].notna(), None)
+    return safe
+
+
+def record_batches_from_frame(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Arrow record batches of df, one chunk at a time with one schema
+
+    Yields:
+        pa.RecordBatch
+    """
+    df = _arrow_safe_frame(df)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for chunk in _chunks(df, chunk_rows):
+        yield pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+
+
+def write_parquet_batches(batches, path, compression=PARQUET_COMPRESSION):
+    """
+    Write Arrow record batches to a compressed Parquet file, one row group per batch
+
+    Returns:
+        str: path
+    """
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema, compression=compression)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def write_arrow_stream_batches(batches, path):
+    """
+    Write Arrow record batches to an Arrow IPC stream file
+
+    Returns:
+        str: path
+    """
+    writer = None
+    with pa.OSFile(path, "wb") as sink:
+        try:
+            for batch in batches:
+                if writer is None:
+                    writer = pa.ipc.new_stream(sink, batch.schema)
+                writer.write_batch(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+    return path
+
+
+def write_csv_chunks(chunks, path):
+    """
+    Write DataFrame chunks to one CSV file, with the header of the first chunk
+
+    Returns:
+        str: path
+    """
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=i == 0, index=False)
+    return path
+
+
+def write_csv_file(df, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write df to a CSV file one chunk at a time
+
+    The output is identical to df.to_csv(index=False).
+
+    Returns:
+        str: path
+    """
+    return write_csv_chunks(_chunks(df, chunk_rows), path)
+
+
+def write_json_chunks(chunks, path):
+    """
+    Write DataFrame chunks to one JSON array of records (like to_json(orient='records', indent=2))
+
+    Returns:
+        str: path
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        first = True
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            records = chunk.to_json(orient="records", indent=2).strip()[1:-1].strip("\n")
+            f.write(("\n" if first else ",\n") + records)
+            first = False
+        f.write("]" if first else "\n]")
+    return path
+
+
+def write_excel_chunks(sheets, path):
+    """
+    Write chunked sheets to an Excel workbook row by row with constant memory
+
+    Uses xlsxwriter's constant_memory mode when installed, otherwise
+    openpyxl's write-only mode. The header comes from the first chunk of
+    each sheet, so every sheet needs at least one (possibly empty) chunk.
+
+    Args:
+        sheets: List of (sheet name, iterable of DataFrame chunks) pairs; index is not written
+        path: Output .xlsx path
+
+    Returns:
+        str: path
+
+    Raises:
+        ValueError: A sheet exceeds the Excel row limit
+    """
+    if xlsxwriter is not None:
+        workbook = xlsxwriter.Workbook(path, {
+            "constant_memory": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            "strings_to_formulas": False,
+            "strings_to_urls": False
+        })
+        try:
+            for name, chunks in sheets:
+                worksheet = workbook.add_worksheet(name[:31])
+                row = 0
+                for chunk in chunks:
+                    if row == 0:
+                        worksheet.write_row(0, 0, [str(col) for col in chunk.columns])
+                        row = 1
+                    if row + len(chunk) > EXCEL_MAX_ROWS:
+                        raise _excel_row_limit_error(name, row - 1 + len(chunk))
+                    for values in _excel_rows(chunk):
+                        worksheet.write_row(row, 0, values)
+                        row += 1
+        finally:
+            workbook.close()
+    else:
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        for name, chunks in sheets:
+            worksheet = workbook.create_sheet(title=name[:31])
+            row = 0
+            for chunk in chunks:
+                if row == 0:
+                    worksheet.append([str(col) for col in chunk.columns])
+                    row = 1
+                if row + len(chunk) > EXCEL_MAX_ROWS:
+                    raise _excel_row_limit_error(name, row - 1 + len(chunk))
+                for values in _excel_rows(chunk):
+                    worksheet.append(values)
+                row += len(chunk)
+        workbook.save(path)
+    return path
+
+
+def write_excel_file(sheets, path, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write DataFrames to an Excel workbook row by row with constant memory
+
+    Args:
+        sheets: List of (sheet name, DataFrame) pairs; index is not written
+        path: Output .xlsx path
+        chunk_rows: Rows converted to Python values at a time
+
+    Returns:
+        str: path
+    """
+    for name, df in sheets:
+        if len(df) + 1 > EXCEL_MAX_ROWS:
+            raise _excel_row_limit_error(name, len(df))
+    return write_excel_chunks([(name, _chunks(df, chunk_rows)) for name, df in sheets], path)
+
+
+def export_csv(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Temporary CSV file of df, written once per data version
+
+    The file is deleted when df is garbage collected.
+
+    Returns:
+        str: Path of the CSV file
+    """
+    def compute():
+        path = write_csv_file(df, _temp_path(".csv"), chunk_rows)
+        weakref.finalize(df, _remove_file, path)
+        return path
+
+    return cached(df, ("export_file", "csv"), compute)
+
+
+def export_excel(df, sheet_name, extra_sheets=(), chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Temporary Excel file of df plus optional small extra sheets, written once per data version
+
+    Extra sheets (e.g. summaries rebuilt on every rerun) are keyed by content,
+    so the workbook is only rewritten when they change. The file is deleted
+    when df is garbage collected.
+
+    Args:
+        df: Main DataFrame
+        sheet_name: Sheet name for df
+        extra_sheets: List of (sheet name, DataFrame) pairs written after df
+
+    Returns:
+        str: Path of the .xlsx file
+    """
+    extra_sheets = list(extra_sheets)
+    key = ("export_file", "xlsx", sheet_name, tuple((name, _content_key(extra)) for name, extra in extra_sheets))
+
+    def compute():
+        path = write_excel_file([(sheet_name, df)] + extra_sheets, _temp_path(".xlsx"), chunk_rows)
+        weakref.finalize(df, _remove_file, path)
+        return path
+
+    return cached(df, key, compute)
+
+
+def export_parquet(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Temporary compressed Parquet file of df, written once per data version
+
+    The file is deleted when df is garbage collected.
+
+    Returns:
+        str: Path of the Parquet file
+    """
+    def compute():
+        path = write_parquet_batches(record_batches_from_frame(df, chunk_rows), _temp_path(".parquet"))
+        weakref.finalize(df, _remove_file, path)
+        return path
+
+    return cached(df, ("export_file", "parquet"), compute)
+
+
+def export_arrow(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Temporary Arrow IPC stream file of df, written once per data version
+
+    The file is deleted when df is garbage collected.
+
+    Returns:
+        str: Path of the Arrow stream file
+    """
+    def compute():
+        path = write_arrow_stream_batches(record_batches_from_frame(df, chunk_rows), _temp_path(".arrows"))
+        weakref.finalize(df, _remove_file, path)
+        return path
+
+    return cached(df, ("export_file", "arrows"), compute)
+
+
+def export_query_result(key, fmt, make_row_batches):
+    """
+    Temporary export file of a query result, built once per result and format
+
+    Meant to run off the request thread (e.g. as a deferred download
+    callable). Parquet and Arrow are built from the rows directly; the
+    other formats go through one DataFrame per batch. Files are kept for
+    repeat downloads, up to QUERY_EXPORT_MAX_FILES; older ones are deleted.
+
+    Args:
+        key: Hashable identifying the result (e.g. its query cache key)
+        fmt: "csv", "xlsx", "json", "parquet" or "arrows"
+        make_row_batches: Zero-argument callable returning an iterable of
+            (column names, row tuples) batches
+
+    Returns:
+        str: Path of the export file
+    """
+    writers = {
+        "csv": lambda batches, path: write_csv_chunks(frames_from_rows(batches), path),
+        "json": lambda batches, path: write_json_chunks(frames_from_rows(batches), path),
+        "xlsx": lambda batches, path: write_excel_chunks([("Query Results", frames_from_rows(batches))], path),
+        "parquet": lambda batches, path: write_parquet_batches(record_batches_from_rows(batches), path),
+        "arrows": lambda batches, path: write_arrow_stream_batches(record_batches_from_rows(batches), path)
+    }
+    with _query_exports_lock:
+        entry = _query_exports.setdefault((key, fmt), {"lock": threading.Lock(), "path": None})
+        _query_exports.move_to_end((key, fmt))
+
+    # One build per result and format; concurrent clicks wait for it
+    with entry["lock"]:
+        if entry["path"] is None or not os.path.exists(entry["path"]):
+            path = _temp_path(f".{fmt}")
+            try:
+                writers[fmt](make_row_batches(), path)
+            except Exception:
+                _remove_file(path)
+                raise
+            entry["path"] = path
+
+    with _query_exports_lock:
+        while len(_query_exports) > QUERY_EXPORT_MAX_FILES:
+            _, evicted = _query_exports.popitem(last=False)
+            if evicted["path"] is not None:
+                _remove_file(evicted["path"])
+    return entry["path"]
+
+
+def read_export_file(path):
+    """
+    Contents of an export file, for download callables that must return bytes
+
+    Streamlit serves downloads from memory, so the whole file is held there
+    while it downloads; only building it is chunked (see EXPORT_MEMORY_NOTE).
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@atexit.register
+def _remove_query_exports():
+    """Delete query result export files when the process exits"""
+    for entry in _query_exports.values():
+        if entry["path"] is not None:
+            _remove_file(entry["path"])
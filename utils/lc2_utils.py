@@ -0,0 +1,122 @@
+"""
+LC2 Code Utilities
+Decode MIS LC2 codes into phone numbers or campaign seqIds
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# LC2 letters M..V stand for phone digits 0..9
+LC2_DIGIT_LETTERS = "MNOPQRSTUV"
+
+# Longest "IV" base36 code converted in bulk: 36**12 - 1 still fits in int64
+BASE36_MAX_DIGITS = 12
+
+# Digit value of each ASCII byte in base36 (NUL padding counts as 0)
+_BASE36_VALUES = np.zeros(256, dtype=np.int64)
+_BASE36_VALUES[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_BASE36_VALUES[np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype=np.uint8)] = np.arange(10, 36)
+
+
+def derive_phone_from_lc2(s):
+    """Derive phone number from LC2 code using various transformations"""
+    if not s:
+        return None
+    
+    s_up = s.upper().strip()
+    
+    # Handle IV prefix (base36 conversion)
+    if s_up.startswith('IV') and len(s_up) > 2:
+        try:
+            base36_part = s_up[2:]
+            phone_num = int(base36_part, 36)
+            return str(phone_num)
+        except ValueError:
+            pass
+    
+    # Handle MNOPQRSTUV conversion
+    mapping = str.maketrans("MNOPQRSTUV", "0123456789")
+    mapping_keys = set("MNOPQRSTUV")
+    
+    s_no_cg = re.sub(r'(?i)^CG', '', s_up)
+    if len(s_no_cg) == 10 and set(s_no_cg).issubset(mapping_keys):
+        return s_no_cg.translate(mapping)
+    if len(s_up) == 10 and set(s_up).issubset(mapping_keys):
+        return s_up.translate(mapping)
+    
+    return None
+
+
+def _base36_to_decimal(codes):
+    """Decimal strings for an array of base36 codes ([0-9A-Z], at most BASE36_MAX_DIGITS long)"""
+    padded = np.array(codes, dtype=f"S{BASE36_MAX_DIGITS}")  # left aligned, NUL padded
+    matrix = padded.view(np.uint8).reshape(-1, BASE36_MAX_DIGITS)
+    values = np.zeros(len(matrix), dtype=np.int64)
+    for column in matrix.T:
+        values = np.where(column != 0, values * 36 + _BASE36_VALUES[column], values)
+    return values.astype(str).astype(object)
+
+
+def _letters_to_digits(codes):
+    """Translate an array of 10-letter M..V codes to their digit strings"""
+    letters = np.array(codes, dtype="U10").view(np.uint32).reshape(-1, 10)
+    digits = (letters - (ord(LC2_DIGIT_LETTERS[0]) - ord("0"))).astype(np.uint32)
+    return digits.view("U10").ravel().astype(object)
+
+
+def decode_lc2_phones(lc2):
+    """
+    Vectorized derive_phone_from_lc2() over a Series of LC2 codes
+
+    Rows are classified with string masks and each class is decoded in one
+    batch; the rare "IV" codes that are too long or unusual for the bulk
+    base36 conversion fall back to derive_phone_from_lc2().
+
+    Args:
+        lc2: Series of LC2 codes
+
+    Returns:
+        pd.Series: Derived phone numbers (missing where none can be derived)
+    """
+    codes = lc2.fillna("").astype(str).str.upper().str.strip()
+    values = codes.to_numpy(dtype=object)
+    phones = np.full(len(codes), None, dtype=object)
+
+    # "IV" + base36 phone number
+    is_iv = (codes.str.startswith("IV") & (codes.str.len() > 2)).to_numpy(dtype=bool)
+    iv_bulk = is_iv & codes.str.fullmatch(f"IV[0-9A-Z]{{1,{BASE36_MAX_DIGITS}}}").to_numpy(dtype=bool)
+    rows = np.flatnonzero(iv_bulk)
+    if len(rows):
+        phones[rows] = _base36_to_decimal([value[2:] for value in values[rows]])
+    for row in np.flatnonzero(is_iv & ~iv_bulk):
+        phones[row] = derive_phone_from_lc2(values[row])
+
+    # Ten M..V letters, optionally after a CG prefix
+    no_cg = codes.str.removeprefix("CG")
+    rows = np.flatnonzero(
+        ~is_iv & no_cg.str.fullmatch(f"[{LC2_DIGIT_LETTERS}]{{10}}").to_numpy(dtype=bool)
+    )
+    if len(rows):
+        # The matched letters are always the last ten characters of the code
+        phones[rows] = _letters_to_digits([value[-10:] for value in values[rows]])
+
+    return pd.Series(phones, index=lc2.index)
+
+
+def normalize_lc2(values):
+    """LC2 codes as stripped strings (missing values become empty strings)"""
+    return values.fillna("").astype(str).str.strip()
+
+
+def lc2_seq_ids(lc2, derived_phones):
+    """
+    Campaign seqIds for LC2 codes that do not decode to a phone number
+
+    Returns:
+        pd.Series: Upper-cased code without its CG prefix, or None where a
+        phone number was derived
+    """
+    no_cg = lc2.str.upper().str.replace(r'(?i)^CG', '', regex=True).str.strip()
+    return no_cg.where(derived_phones.isna(), None)
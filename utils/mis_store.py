@@ -0,0 +1,372 @@
+"""
+MIS Data Store
+Per-data-version caches of values derived from a loaded MIS DataFrame
+"""
+
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from config.app_config import STATUS_CATEGORIES
+from utils.date_utils import parse_dates_safely
+
+# A data version is one loaded MIS DataFrame object; derived values are
+# cached against it and dropped when the frame is garbage collected.
+_stores = {}
+_lock = threading.RLock()
+
+
+def _store_for(df):
+    """Return the cache dict for this DataFrame, creating it on first use"""
+    key = id(df)
+    with _lock:
+        entry = _stores.get(key)
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+
+        def _drop(_ref, key=key):
+            with _lock:
+                current = _stores.get(key)
+                if current is not None and current[0] is _ref:
+                    del _stores[key]
+
+        store = {}
+        _stores[key] = (weakref.ref(df, _drop), store)
+        return store
+
+
+def set_source_version(df, version):
+    """Record the database data version (MIS_Update_Log id) df was loaded at"""
+    with _lock:
+        _store_for(df)[("source_version",)] = version
+
+
+def get_source_version(df):
+    """Database data version df was loaded at, or None (e.g. an uploaded file)"""
+    with _lock:
+        return _store_for(df).get(("source_version",))
+
+
+def cached(df, name, compute, depends_on=()):
+    """
+    Return a value derived from df, computing it once per data version
+
+    Args:
+        df: MIS DataFrame (treated as immutable once loaded)
+        name: Cache key for the derived value
+        compute: Zero-argument callable producing the value
+        depends_on: Other DataFrames the value is derived from; the cached
+            value is reused only while the very same objects are passed
+
+    Returns:
+        The cached value
+    """
+    store = _store_for(df)
+    key = (name, tuple(id(other) for other in depends_on)) if depends_on else name
+    with _lock:
+        entry = store.get(key)
+    if entry is not None and all(ref() is other for ref, other in zip(entry[0], depends_on)):
+        return entry[1]
+    value = compute()
+    with _lock:
+        store[key] = (tuple(weakref.ref(other) for other in depends_on), value)
+    return value
+
+
+def cached_latest(df, name, key, compute, depends_on=()):
+    """
+    Return a value derived from df for one input, keeping only the latest per name
+
+    For values that depend on user input (e.g. rows matching a filter):
+    reruns with the same key reuse the value, while a new key replaces it
+    instead of keeping another copy per input.
+
+    Args:
+        df: MIS DataFrame the value is derived from
+        name: Cache slot for the derived value
+        key: Hashable describing the input (e.g. the filter settings)
+        compute: Zero-argument callable producing the value
+        depends_on: Other DataFrames the value is derived from, as in cached()
+
+    Returns:
+        The cached value
+    """
+    store = _store_for(df)
+    slot = ("latest", name)
+    with _lock:
+        entry = store.get(slot)
+    if entry is not None and entry[0] == key and all(ref() is other for ref, other in zip(entry[1], depends_on)) \
+            and len(entry[1]) == len(depends_on):
+        return entry[2]
+    value = compute()
+    with _lock:
+        store[slot] = (key, tuple(weakref.ref(other) for other in depends_on), value)
+    return value
+
+
+def get_parsed_dates(df, col):
+    """
+    Parsed datetime Series for a date column, parsed once per data version
+
+    The source frame is never modified; the result shares its index.
+    """
+    return cached(df, ("dates", col), lambda: parse_dates_safely(df[col]))
+
+
+def get_date_index(df, col):
+    """
+    Sort permutation of a date column, built once per data version
+
+    Returns:
+        tuple: (order, sorted_values) where order holds the row positions of
+        the non-NaT dates in ascending date order and sorted_values the
+        matching datetime64 values
+    """
+    def compute():
+        values = get_parsed_dates(df, col).to_numpy(dtype='datetime64[ns]')
+        valid_positions = np.flatnonzero(~np.isnat(values))
+        order = valid_positions[np.argsort(values[valid_positions], kind='stable')]
+        return order, values[order]
+
+    return cached(df, ("date_index", col), compute)
+
+
+def _as_datetime64(value):
+    """Convert a date-like bound to datetime64[ns] for searchsorted"""
+    return pd.Timestamp(value).to_datetime64().astype('datetime64[ns]')
+
+
+def date_range_slice(df, col, start=None, end=None):
+    """
+    Row positions with start <= date <= end, found by binary search
+
+    Both bounds are inclusive and optional; NaT dates never match. The
+    result is a slice of the cached sort permutation (date order, not row
+    order) and must not be modified.
+    """
+    order, sorted_values = get_date_index(df, col)
+    lo = 0 if start is None else np.searchsorted(sorted_values, _as_datetime64(start), side='left')
+    hi = len(order) if end is None else np.searchsorted(sorted_values, _as_datetime64(end), side='right')
+    return order[lo:max(lo, hi)]
+
+
+def filter_date_ranges(df, ranges):
+    """
+    Row positions matching every (col, start, end) date range, in row order
+
+    Args:
+        df: MIS DataFrame
+        ranges: Iterable of (column, start, end) tuples; None bounds are open
+
+    Returns:
+        np.ndarray: Sorted row positions (all rows if ranges is empty)
+    """
+    positions = None
+    for col, start, end in ranges:
+        matched = date_range_slice(df, col, start, end)
+        if positions is None:
+            positions = np.sort(matched)
+        else:
+            positions = np.intersect1d(positions, matched, assume_unique=True)
+    if positions is None:
+        return np.arange(len(df))
+    return positions
+
+
+def get_date_range(df, col, after=pd.Timestamp('2000-01-01')):
+    """
+    (min, max) of the parsed dates in a column later than `after`
+
+    Dates on or before `after` (e.g. epoch placeholders) are ignored;
+    pass after=None to consider every valid date.
+
+    Returns:
+        tuple: (min, max) Timestamps, or (None, None) if no valid dates
+    """
+    _, sorted_values = get_date_index(df, col)
+    lo = 0 if after is None else np.searchsorted(sorted_values, _as_datetime64(after), side='right')
+    if lo >= len(sorted_values):
+        return None, None
+    return pd.Timestamp(sorted_values[lo]), pd.Timestamp(sorted_values[-1])
+
+
+def _normalize_value(value):
+    """Case- and whitespace-insensitive form of a raw status value"""
+    return str(value).strip().upper()
+
+
+def encode_values(values, lookup, normalize=False):
+    """
+    Map each value to an int8 code through a lookup table
+
+    Only the distinct values are looked up; rows are then coded with a
+    single gather. Values are compared as strings (None becomes "None",
+    as with astype(str)).
+
+    Args:
+        values: Series of raw values
+        lookup: Dict of raw value -> code; missing values get code 0
+        normalize: Compare values stripped and upper-cased
+
+    Returns:
+        np.ndarray: int8 codes, one per row
+    """
+    if normalize:
+        lookup = {_normalize_value(key): code for key, code in lookup.items()}
+    row_codes, uniques = pd.factorize(pd.Series(values).astype(str), use_na_sentinel=False)
+    unique_codes = np.array(
+        [lookup.get(_normalize_value(value) if normalize else value, 0) for value in uniques],
+        dtype=np.int8
+    )
+    return unique_codes[row_codes] if len(unique_codes) else np.zeros(len(row_codes), dtype=np.int8)
+
+
+def encode_status(values, status_map, normalize=False):
+    """
+    Encode raw final decisions as STATUS_CATEGORIES int8 codes
+
+    Args:
+        values: Series of raw FINAL_DECISION values
+        status_map: Dict of raw decision -> category name (FINAL_STATUS_MAP)
+        normalize: Match decisions case- and whitespace-insensitively
+
+    Returns:
+        np.ndarray: int8 index into STATUS_CATEGORIES for each row
+    """
+    lookup = {raw: STATUS_CATEGORIES.index(category) for raw, category in status_map.items()}
+    return encode_values(values, lookup, normalize=normalize)
+
+
+def get_status_codes(df, col, status_map, normalize=False):
+    """STATUS_CATEGORIES codes for a decision column, encoded once per data version"""
+    key = ("status_codes", col, tuple(sorted(status_map.items())), normalize)
+    return cached(df, key, lambda: encode_status(df[col], status_map, normalize=normalize))
+
+
+def get_value_flags(df, col, value, normalize=True):
+    """int8 0/1 flags marking rows whose column equals value, computed once per data version"""
+    return cached(
+        df, ("value_flags", col, value, normalize),
+        lambda: encode_values(df[col], {value: 1}, normalize=normalize)
+    )
+
+
+def count_status(codes, flags=None):
+    """
+    Count rows per status category (and flagged rows) with one bincount
+
+    Args:
+        codes: STATUS_CATEGORIES int8 codes
+        flags: Optional 0/1 flags (e.g. IPA approved) for the same rows
+
+    Returns:
+        tuple: ({category: count}, flagged count)
+    """
+    n_categories = len(STATUS_CATEGORIES)
+    if flags is None:
+        flags = np.zeros(len(codes), dtype=np.int8)
+    combined = np.bincount(
+        codes.astype(np.intp) * 2 + flags, minlength=n_categories * 2
+    ).reshape(n_categories, 2)
+    counts = dict(zip(STATUS_CATEGORIES, combined.sum(axis=1).tolist()))
+    return counts, int(combined[:, 1].sum())
+
+
+def get_column_codes(df, col):
+    """
+    Factorized column, built once per data version
+
+    Returns:
+        tuple: (codes, uniques, sort_rank) where codes index uniques per row
+        (-1 for missing) and sort_rank lists unique indices in sorted value order
+    """
+    def compute():
+        codes, uniques = pd.factorize(df[col])
+        uniques = pd.Index(uniques).tolist()
+        try:
+            sort_rank = sorted(range(len(uniques)), key=uniques.__getitem__)
+        except TypeError:
+            # Mixed types (e.g. numbers and strings) are ordered by their text
+            sort_rank = sorted(range(len(uniques)), key=lambda i: str(uniques[i]))
+        return codes, uniques, sort_rank
+
+    return cached(df, ("column_codes", col), compute)
+
+
+def get_column_stats(df, col):
+    """
+    Column statistics for filter widgets, computed once per data version
+
+    Returns:
+        dict: values (sorted distinct non-null values), cardinality,
+        null_count, min and max (None when the column is all null)
+    """
+    def compute():
+        codes, uniques, sort_rank = get_column_codes(df, col)
+        values = [uniques[i] for i in sort_rank]
+        return {
+            "values": values,
+            "cardinality": len(values),
+            "null_count": int((codes < 0).sum()),
+            "min": values[0] if values else None,
+            "max": values[-1] if values else None,
+        }
+
+    return cached(df, ("column_stats", col), compute)
+
+
+def distinct_values(df, col, positions=None, sort=True):
+    """
+    Distinct non-null values of a column, optionally within a row subset
+
+    Args:
+        df: DataFrame the catalog is built on
+        col: Column name
+        positions: Row positions to restrict to (None for all rows)
+        sort: Sorted order if True, else order of first appearance
+
+    Returns:
+        list: Distinct values, like sorted(df[col].dropna().unique().tolist())
+        (or the unsorted unique() order when sort is False)
+    """
+    codes, uniques, sort_rank = get_column_codes(df, col)
+    if positions is None:
+        if sort:
+            return list(get_column_stats(df, col)["values"])
+        return list(uniques)
+
+    subset = codes[positions]
+    subset = subset[subset >= 0]
+    if sort:
+        present = np.bincount(subset, minlength=len(uniques)) > 0
+        return [uniques[i] for i in sort_rank if present[i]]
+    present_codes, first_seen = np.unique(subset, return_index=True)
+    return [uniques[i] for i in present_codes[np.argsort(first_seen)]]
+
+
+def column_value_counts(df, col, positions=None):
+    """
+    Non-null value counts of a column from the cached codes, most frequent first
+
+    Args:
+        df: DataFrame the catalog is built on
+        col: Column name
+        positions: Row positions to restrict to (None for all rows)
+
+    Returns:
+        pd.Series: Counts indexed by value, like df[col].value_counts()
+    """
+    codes, uniques, _ = get_column_codes(df, col)
+    subset = codes if positions is None else codes[positions]
+    counts = np.bincount(subset[subset >= 0], minlength=len(uniques))
+    result = pd.Series(counts, index=pd.Index(uniques, dtype=object), name="count")
+    return result[result > 0].sort_values(ascending=False, kind='stable')
+
+
+def invalidate(df):
+    """Drop every cached value for this DataFrame"""
+    with _lock:
+        entry = _stores.pop(id(df), None)
+    return entry is not None
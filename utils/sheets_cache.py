@@ -0,0 +1,166 @@
+"""
+Google Sheets Fetch Utilities
+Cached, conditional fetch of Google Sheets CSV exports
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from io import BytesIO
+
+import pandas as pd
+
+# Default cache location: <project root>/.cache/sheets
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "sheets"
+)
+DEFAULT_TTL_SECONDS = 300
+
+# Parsed frames keyed by cache file path and modification time
+_frame_cache = {}
+
+
+def _cache_paths(url, cache_dir):
+    """Return (csv_path, meta_path) for a URL"""
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{key}.csv"), os.path.join(cache_dir, f"{key}.json")
+
+
+def _read_meta(meta_path):
+    """Read cache metadata, or an empty dict if missing or corrupt"""
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, data, mode="wb"):
+    """Write to a unique temp file and rename, so readers never see a partial file"""
+    encoding = None if "b" in mode else "utf-8"
+    tmp = tempfile.NamedTemporaryFile(
+        mode, encoding=encoding, dir=os.path.dirname(path),
+        prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False
+    )
+    try:
+        with tmp:
+            tmp.write(data)
+        os.replace(tmp.name, path)
+    except BaseException:
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        raise
+
+
+def _read_cached_frame(csv_path):
+    """Parse the cached CSV, reusing the parsed frame while the file is unchanged"""
+    mtime = os.path.getmtime(csv_path)
+    cached = _frame_cache.get(csv_path)
+    if cached is None or cached[0] != mtime:
+        df = pd.read_csv(csv_path)
+        df.columns = df.columns.str.strip()
+        cached = (mtime, df)
+        _frame_cache[csv_path] = cached
+    return cached[1].copy()
+
+
+def _parse_csv(body):
+    """Parse a downloaded CSV export, with stripped column names"""
+    df = pd.read_csv(BytesIO(body))
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def _download(request, timeout):
+    """
+    Download and parse a sheet
+
+    Returns:
+        tuple: (DataFrame, raw body, response headers)
+
+    Raises:
+        Exception: On network errors, truncated transfers or a body that is
+        not a CSV export (e.g. a sign-in page for a private sheet)
+    """
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        body = response.read()
+        headers = response.headers
+    if "text/html" in (headers.get("Content-Type") or ""):
+        raise ValueError("Sheet returned an HTML page instead of CSV (is it shared publicly?)")
+    return _parse_csv(body), body, headers
+
+
+def fetch_sheet_csv(url, cache_dir=None, ttl=None, timeout=30, force_refresh=False):
+    """
+    Fetch a Sheets CSV export through an on-disk cache
+
+    Within the TTL the cached copy is returned without any network access.
+    After that, a conditional request (If-None-Match / If-Modified-Since)
+    revalidates it; a 304 reuses the cached copy. If the server cannot be
+    reached or the download is not a usable CSV, the last good copy is
+    returned instead.
+
+    Args:
+        url: CSV export URL
+        cache_dir: Cache directory (defaults to DEFAULT_CACHE_DIR)
+        ttl: Seconds a cached copy is served without revalidation
+        timeout: Network timeout in seconds
+        force_refresh: Skip the TTL and revalidate with the server
+
+    Returns:
+        tuple: (DataFrame, status) where status is one of
+        "cached", "not modified", "downloaded" or "offline" (last good copy
+        served because the fetch failed)
+
+    Raises:
+        Exception: If the sheet cannot be fetched or parsed and no cached
+        copy exists
+    """
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    ttl = DEFAULT_TTL_SECONDS if ttl is None else ttl
+    os.makedirs(cache_dir, exist_ok=True)
+
+    csv_path, meta_path = _cache_paths(url, cache_dir)
+    meta = _read_meta(meta_path)
+    has_copy = os.path.exists(csv_path)
+    has_cache = has_copy and bool(meta)
+
+    if has_cache and not force_refresh and time.time() - meta.get("fetched_at", 0) < ttl:
+        return _read_cached_frame(csv_path), "cached"
+
+    request = urllib.request.Request(url)
+    if has_cache:
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+
+    # Parsed before caching so a bad download never replaces the last good copy
+    try:
+        df, body, headers = _download(request, timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and has_cache:
+            meta["fetched_at"] = time.time()
+            _write_atomic(meta_path, json.dumps(meta), mode="w")
+            return _read_cached_frame(csv_path), "not modified"
+        if has_copy:
+            return _read_cached_frame(csv_path), "offline"
+        raise
+    except Exception:
+        if has_copy:
+            return _read_cached_frame(csv_path), "offline"
+        raise
+
+    _write_atomic(csv_path, body)
+    _write_atomic(meta_path, json.dumps({
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "fetched_at": time.time()
+    }), mode="w")
+    _frame_cache[csv_path] = (os.path.getmtime(csv_path), df)
+    return df.copy(), "downloaded"